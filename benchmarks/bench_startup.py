@@ -0,0 +1,95 @@
+"""시작 시간 벤치마크: main.py import 시간과 GUI 첫 화면까지 걸린 시간 측정
+
+사용법: python benchmarks/bench_startup.py --repeat 5
+       python benchmarks/bench_startup.py --gui --max-import 0.3 --max-first-paint 1.5  (기준을 넘으면 종료 코드 1)
+
+각 측정은 새 파이썬 프로세스에서 실행 (모듈 캐시 영향 없음, 가장 빠른 값 사용)
+시작할 때 로드되면 안 되는 무거운 모듈(pandas, NumPy, MySQL 드라이버 등)이 import되면 실패로 처리
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 처음 쓸 때까지 미루는 모듈 (main.py를 import하는 것만으로 로드되면 시작 시간 회귀)
+LAZY_MODULES = ['pandas', 'numpy', 'mysql.connector', 'openpyxl', 'pyarrow']
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+sys.path.insert(0, {str(ROOT)!r})
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{'import': elapsed, 'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def run_json(command, cwd, env=None):
+    """명령을 실행하고 표준 출력 마지막 줄의 JSON 반환"""
+    completed = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_import(repeat, workdir):
+    """main.py import 시간(초, 최솟값)과 함께 로드된 무거운 모듈 목록"""
+    runs = [run_json([sys.executable, '-c', IMPORT_SCRIPT], workdir) for _ in range(repeat)]
+    return min(run['import'] for run in runs), sorted({name for run in runs for name in run['loaded']})
+
+
+def measure_first_paint(repeat, workdir):
+    """GUI를 띄워 첫 화면이 그려질 때까지 걸린 시간(초, 최솟값)"""
+    env = {**os.environ, 'SHEET2SQL_STARTUP_EXIT': '1'}
+    runs = [run_json([sys.executable, str(ROOT / 'main.py')], workdir, env) for _ in range(repeat)]
+    return min(run['first_paint'] for run in runs)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="시작 시간 벤치마크")
+    parser.add_argument('--repeat', type=int, default=5, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument('--gui', action='store_true', help="GUI 첫 화면 시간도 측정 (디스플레이 필요)")
+    parser.add_argument('--max-import', type=float, help="import 시간 기준(초), 넘으면 종료 코드 1")
+    parser.add_argument('--max-first-paint', type=float, help="첫 화면 시간 기준(초), 넘으면 종료 코드 1")
+    parser.add_argument('--output', type=Path, help="결과를 저장할 JSON 파일")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failures = []
+
+    # 설정 파일(db_config.ini)이 저장소에 만들어지지 않도록 임시 디렉터리에서 실행
+    with tempfile.TemporaryDirectory() as workdir:
+        import_time, loaded = measure_import(args.repeat, workdir)
+        result = {'import': round(import_time, 3), 'loaded_at_import': loaded}
+        print(f"import: {import_time * 1000:8.1f} ms")
+
+        if loaded:
+            failures.append(f"시작할 때 로드되면 안 되는 모듈: {', '.join(loaded)}")
+
+        if args.max_import is not None and import_time > args.max_import:
+            failures.append(f"import 시간 {import_time:.3f}초 > 기준 {args.max_import}초")
+
+        if args.gui:
+            first_paint = measure_first_paint(args.repeat, workdir)
+            result['first_paint'] = round(first_paint, 3)
+            print(f"첫 화면: {first_paint * 1000:8.1f} ms")
+
+            if args.max_first_paint is not None and first_paint > args.max_first_paint:
+                failures.append(f"첫 화면 시간 {first_paint:.3f}초 > 기준 {args.max_first_paint}초")
+
+    if args.output:
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    for failure in failures:
+        print(f"실패: {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""업데이트 전체 경로 벤치마크: 합성 엑셀/CSV와 SQLite DB로 run_update의 단계별 시간, 처리량, 최대 메모리 측정
+
+사용법: python benchmarks/bench_update.py --sizes 1000 100000 1000000 --output result.json
+       python benchmarks/bench_update.py --compare result.json  (이전 결과와 단계별 비교)
+
+생성한 파일은 --workdir(기본값 benchmarks/.data)에 보관하여 다음 실행에서 재사용 (같은 시드면 같은 데이터)
+MySQL/MariaDB는 --mysql-host를 지정한 경우에만 함께 측정
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+from configparser import ConfigParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import DEFAULT_CONFIG, UpdateEngine, peak_rss_mb  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_FORMATS = ['xlsx', 'csv']
+MATCH_RATE = 0.7  # 시트 행 중 DB에 있는 번호 비율
+
+# 보고서에 표시할 단계 (스테이징/해시 매칭의 적재·조회·스캔은 match로 합산)
+STAGES = {
+    'read': ['read'],
+    'normalize': ['normalize'],
+    'match': ['build', 'stage', 'match', 'scan'],
+    'execute': ['execute'],
+    'commit': ['commit']
+}
+
+
+def format_phone(rnd, number):
+    """8자리 가입자 번호를 실제 시트처럼 여러 형식 중 하나로 표시"""
+    middle, last = divmod(number, 10000)
+    kind = rnd.random()
+
+    if kind < 0.4:
+        return f"010-{middle:04d}-{last:04d}"
+    elif kind < 0.65:
+        return f"010{middle:04d}{last:04d}"
+    elif kind < 0.8:
+        return f"+82 10-{middle:04d}-{last:04d}"
+    elif kind < 0.9:
+        return f"+82 10 {middle:04d} {last:04d}"
+    return 10_0000_0000 + number  # 숫자 셀 (앞자리 0 유실)
+
+
+def make_rows(size, seed):
+    """(DB 번호 목록, 시트 행 목록) 생성 — 시트의 MATCH_RATE만큼은 DB에 있는 번호"""
+    rnd = random.Random(seed)
+    numbers = rnd.sample(range(10 ** 8), size * 2)
+    db_numbers, other_numbers = numbers[:size], numbers[size:]
+    sheet_rows = []
+
+    for i in range(size):
+        kind = rnd.random()
+
+        if kind < 0.05:
+            phone = None
+        elif kind < 0.08:
+            phone = rnd.choice(["없음", "-", "N/A", "미입력"])
+        elif kind < 0.08 + 0.92 * MATCH_RATE:
+            phone = format_phone(rnd, rnd.choice(db_numbers))
+        else:
+            phone = format_phone(rnd, other_numbers[i])
+
+        sheet_rows.append((f"고객{i}", phone, f"메모{i % 100}"))
+
+    return db_numbers, sheet_rows
+
+
+def write_fixtures(workdir, size, formats, seed):
+    """size 행의 시트 파일(형식별)과 SQLite DB를 만들고 경로 반환 (이미 있으면 재사용)"""
+    workdir.mkdir(parents=True, exist_ok=True)
+    db_path = workdir / f"users-{size}-{seed}.db"
+    sheet_paths = {fmt: workdir / f"sheet-{size}-{seed}.{fmt}" for fmt in formats}
+
+    if db_path.exists() and all(path.exists() for path in sheet_paths.values()):
+        return db_path, sheet_paths
+
+    print(f"{size:,}행 데이터 생성 중...", file=sys.stderr)
+    db_numbers, sheet_rows = make_rows(size, seed)
+
+    if not db_path.exists():
+        tmp_path = db_path.with_suffix('.tmp')
+        conn = sqlite3.connect(tmp_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, phone_number TEXT, status TEXT)")
+        conn.executemany(
+            "INSERT INTO users (phone_number) VALUES (?)",
+            # DB에는 하이픈 형식과 숫자만 형식이 섞여 있음
+            ((f"010-{n // 10000:04d}-{n % 10000:04d}" if n % 2 else f"010{n:08d}",) for n in db_numbers)
+        )
+        conn.execute("CREATE INDEX idx_users_phone_number ON users (phone_number)")
+        conn.commit()
+        conn.close()
+        os.replace(tmp_path, db_path)
+
+    for fmt, path in sheet_paths.items():
+        if path.exists():
+            continue
+
+        tmp_path = path.with_name(path.name + '.tmp')
+
+        if fmt == 'xlsx':
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(["이름", "전화번호", "메모"])
+            for row in sheet_rows:
+                sheet.append(row)
+            workbook.save(tmp_path)
+        elif fmt == 'csv':
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["이름", "전화번호", "메모"])
+                writer.writerows(sheet_rows)
+        elif fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # 전화번호 열은 숫자 셀과 문자열이 섞여 있으므로 문자열로 저장
+            names, phones, memos = zip(*sheet_rows)
+            table = pa.table({
+                '이름': list(names),
+                '전화번호': [None if phone is None else str(phone) for phone in phones],
+                '메모': list(memos)
+            })
+            pq.write_table(table, tmp_path)
+        else:
+            raise ValueError(f"지원하지 않는 형식: {fmt}")
+
+        os.replace(tmp_path, path)
+
+    return db_path, sheet_paths
+
+
+def run_one(args):
+    """한 번의 run_update를 측정하고 결과를 JSON 한 줄로 출력 (최대 메모리를 분리하려고 별도 프로세스에서 실행)"""
+    config = ConfigParser()
+    config.read_dict(DEFAULT_CONFIG)
+    config.read_dict({
+        'DATABASE': {
+            'type': args.db_type,
+            'database': args.database,
+            'table': 'users',
+            'phone_column': 'phone_number',
+            'update_column': 'status',
+            'match_mode': args.match_mode,
+            'chunk_size': str(args.chunk_size)
+        },
+        'EXCEL': {'phone_column_index': '1', 'start_row': '0', 'has_header': 'True'},
+        'CACHE': {'memory_mb': '0', 'sidecar': 'False'},
+        'PROFILE': {'report': 'False'}
+    })
+
+    if args.db_type != 'sqlite':
+        config.read_dict({'DATABASE': {
+            'host': args.mysql_host,
+            'port': str(args.mysql_port),
+            'user': args.mysql_user,
+            'password': args.mysql_password
+        }})
+
+    engine = UpdateEngine(config)
+
+    try:
+        result = engine.run_update(args.sheet, "DONE")
+    finally:
+        engine.close()
+
+    print(json.dumps({
+        'rows_read': result.rows_read,
+        'phones': result.phones,
+        'matched': result.matched,
+        'affected': result.affected,
+        'profile': result.profile,
+        'peak_rss_mb': peak_rss_mb()
+    }))
+    return 0
+
+
+def load_mysql(db_path, args):
+    """SQLite 고정 데이터를 MySQL/MariaDB의 users 테이블로 복사"""
+    import mysql.connector
+
+    source = sqlite3.connect(db_path)
+    conn = mysql.connector.connect(
+        host=args.mysql_host, port=args.mysql_port, user=args.mysql_user,
+        password=args.mysql_password, database=args.mysql_database
+    )
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("DROP TABLE IF EXISTS users")
+        cursor.execute(
+            "CREATE TABLE users (id INT PRIMARY KEY, phone_number VARCHAR(32), status VARCHAR(32), "
+            "INDEX idx_users_phone_number (phone_number)) DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+        )
+        rows = source.execute("SELECT id, phone_number FROM users")
+
+        while True:
+            batch = rows.fetchmany(10000)
+            if not batch:
+                break
+            cursor.executemany("INSERT INTO users (id, phone_number) VALUES (%s, %s)", batch)
+
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+        source.close()
+
+
+def measure(sheet_path, db_type, database, args):
+    """별도 프로세스로 run_one을 실행하고 측정 결과 반환"""
+    command = [
+        sys.executable, __file__, '--run-one',
+        '--sheet', str(sheet_path), '--db-type', db_type, '--database', str(database),
+        '--match-mode', args.match_mode, '--chunk-size', str(args.chunk_size)
+    ]
+
+    if db_type != 'sqlite':
+        command += [
+            '--mysql-host', args.mysql_host, '--mysql-port', str(args.mysql_port),
+            '--mysql-user', args.mysql_user, '--mysql-password', args.mysql_password
+        ]
+
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(size, fmt, db_type, measured):
+    """단계별 시간, 처리량, 최대 메모리로 요약"""
+    profile = measured['profile']
+    total = profile['total']['wall']
+    stages = {
+        stage: sum(profile[phase]['wall'] for phase in phases if phase in profile)
+        for stage, phases in STAGES.items()
+    }
+
+    return {
+        'size': size,
+        'format': fmt,
+        'db': db_type,
+        'rows_read': measured['rows_read'],
+        'matched': measured['matched'],
+        'affected': measured['affected'],
+        'total': total,
+        'rows_per_sec': measured['rows_read'] / total if total else None,
+        'stages': stages,
+        'peak_rss_mb': measured['peak_rss_mb']
+    }
+
+
+def print_table(results, baseline=None):
+    """결과 표 출력 (baseline이 있으면 단계별 변화율도 표시)"""
+    previous = {(r['size'], r['format'], r['db']): r for r in baseline or []}
+    header = f"{'행 수':>10} {'형식':>7} {'DB':>7} {'전체(s)':>9} {'행/초':>11}"
+    header += ''.join(f" {stage:>10}" for stage in STAGES) + f" {'RSS(MB)':>8}"
+    print(header)
+
+    for r in results:
+        line = f"{r['size']:>10,} {r['format']:>7} {r['db']:>7} {r['total']:>9.3f} {r['rows_per_sec'] or 0:>11,.0f}"
+        line += ''.join(f" {r['stages'][stage]:>10.3f}" for stage in STAGES)
+        line += f" {r['peak_rss_mb'] or 0:>8.1f}"
+        print(line)
+
+        before = previous.get((r['size'], r['format'], r['db']))
+
+        if before is not None:
+            def change(new, old):
+                return f"{(new - old) / old * 100:+.1f}%" if old else "-"
+
+            line = f"{'(비교)':>10} {'':>7} {'':>7} {change(r['total'], before['total']):>9} {'':>11}"
+            line += ''.join(f" {change(r['stages'][s], before['stages'][s]):>10}" for s in STAGES)
+            print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="엑셀 → DB 업데이트 전체 경로 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="시트/DB 행 수")
+    parser.add_argument('--formats', nargs='+', default=DEFAULT_FORMATS, choices=['xlsx', 'csv', 'parquet'], help="시트 파일 형식")
+    parser.add_argument('--match-mode', default='staging', choices=['staging', 'hash'], help="매칭 방식")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="청크 크기")
+    parser.add_argument('--seed', type=int, default=0, help="데이터 생성 시드")
+    parser.add_argument('--workdir', type=Path, default=Path(__file__).resolve().parent / '.data', help="생성 파일 보관 폴더")
+    parser.add_argument('--output', type=Path, help="결과를 저장할 JSON 파일")
+    parser.add_argument('--compare', type=Path, help="비교할 이전 결과 JSON 파일")
+    parser.add_argument('--mysql-host', help="지정하면 MySQL/MariaDB도 측정")
+    parser.add_argument('--mysql-port', type=int, default=3306)
+    parser.add_argument('--mysql-user', default='root')
+    parser.add_argument('--mysql-password', default='')
+    parser.add_argument('--mysql-database', default='sheet2sql_bench')
+
+    # --run-one: 내부용 (측정 프로세스)
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--sheet', help=argparse.SUPPRESS)
+    parser.add_argument('--db-type', default='sqlite', help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.run_one:
+        return run_one(args)
+
+    baseline = json.loads(args.compare.read_text(encoding='utf-8')) if args.compare else None
+    results = []
+
+    for size in args.sizes:
+        db_path, sheet_paths = write_fixtures(args.workdir, size, args.formats, args.seed)
+
+        if args.mysql_host:
+            load_mysql(db_path, args)
+
+        for fmt, sheet_path in sheet_paths.items():
+            # 매 실행마다 같은 초기 상태의 DB 사본 사용
+            run_db = args.workdir / 'run.db'
+            shutil.copyfile(db_path, run_db)
+            results.append(summarize(size, fmt, 'sqlite', measure(sheet_path, 'sqlite', run_db, args)))
+
+            if args.mysql_host:
+                load_mysql(db_path, args)
+                results.append(summarize(size, fmt, 'mysql', measure(sheet_path, 'mysql', args.mysql_database, args)))
+
+    print_table(results, baseline)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
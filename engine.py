@@ -0,0 +1,3339 @@
+"""Sheet2SQL 업데이트 엔진 (GUI 없이 설정 로드, 엑셀 읽기, 정규화, 매칭, DB 반영 수행)"""
+import os
+import sqlite3
+from configparser import ConfigParser
+import re
+import sys
+import itertools
+import threading
+import hashlib
+import zlib
+import queue
+import random
+import time
+import json
+import csv
+import tempfile
+import codecs
+import cProfile
+import logging
+from logging.handlers import RotatingFileHandler
+from datetime import datetime
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# /proc/self/statm의 RSS 단위 (페이지 크기)
+RSS_PAGE_BYTES = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# pandas, NumPy, MySQL 드라이버는 시작 시간을 줄이려고 처음 쓰는 함수 안에서 import (GUI 창이 먼저 뜨도록)
+
+# 전체 SQL/파라미터 등 상세 로그는 이 로거로만 남김 ([LOG] file을 지정하면 회전 로그 파일에 기록)
+logger = logging.getLogger('sheet2sql')
+
+# 매칭용 임시 스테이징 테이블 이름
+STAGING_TABLE = "sheet2sql_staging"
+
+# 한 쿼리에 넣을 수 있는 SQLite 바인딩 변수 수 (3.32 미만 기본값)
+SQLITE_MAX_VARIABLES = 999
+
+# 트랜잭션을 처음부터 다시 실행하면 되는 MySQL/MariaDB 오류 (교착 상태, 잠금 대기 시간 초과)
+LOCK_RETRY_ERRNOS = (1213, 1205)
+
+# MySQL/MariaDB 전화번호 키/스테이징 컬럼의 최대 길이 (utf8mb4 인덱스 키 한도 3072바이트 / 4)
+MYSQL_KEY_MAX_CHARS = 768
+
+# 문자열이 아닌(숫자) 전화번호 컬럼의 최대 자릿수 (DECIMAL 최대 정밀도)
+MYSQL_NUMERIC_MAX_DIGITS = 65
+
+# 지원하는 매칭 방식 (staging: 스테이징 테이블 조인, hash: 테이블을 한 번 훑어 기본 키로 업데이트)
+MATCH_MODES = ('staging', 'hash')
+
+# int64 키로 바꿀 수 있는 전화번호 최대 자릿수 ('1' + 18자리 < 2^63, 더 긴 번호는 문자열로 따로 보관)
+PHONE_KEY_MAX_DIGITS = 18
+
+# 로그에 표시할 DB 전화번호 샘플 수
+PHONE_SAMPLE_ROWS = 5
+
+# 설정 파일이 없을 때 만드는 기본 설정
+DEFAULT_CONFIG = {
+    'DATABASE': {
+        'type': 'sqlite',
+        'host': 'localhost',
+        'port': '3306',
+        'database': 'mydatabase.db',
+        'user': 'username',
+        'password': 'password',
+        'table': 'users',
+        'phone_column': 'phone_number',
+        'update_column': 'status',
+        'chunk_size': '5000',  # 한 번에 처리할 전화번호 수
+        'commit_interval': '1',  # 몇 개의 청크마다 커밋할지
+        'use_phone_key': 'False',  # 정규화 키 인덱스로 매칭할지
+        'phone_key_column': 'phone_key',  # MySQL/MariaDB 정규화 키 생성 컬럼명
+        'pool_size': '5',  # MySQL/MariaDB 커넥션 풀 크기
+        'match_mode': 'staging',  # staging 또는 hash (전화번호 컬럼에 인덱스를 만들 수 없을 때)
+        'primary_key': 'id',  # hash 매칭에서 업데이트할 행을 찾을 기본 키 컬럼
+        'parallel_connections': '1',  # MySQL/MariaDB 스테이징 매칭에서 전화번호를 나누어 동시에 실행할 연결 수
+        'lock_retries': '5',  # 교착 상태(1213)/잠금 대기 시간 초과(1205) 시 재시도 횟수
+        'retry_backoff': '0.2',  # 재시도 대기 시간 기준 (초, 재시도마다 두 배)
+        'skip_unchanged': 'False',  # 이미 같은 값인 행은 쓰지 않음 (binlog/복제 부하 감소)
+        'max_rows_per_transaction': '0'  # 한 트랜잭션에서 바꿀 최대 행 수 (0이면 제한 없음, commit_interval과 함께 적용)
+    },
+    'EXCEL': {
+        'phone_column_index': '1',  # 0부터 시작하므로 두 번째 열은 1
+        'start_row': '1',
+        'has_header': 'True',
+        'stream_read': 'True',  # 전화번호 열만 스트리밍으로 읽을지
+        'value_columns': '',  # 행마다 다른 값을 넣을 열 매핑 (예: 2:status, 3:memo)
+        'sheets': ''  # 함께 업데이트할 시트 이름 (쉼표로 구분, 전체는 *, 비워 두면 첫 시트)
+    },
+    # SQLite 연결에 적용할 PRAGMA
+    'SQLITE': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': '-65536',  # 음수는 KiB 단위 (64MB)
+        'temp_store': 'MEMORY',
+        'busy_timeout': '5000'
+    },
+    'CACHE': {
+        'memory_mb': '256',  # 파싱한 전화번호 열을 메모리에 보관할 최대 용량
+        'sidecar': 'False',  # Parquet 사이드카 파일로 디스크에도 보관할지 (pyarrow 필요)
+        'sidecar_dir': ''  # 비워 두면 엑셀 파일 옆 .sheet2sql_cache 폴더
+    },
+    # 실행별 단계 통계 보고서
+    'PROFILE': {
+        'report': 'True',  # 실행마다 JSON 보고서 저장
+        'report_dir': 'reports',
+        'cprofile': 'False'  # cProfile 결과(.prof)도 함께 저장할지
+    },
+    # 커밋된 전화번호를 기록하여 중단된 실행을 이어서 하고, 같은 파일/값을 다시 실행하면 변경분만 반영
+    'JOURNAL': {
+        'enabled': 'False',
+        'path': 'sheet2sql_journal.db'
+    },
+    # 감시 폴더 모드 (sheet2sql_watch.py): 폴더에 들어온 시트 파일을 차례로 업데이트하고 done/failed 폴더로 옮김
+    'WATCH': {
+        'directory': 'drop',
+        'done_dir': '',  # 비워 두면 <directory>/done
+        'failed_dir': '',  # 비워 두면 <directory>/failed
+        'patterns': '*.xlsx, *.xlsm, *.xls, *.csv, *.tsv, *.parquet',
+        'value_pattern': r'^(?P<value>[^_]+)__',  # 사이드카 파일(<파일 이름>.value)이 없을 때 파일 이름에서 값을 찾는 정규식
+        'poll_interval': '2',  # 폴더를 다시 훑는 간격(초, watchdog이 없을 때)
+        'settle_seconds': '2',  # 크기/수정 시각이 이 시간 동안 그대로여야 복사가 끝난 것으로 봄
+        'queue_size': '100'  # 처리 대기 파일 수 상한 (가득 차면 새 파일은 다음에 받음)
+    },
+    'LOG': {
+        'max_message_chars': '500',  # 화면/표준 에러로 보내는 메시지 최대 길이 (넘으면 잘라 냄)
+        'file': '',  # 전체 로그를 남길 회전 로그 파일 (비워 두면 사용 안 함)
+        'level': 'INFO',  # DEBUG면 청크별 전체 SQL과 파라미터도 기록
+        'max_bytes': '10485760',  # 로그 파일 하나의 최대 크기 (10MB)
+        'backup_count': '3'
+    }
+}
+
+
+def load_config(config_file, create=True):
+    """설정 파일을 로드하거나 없으면 기본 설정으로 생성 (create=False면 FileNotFoundError)"""
+    config = ConfigParser()
+    config_file = Path(config_file)
+    
+    if config_file.exists():
+        config.read(config_file)
+    elif create:
+        config.read_dict(DEFAULT_CONFIG)
+        
+        # 설정 파일 저장
+        with open(config_file, 'w') as f:
+            config.write(f)
+    else:
+        raise FileNotFoundError(f"설정 파일을 찾을 수 없습니다: {config_file}")
+    
+    return config
+
+
+def truncate_message(message, limit):
+    """limit자보다 긴 로그 메시지를 잘라 내고 생략한 글자 수 표시 (limit이 0 이하면 자르지 않음)"""
+    if limit <= 0 or len(message) <= limit:
+        return message
+    
+    return f"{message[:limit]}... ({len(message) - limit:,}자 생략)"
+
+
+def configure_file_logging(config):
+    """[LOG] 설정에 따라 sheet2sql 로거의 회전 로그 파일 핸들러를 (다시) 구성"""
+    for handler in list(logger.handlers):
+        if getattr(handler, 'sheet2sql_file', False):
+            logger.removeHandler(handler)
+            handler.close()
+    
+    log_file = config.get('LOG', 'file', fallback='')
+    
+    if not log_file:
+        logger.setLevel(logging.WARNING)
+        return
+    
+    handler = RotatingFileHandler(
+        log_file,
+        maxBytes=config.getint('LOG', 'max_bytes', fallback=10 * 1024 * 1024),
+        backupCount=config.getint('LOG', 'backup_count', fallback=3),
+        encoding='utf-8'
+    )
+    handler.sheet2sql_file = True
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(config.get('LOG', 'level', fallback='INFO').upper())
+
+
+def peak_rss_mb():
+    """프로세스 최대 메모리 사용량(RSS, MB) (resource 모듈이 없는 Windows에서는 None)"""
+    if resource is None:
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    # macOS는 바이트, Linux는 KiB 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """현재 메모리 사용량(RSS, MB) (/proc가 있는 Linux에서만, 그 밖에는 None)"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    
+    return resident_pages * RSS_PAGE_BYTES / (1024 * 1024)
+
+
+class PhaseProfiler:
+    """단계별 실행 시간(벽시계/CPU), 처리 행 수, 읽은 바이트, 실행한 SQL 문 수, 메모리 증가량 집계
+
+    여러 스레드에서 함께 써도 되며, 이때 단계 시간은 스레드별 시간의 합계
+    메모리 증가량(rss_growth_mb)은 단계 시작과 끝의 프로세스 RSS 차이 중 최댓값 (다른 스레드의 할당도 포함될 수 있음)
+    """
+    
+    def __init__(self):
+        self.phases = {}
+        self.lock = threading.Lock()
+    
+    def _stats(self, name):
+        with self.lock:
+            return self.phases.get(name) or self.phases.setdefault(name, {
+                'calls': 0,
+                'wall': 0.0,
+                'cpu': 0.0,
+                'rows': 0,
+                'bytes': 0,
+                'statements': 0,
+                'rss_growth_mb': None
+            })
+    
+    @contextmanager
+    def phase(self, name):
+        """블록 실행 시간을 name 단계에 누적 (CPU 시간은 현재 스레드 기준)"""
+        stats = self._stats(name)
+        rss_started = current_rss_mb()
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - cpu_started
+            rss_ended = current_rss_mb()
+            growth = rss_ended - rss_started if rss_started is not None and rss_ended is not None else None
+            
+            with self.lock:
+                stats['calls'] += 1
+                stats['wall'] += wall
+                stats['cpu'] += cpu
+                
+                if growth is not None:
+                    stats['rss_growth_mb'] = max(growth, stats['rss_growth_mb'] or 0.0)
+    
+    def count(self, name, rows=0, bytes=0, statements=0):
+        """name 단계의 처리 행 수, 읽은 바이트, 실행한 SQL 문 수 누적"""
+        stats = self._stats(name)
+        
+        with self.lock:
+            stats['rows'] += rows
+            stats['bytes'] += bytes
+            stats['statements'] += statements
+    
+    def timings(self):
+        """단계별 벽시계 시간 (초)"""
+        return {name: stats['wall'] for name, stats in self.phases.items()}
+    
+    def to_dict(self):
+        return {name: dict(stats) for name, stats in self.phases.items()}
+
+
+def normalize_phone_number(phone):
+    """전화번호 형식 정규화"""
+    if phone is None:
+        return None
+        
+    # 숫자만 추출
+    digits = re.sub(r'\D', '', str(phone))
+    
+    # 빈 문자열이면 None 반환
+    if not digits:
+        return None
+        
+    # 국가 코드 처리 (한국의 경우 +82 또는 82로 시작하는 경우)
+    if digits.startswith('82'):
+        digits = '0' + digits[2:]
+    
+    return digits
+
+
+def normalize_phone_series(series):
+    """전화번호 열 전체를 한 번에 정규화 (normalize_phone_number와 같은 규칙, NumPy 바이트 버퍼로 처리)"""
+    import pandas as pd
+    import numpy as np
+    
+    values = series.tolist()
+    
+    # str(phone)과 같은 문자열 변환 (None, NaN은 숫자가 없어 결측값이 됨)
+    texts = list(map(str, values))
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    joined = ''.join(texts)
+    
+    # 전각 숫자 등 비ASCII 문자가 있는 행은 re의 유니코드 \D 규칙을 따르도록 따로 처리
+    if joined.isascii():
+        is_ascii = np.ones(len(texts), dtype=bool)
+    else:
+        is_ascii = np.fromiter(map(str.isascii, texts), dtype=bool, count=len(texts))
+        texts = [text if ascii_row else '' for text, ascii_row in zip(texts, is_ascii)]
+        lengths[~is_ascii] = 0
+        joined = ''.join(texts)
+    
+    # 모든 행을 이어 붙인 바이트 버퍼에서 숫자만 추출하고 행별 숫자 개수 계산
+    buffer = np.frombuffer(joined.encode('ascii'), dtype=np.uint8)
+    is_digit = (buffer >= ord('0')) & (buffer <= ord('9'))
+    digits = buffer[is_digit]
+    row_starts = np.cumsum(lengths) - lengths
+    counts = np.add.reduceat(np.append(is_digit, False), row_starts, dtype=np.int64) if len(texts) else lengths
+    counts[lengths == 0] = 0
+    starts = np.cumsum(counts) - counts
+    
+    # 국가 코드 처리: 82로 시작하면 '8'을 지우고 '2'를 '0'으로 바꿈
+    rows = np.flatnonzero(counts >= 2)
+    rows = rows[(digits[starts[rows]] == ord('8')) & (digits[starts[rows] + 1] == ord('2'))]
+    digits[starts[rows] + 1] = ord('0')
+    keep = np.ones(len(digits), dtype=bool)
+    keep[starts[rows]] = False
+    digits = digits[keep]
+    counts[rows] -= 1
+    
+    # 행별 문자열로 다시 자르기 (빈 문자열은 None)
+    ends = np.cumsum(counts)
+    text = digits.tobytes().decode('ascii')
+    result = [text[start:end] or None for start, end in zip((ends - counts).tolist(), ends.tolist())]
+    
+    for i in np.flatnonzero(~is_ascii):
+        result[i] = normalize_phone_number(values[i])
+    
+    return pd.Series(result, index=series.index, dtype=object)
+
+
+def mysql_phone_key_expression(column):
+    """normalize_phone_number와 같은 규칙의 MySQL/MariaDB 정규화 식 생성"""
+    digits = f"REGEXP_REPLACE({column}, '[^0-9]', '')"
+    return f"NULLIF(IF({digits} LIKE '82%', CONCAT('0', SUBSTRING({digits}, 3)), {digits}), '')"
+
+
+# 대상 테이블 컬럼의 문자 집합, 콜레이션, 최대 문자 길이 (information_schema.COLUMNS)
+ColumnType = namedtuple('ColumnType', ['charset', 'collation', 'length'])
+
+
+def mysql_changed_condition(column, value):
+    """MySQL/MariaDB에서 컬럼 값이 새 값과 다른지 보는 조건 (NULL까지 같게 보는 <=>, 바이트 단위 비교)
+
+    대소문자를 구분하지 않거나 뒤 공백을 무시하는 콜레이션에서는 'done' → 'Done' 같은 실제 변경도 같은 값으로 보므로
+    양쪽을 BINARY로 바꿔 비교
+    """
+    return f"NOT (CAST({column} AS BINARY) <=> CAST({value} AS BINARY))"
+
+
+def mysql_value_length(column_type):
+    """대상 컬럼 값의 최대 문자 수 (문자열이 아니면 숫자 최대 자릿수, 인덱스 키 한도로 제한)"""
+    if column_type is None or column_type.length is None:
+        return MYSQL_NUMERIC_MAX_DIGITS
+    return min(int(column_type.length), MYSQL_KEY_MAX_CHARS)
+
+
+def mysql_charset_clause(column_type):
+    """대상 컬럼과 같은 문자 집합/콜레이션을 지정하는 컬럼 정의 절 (문자열 컬럼이 아니거나 모르면 빈 문자열)"""
+    if column_type is None or not column_type.charset or not column_type.collation:
+        return ""
+    return f" CHARACTER SET {column_type.charset} COLLATE {column_type.collation}"
+
+
+def phone_match_variants(phone):
+    """정규화된 전화번호로 DB에서 매칭할 형식 목록 반환 (숫자만, 하이픈 포함)"""
+    variants = [phone]
+    
+    # 10-11자리 번호는 하이픈 형식도 매칭 (예: 01012345678 -> 010-1234-5678)
+    if len(phone) == 10:
+        variants.append(f"{phone[:3]}-{phone[3:6]}-{phone[6:]}")
+    elif len(phone) == 11:
+        variants.append(f"{phone[:3]}-{phone[3:7]}-{phone[7:]}")
+    
+    return variants
+
+
+def iter_chunks(items, size):
+    """리스트를 size 크기의 청크로 나누어 순서대로 반환"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def encode_phone_keys(phones):
+    """정규화된 전화번호 리스트를 int64 키 배열로 변환
+
+    키는 '1' + 숫자를 정수로 읽은 값이라 선행 0과 자릿수가 보존됨 (010… → 1010…)
+    None과 키로 바꾸면 원래 문자열로 돌아오지 않는 번호(PHONE_KEY_MAX_DIGITS자리 초과, 전각 숫자 등)는 0이고,
+    두 번째 반환값은 그런 번호(문자열로 따로 다뤄야 하는 행)의 bool 배열
+    """
+    import numpy as np
+    
+    texts = [phone or '' for phone in phones] if None in phones else phones
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    as_text = lengths > PHONE_KEY_MAX_DIGITS
+    
+    if not ''.join(texts).isascii():
+        as_text |= ~np.fromiter(map(str.isascii, texts), dtype=bool, count=len(texts))
+    
+    valid = (lengths > 0) & ~as_text
+    keys = np.zeros(len(texts), dtype=np.int64)
+    
+    if valid.all():
+        keys = np.fromiter(map(int, texts), dtype=np.int64, count=len(texts)) + 10 ** lengths
+    elif valid.any():
+        digits = np.fromiter(map(int, itertools.compress(texts, valid.tolist())), dtype=np.int64, count=int(valid.sum()))
+        keys[valid] = digits + 10 ** lengths[valid]
+    
+    return keys, as_text
+
+
+def decode_phone_keys(keys):
+    """encode_phone_keys로 만든 키 배열을 전화번호 문자열 리스트로 되돌림"""
+    return [str(key)[1:] for key in keys.tolist()]
+
+
+def sorted_contains(sorted_keys, keys):
+    """keys의 각 값이 정렬된 배열 sorted_keys에 있는지 bool 배열로 반환 (이진 탐색)"""
+    import numpy as np
+    
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=bool)
+    
+    positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[positions] == keys
+
+
+class PhoneKeys:
+    """정규화된 전화번호 집합 (정렬·중복 제거한 int64 키 배열 + 키로 바꿀 수 없는 번호의 문자열 집합)
+
+    문자열 집합보다 전화번호당 메모리가 훨씬 적고(8바이트), 중복 제거와 포함 여부 확인을 배열 연산으로 처리
+    """
+    
+    def __init__(self, keys=None, overflow=()):
+        import numpy as np
+        
+        self.keys = np.zeros(0, dtype=np.int64) if keys is None else keys
+        self.overflow = set(overflow)
+    
+    @classmethod
+    def from_phones(cls, phones):
+        """전화번호 리스트로 집합 생성 (None은 무시)"""
+        import numpy as np
+        
+        phones = phones if isinstance(phones, list) else list(phones)
+        keys, as_text = encode_phone_keys(phones)
+        overflow = [phones[i] for i in np.flatnonzero(as_text)]
+        return cls(np.unique(keys[keys > 0]), overflow)
+    
+    def __len__(self):
+        return len(self.keys) + len(self.overflow)
+    
+    @property
+    def nbytes(self):
+        return int(self.keys.nbytes) + sum(len(phone) + 50 for phone in self.overflow)
+    
+    def contains(self, phones):
+        """전화번호 리스트의 각 항목이 집합에 있는지 bool 배열로 반환 (None은 False)"""
+        import numpy as np
+        
+        phones = phones if isinstance(phones, list) else list(phones)
+        keys, as_text = encode_phone_keys(phones)
+        found = sorted_contains(self.keys, keys) & (keys > 0)
+        
+        if self.overflow:
+            for i in np.flatnonzero(as_text):
+                found[i] = phones[i] in self.overflow
+        
+        return found
+    
+    def difference(self, other):
+        """other(PhoneKeys 또는 전화번호 반복 가능 객체)에 없는 전화번호만 담은 새 집합"""
+        if not isinstance(other, PhoneKeys):
+            other = PhoneKeys.from_phones(other)
+        
+        return PhoneKeys(self.keys[~sorted_contains(other.keys, self.keys)], self.overflow - other.overflow)
+    
+    def update(self, other):
+        """other(PhoneKeys 또는 전화번호 반복 가능 객체)의 전화번호를 추가"""
+        import numpy as np
+        
+        if not isinstance(other, PhoneKeys):
+            other = PhoneKeys.from_phones(other)
+        
+        # 없는 키만 정렬 위치에 끼워 넣음 (전체를 다시 정렬하지 않음)
+        new_keys = other.keys[~sorted_contains(self.keys, other.keys)]
+        
+        if len(new_keys):
+            self.keys = np.insert(self.keys, np.searchsorted(self.keys, new_keys), new_keys)
+        
+        self.overflow |= other.overflow
+    
+    def tolist(self):
+        """전화번호 문자열 리스트 (키 순서: 자릿수, 숫자 순)"""
+        return decode_phone_keys(self.keys) + sorted(self.overflow)
+    
+    def iter_chunks(self, size):
+        """size개씩 나눈 전화번호 문자열 리스트를 순서대로 반환 (키 배열은 필요한 부분만 문자열로 변환)"""
+        for start in range(0, len(self.keys), size):
+            yield decode_phone_keys(self.keys[start:start + size])
+        
+        yield from iter_chunks(sorted(self.overflow), size)
+
+
+def detect_sheet_format(file_path):
+    """시트 파일 형식 판별 (파일 앞부분 시그니처 우선, 알 수 없으면 확장자)
+
+    'xlsx': openpyxl 스트리밍, 'excel': pandas read_excel (.xls 등), 'csv': CSV/TSV, 'parquet': Parquet
+    """
+    suffix = Path(file_path).suffix.lower()
+    
+    with open(file_path, 'rb') as f:
+        head = f.read(8)
+    
+    if head.startswith(b'PAR1'):
+        return 'parquet'
+    if head.startswith(b'\xd0\xcf\x11\xe0'):  # OLE2 (.xls)
+        return 'excel'
+    if head.startswith(b'PK\x03\x04'):
+        # ZIP 기반 중 .xlsb, .ods 등은 openpyxl로 읽을 수 없음
+        return 'excel' if suffix in ('.xlsb', '.ods') else 'xlsx'
+    
+    if suffix in ('.xlsx', '.xlsm'):
+        return 'xlsx'
+    if suffix in ('.xls', '.xlsb', '.ods'):
+        return 'excel'
+    if suffix == '.parquet':
+        return 'parquet'
+    return 'csv'
+
+
+def sniff_csv_options(file_path):
+    """CSV 인코딩과 구분자 추정 (UTF-8로 읽을 수 없으면 CP949, 구분자는 앞부분 몇 줄로 판별)"""
+    with open(file_path, 'rb') as f:
+        head = f.read(65536)
+    
+    if head.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    else:
+        try:
+            # 잘린 마지막 글자는 무시하도록 증분 디코더 사용
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+            encoding = 'utf-8'
+        except UnicodeDecodeError:
+            encoding = 'cp949'
+    
+    if Path(file_path).suffix.lower() == '.tsv':
+        return encoding, '\t'
+    
+    sample = head.decode(encoding, errors='ignore')
+    
+    try:
+        delimiter = csv.Sniffer().sniff(sample[:sample.rfind('\n') + 1] or sample, delimiters=',\t;|').delimiter
+    except csv.Error:
+        delimiter = ','
+    
+    return encoding, delimiter
+
+
+def list_sheet_names(file_path):
+    """통합 문서의 시트 이름 목록 (CSV, Parquet처럼 시트가 없는 형식은 빈 목록)"""
+    import pandas as pd
+    
+    sheet_format = detect_sheet_format(file_path)
+    
+    if sheet_format == 'xlsx':
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True)
+        
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    
+    if sheet_format == 'excel':
+        with pd.ExcelFile(file_path) as workbook:
+            return [str(name) for name in workbook.sheet_names]
+    
+    return []
+
+
+def parse_sheet_names(text):
+    """시트 선택 설정을 이름 목록으로 변환 (예: "1월, 2월", 전체 시트는 "*")"""
+    return [name for name in (part.strip() for part in text.split(',')) if name]
+
+
+def resolve_sheet_names(file_path, sheets):
+    """선택한 시트 이름을 확인하여 읽을 시트 목록 반환 (선택이 없거나 시트가 없는 형식이면 [None] = 첫 시트)"""
+    if not sheets:
+        return [None]
+    
+    available = list_sheet_names(file_path)
+    
+    if not available:
+        return [None]
+    
+    if '*' in sheets:
+        return available
+    
+    missing = [name for name in sheets if name not in available]
+    
+    if missing:
+        raise ValueError(f"시트를 찾을 수 없습니다: {', '.join(missing)} (시트 목록: {', '.join(available)})")
+    
+    return list(dict.fromkeys(sheets))
+
+
+def iter_sheet_columns(file_path, col_idxs, start_row, has_header, chunk_size, stream=True, on_size=None, sheet=None):
+    """시트 파일에서 col_idxs 열만 읽어 chunk_size 행씩 열별 원본 값 리스트 튜플로 반환 (col_idxs 순서)
+
+    형식은 detect_sheet_format으로 판별하고, sheet가 None이면 첫 시트를 읽음
+    CSV는 모든 열을 문자열로 읽고(앞자리 0 유지), Parquet은 스키마의 열 이름이 헤더이므로 start_row/has_header를 무시함
+    on_size가 있으면 읽기 전에 예상 데이터 행 수(알 수 없으면 None)로 한 번 호출
+    """
+    import pandas as pd
+    
+    # 헤더가 있으면 start_row 행이 헤더, 없으면 start_row 행부터 데이터 (0부터 시작)
+    first_data_row = start_row + 1 if has_header else start_row
+    sheet_format = detect_sheet_format(file_path)
+    
+    if sheet_format == 'csv':
+        yield from _iter_csv_columns(file_path, col_idxs, first_data_row, chunk_size, on_size)
+    
+    elif sheet_format == 'parquet':
+        yield from _iter_parquet_columns(file_path, col_idxs, chunk_size, on_size)
+    
+    elif stream and sheet_format == 'xlsx':
+        from openpyxl import load_workbook
+        
+        # read_only 모드로 행을 순서대로 읽으면서 필요한 열의 값만 보관
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        
+        try:
+            sheet = workbook.worksheets[0] if sheet is None else workbook[sheet]
+            
+            # 시트 크기 정보가 없거나(스트리밍으로 쓴 파일) 잘못 기록된(A1:A1) 경우 무시하고 끝까지 읽음
+            if sheet.max_row is None or sheet.calculate_dimension() == "A1:A1":
+                sheet.reset_dimensions()
+            elif sheet.max_column is not None and max(col_idxs) >= sheet.max_column:
+                raise ValueError(f"열 인덱스({max(col_idxs)})가 범위를 벗어났습니다. 열 개수: {sheet.max_column}")
+            
+            if on_size is not None:
+                on_size(max(sheet.max_row - first_data_row, 0) if sheet.max_row else None)
+            
+            min_col = min(col_idxs)
+            offsets = [idx - min_col for idx in col_idxs]
+            rows = sheet.iter_rows(
+                min_row=first_data_row + 1,  # openpyxl은 1부터 시작
+                min_col=min_col + 1,
+                max_col=max(col_idxs) + 1,
+                values_only=True
+            )
+            
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                yield tuple(
+                    [row[offset] if offset < len(row) else None for row in chunk]
+                    for offset in offsets
+                )
+        finally:
+            workbook.close()
+    
+    else:
+        # .xls 등 openpyxl로 읽을 수 없는 형식은 pandas로 필요한 열만 읽음
+        df = pd.read_excel(file_path, sheet_name=0 if sheet is None else sheet, header=None,
+                           skiprows=first_data_row, usecols=sorted(set(col_idxs)))
+        
+        if on_size is not None:
+            on_size(len(df))
+        
+        # 빈 칸(NaN)은 None, NumPy 값은 파이썬 값으로 (DB 드라이버에 그대로 넘길 수 있도록)
+        columns = [df[idx].astype(object).where(df[idx].notna(), None).tolist() for idx in col_idxs]
+        
+        for start in range(0, len(df), chunk_size):
+            yield tuple(column[start:start + chunk_size] for column in columns)
+
+
+def _iter_csv_columns(file_path, col_idxs, first_data_row, chunk_size, on_size):
+    """CSV를 pyarrow 멀티스레드 파서로 필요한 열만 문자열로 읽음 (pyarrow가 없으면 pandas로 청크 단위 읽기)"""
+    import pandas as pd
+    
+    encoding, delimiter = sniff_csv_options(file_path)
+    names = [f"f{idx}" for idx in col_idxs]
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa = None
+    
+    if pa is not None:
+        unique_names = list(dict.fromkeys(names))
+        
+        try:
+            table = pa_csv.read_csv(
+                file_path,
+                read_options=pa_csv.ReadOptions(
+                    use_threads=True,
+                    skip_rows=first_data_row,
+                    autogenerate_column_names=True,  # 열 이름 f0, f1, ...
+                    encoding=encoding
+                ),
+                parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=unique_names,
+                    column_types={name: pa.string() for name in unique_names},
+                    strings_can_be_null=True  # 빈 칸은 None
+                )
+            )
+        except KeyError as e:
+            # 없는 열을 지정하면 pyarrow가 ArrowKeyError를 냄
+            if 'include_columns' in str(e):
+                raise ValueError(f"열 인덱스({max(col_idxs)})가 범위를 벗어났습니다.") from e
+            raise
+        
+        if on_size is not None:
+            on_size(table.num_rows)
+        
+        columns = [table.column(name) for name in names]
+        
+        for start in range(0, table.num_rows, chunk_size):
+            yield tuple(column.slice(start, chunk_size).to_pylist() for column in columns)
+        return
+    
+    if on_size is not None:
+        on_size(None)
+    
+    reader = pd.read_csv(
+        file_path, header=None, skiprows=first_data_row, usecols=sorted(set(col_idxs)), dtype=str,
+        sep=delimiter, encoding=encoding, keep_default_na=False, na_values=[''], chunksize=chunk_size
+    )
+    
+    with reader:
+        for df in reader:
+            yield tuple(df[idx].astype(object).where(df[idx].notna(), None).tolist() for idx in col_idxs)
+
+
+def _iter_parquet_columns(file_path, col_idxs, chunk_size, on_size):
+    """Parquet에서 필요한 열만 배치 단위로 읽음 (열 투영으로 나머지 열은 디스크에서 읽지 않음)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet 파일을 읽으려면 pyarrow가 필요합니다. (pip install pyarrow)")
+    
+    parquet_file = pq.ParquetFile(file_path)
+    
+    try:
+        schema_names = parquet_file.schema_arrow.names
+        
+        if max(col_idxs) >= len(schema_names):
+            raise ValueError(f"열 인덱스({max(col_idxs)})가 범위를 벗어났습니다. 열 개수: {len(schema_names)}")
+        
+        if on_size is not None:
+            on_size(parquet_file.metadata.num_rows)
+        
+        names = [schema_names[idx] for idx in col_idxs]
+        
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=list(dict.fromkeys(names))):
+            yield tuple(batch.column(name).to_pylist() for name in names)
+    finally:
+        parquet_file.close()
+
+
+def read_sheet_columns(file_path, col_idxs, start_row, has_header, sheet=None):
+    """시트 하나의 col_idxs 열 전체를 열별 리스트 튜플로 반환 (여러 시트를 병렬로 읽는 작업 프로세스용)"""
+    columns = tuple([] for _ in col_idxs)
+    
+    for chunk in iter_sheet_columns(file_path, col_idxs, start_row, has_header, 65536, sheet=sheet):
+        for column, values in zip(columns, chunk):
+            column.extend(values)
+    
+    return columns
+
+
+def iter_sheets_parallel(file_path, col_idxs, start_row, has_header, sheet_names, chunk_size, on_size=None):
+    """여러 시트를 작업 프로세스에서 동시에 읽고 시트 순서대로 chunk_size 행씩 열별 리스트 튜플로 반환
+
+    앞 시트의 청크를 처리하는 동안 나머지 시트를 계속 읽음 (openpyxl 파싱은 GIL에 묶이므로 스레드 대신 프로세스)
+    """
+    if on_size is not None:
+        on_size(None)
+    
+    # GUI/DB 스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+    executor = ProcessPoolExecutor(
+        max_workers=min(len(sheet_names), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+    
+    try:
+        futures = [
+            executor.submit(read_sheet_columns, file_path, col_idxs, start_row, has_header, name)
+            for name in sheet_names
+        ]
+        
+        for future in futures:
+            columns = future.result()
+            
+            for start in range(0, len(columns[0]), chunk_size):
+                yield tuple(column[start:start + chunk_size] for column in columns)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def read_sheet_preview(file_path, start_row, has_header, nrows, sheet=None):
+    """미리보기용으로 앞부분 nrows 행을 DataFrame으로 읽음 (형식 자동 판별)"""
+    import pandas as pd
+    
+    sheet_format = detect_sheet_format(file_path)
+    
+    if sheet_format == 'csv':
+        encoding, delimiter = sniff_csv_options(file_path)
+        
+        if has_header:
+            return pd.read_csv(file_path, header=start_row, nrows=nrows, dtype=str, sep=delimiter, encoding=encoding)
+        return pd.read_csv(file_path, header=None, skiprows=start_row, nrows=nrows, dtype=str, sep=delimiter,
+                           encoding=encoding)
+    
+    if sheet_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet 파일을 읽으려면 pyarrow가 필요합니다. (pip install pyarrow)")
+        
+        parquet_file = pq.ParquetFile(file_path)
+        
+        try:
+            batch = next(parquet_file.iter_batches(batch_size=nrows), None)
+            return (batch if batch is not None else parquet_file.schema_arrow.empty_table()).to_pandas()
+        finally:
+            parquet_file.close()
+    
+    sheet_name = 0 if sheet is None else sheet
+    
+    if has_header:
+        return pd.read_excel(file_path, sheet_name=sheet_name, header=start_row, nrows=nrows)
+    return pd.read_excel(file_path, sheet_name=sheet_name, header=None, skiprows=start_row, nrows=nrows)
+
+
+class PreviewStore:
+    """미리보기용으로 시트 전체 행을 임시 SQLite 파일에 쌓아 두고 필요한 범위만 조회 (메모리는 시트 크기와 무관)
+
+    전화번호 정규화에 실패한 행에는 따로 순번(bad_no)을 매겨 필터 보기에서도 인덱스 범위 조회로 찾음
+    쌓는 작업(작업 스레드)과 조회(화면 스레드)가 같은 연결을 쓰므로 잠금으로 보호
+    """
+    
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows = 0
+        self.bad_rows = 0
+        self.complete = False
+        self.lock = threading.Lock()
+        
+        fd, self.path = tempfile.mkstemp(prefix="sheet2sql_preview_", suffix=".db")
+        os.close(fd)
+        
+        # 다시 만들 수 있는 임시 데이터이므로 저널과 동기화 없이 기록
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        value_columns = ", ".join(f"c{i} TEXT" for i in range(len(self.columns)))
+        self.conn.execute(f"CREATE TABLE rows (row_no INTEGER PRIMARY KEY, bad_no INTEGER, {value_columns})")
+        self.conn.execute("CREATE INDEX rows_bad_no ON rows (bad_no) WHERE bad_no IS NOT NULL")
+        self.select_columns = ", ".join(f"c{i}" for i in range(len(self.columns)))
+    
+    @staticmethod
+    def display_value(value):
+        """셀 값을 화면에 표시할 문자열로 변환 (None, NaN은 None)"""
+        if value is None or value != value:
+            return None
+        return str(value)
+    
+    def append(self, columns, valid):
+        """열별 값 리스트 청크와 행별 전화번호 정규화 성공 여부를 이어서 저장"""
+        rows = []
+        row_no = self.rows
+        bad_no = self.bad_rows
+        
+        for row, ok in zip(zip(*columns), valid):
+            row_no += 1
+            rows.append((row_no, None if ok else bad_no, *map(self.display_value, row)))
+            
+            if not ok:
+                bad_no += 1
+        
+        placeholders = ", ".join("?" * (len(self.columns) + 2))
+        
+        with self.lock:
+            # 새 미리보기로 바뀌어 이미 닫힌 저장소면 버림
+            if self.conn is None:
+                return
+            self.conn.executemany(f"INSERT INTO rows VALUES ({placeholders})", rows)
+            self.conn.commit()
+            self.rows = row_no
+            self.bad_rows = bad_no
+    
+    def count(self, invalid_only=False):
+        """지금까지 저장한 행 수 (invalid_only면 정규화 실패 행 수)"""
+        return self.bad_rows if invalid_only else self.rows
+    
+    def fetch(self, offset, limit, invalid_only=False):
+        """보기에서 offset번째(0부터)부터 limit개 행을 (데이터 행 번호, 값 튜플) 리스트로 반환"""
+        if invalid_only:
+            sql = f"SELECT row_no, {self.select_columns} FROM rows WHERE bad_no >= ? ORDER BY bad_no LIMIT ?"
+        else:
+            sql = f"SELECT row_no, {self.select_columns} FROM rows WHERE row_no > ? ORDER BY row_no LIMIT ?"
+        
+        with self.lock:
+            if self.conn is None:
+                return []
+            return [(row[0], row[1:]) for row in self.conn.execute(sql, (offset, limit))]
+    
+    def position_of(self, row_no, invalid_only=False):
+        """데이터 행 번호(1부터)가 보기에서 몇 번째(0부터)인지 (필터 보기면 그 행 이후 첫 정규화 실패 행)"""
+        if not invalid_only:
+            return max(row_no - 1, 0)
+        
+        with self.lock:
+            if self.conn is None:
+                return 0
+            found = self.conn.execute(
+                "SELECT MIN(bad_no) FROM rows WHERE bad_no IS NOT NULL AND row_no >= ?", (row_no,)
+            ).fetchone()[0]
+        
+        return self.bad_rows if found is None else found
+    
+    def close(self):
+        """연결을 닫고 임시 파일 삭제"""
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.close()
+            self.conn = None
+        
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def iter_phone_column(file_path, phone_col_idx, start_row, has_header, chunk_size, stream=True, on_size=None, sheet=None):
+    """시트 파일에서 전화번호 열만 읽어 chunk_size 행씩 원본 값 리스트로 반환"""
+    for (values,) in iter_sheet_columns(file_path, [phone_col_idx], start_row, has_header, chunk_size, stream, on_size,
+                                        sheet):
+        yield values
+
+
+def parse_value_columns(text):
+    """값 열 매핑 설정을 (엑셀 열 인덱스, DB 컬럼) 목록으로 변환 (예: "2:status, 3:memo")"""
+    mapping = []
+    
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        col_idx, sep, column = (part.strip() for part in item.partition(':'))
+        
+        if not sep or not col_idx.isdigit() or not re.fullmatch(r'\w+', column):
+            raise ValueError(f"잘못된 값 열 매핑: {item} (예: 2:status)")
+        
+        mapping.append((int(col_idx), column))
+    
+    if len({column for _, column in mapping}) != len(mapping):
+        raise ValueError(f"같은 DB 컬럼이 값 열 매핑에 두 번 이상 있습니다: {text}")
+    
+    return mapping
+
+
+# 캐시에 보관하는 시트 데이터 (정규화된 전화번호 PhoneKeys, 읽은 데이터 행 수, 제외한 중복 전화번호 수)
+CachedSheet = namedtuple('CachedSheet', ['phones', 'rows', 'duplicates'], defaults=(0,))
+
+
+class SheetCache:
+    """파싱한 전화번호 열 캐시 (메모리 LRU + 선택적 Parquet 사이드카 파일)
+
+    키에 파일 경로, 수정 시각, 크기와 읽기 설정이 들어가므로 파일이 바뀌면 자동으로 무효화됨
+    """
+    
+    def __init__(self, max_bytes, sidecar=False, sidecar_dir=None):
+        self.max_bytes = max_bytes
+        self.sidecar = sidecar
+        self.sidecar_dir = sidecar_dir
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+    
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 or self.sidecar
+    
+    @staticmethod
+    def make_key(file_path, start_row, has_header, phone_col_idx, sheets=(None,)):
+        """캐시 키 생성 (파일이 수정되면 mtime/크기가 달라져 다른 키가 됨)"""
+        stat = os.stat(file_path)
+        return (str(Path(file_path).resolve()), stat.st_mtime_ns, stat.st_size, start_row, has_header, phone_col_idx,
+                tuple(sheets))
+    
+    def get(self, key):
+        """캐시된 시트 반환 (메모리 → 사이드카 순으로 확인, 없으면 None)"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        
+        cached = self._read_sidecar(key)
+        
+        if cached is not None:
+            self._remember(key, cached)
+        
+        return cached
+    
+    def put(self, key, cached):
+        """시트 데이터를 캐시에 저장하고 같은 파일의 이전 버전은 제거"""
+        self._remember(key, cached)
+        self._write_sidecar(key, cached)
+    
+    def clear(self):
+        """메모리 캐시 비우기"""
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.total_bytes = 0
+    
+    def _remember(self, key, cached):
+        """메모리 LRU에 저장하고 용량 상한을 넘으면 오래된 항목부터 제거"""
+        size = cached.phones.nbytes
+        
+        with self.lock:
+            # 같은 파일의 다른 버전(수정 전 내용)은 더 이상 쓸 일이 없으므로 제거
+            for old_key in [k for k in self.entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._evict(old_key)
+            
+            if key in self.entries:
+                self._evict(key)
+            
+            if size > self.max_bytes:
+                return
+            
+            self.entries[key] = cached
+            self.sizes[key] = size
+            self.total_bytes += size
+            
+            while self.total_bytes > self.max_bytes:
+                self._evict(next(iter(self.entries)))
+    
+    def _evict(self, key):
+        del self.entries[key]
+        self.total_bytes -= self.sizes.pop(key)
+    
+    def _sidecar_paths(self, key):
+        """(사이드카 디렉터리, 파일 이름 접두어, 키에 해당하는 사이드카 경로) 반환"""
+        source = Path(key[0])
+        directory = Path(self.sidecar_dir) if self.sidecar_dir else source.parent / ".sheet2sql_cache"
+        prefix = hashlib.sha1(key[0].encode('utf-8')).hexdigest()[:12]
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:12]
+        return directory, prefix, directory / f"{source.stem}.{prefix}-{digest}.parquet"
+    
+    def _read_sidecar(self, key):
+        if not self.sidecar:
+            return None
+        
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        
+        import numpy as np
+        
+        _, _, path = self._sidecar_paths(key)
+        
+        if not path.exists():
+            return None
+        
+        try:
+            table = pq.read_table(path)
+            metadata = table.schema.metadata
+            keys = table.column('key').to_numpy()
+            overflow = json.loads(metadata[b'sheet2sql_overflow'])
+            rows = int(metadata[b'sheet2sql_rows'])
+            duplicates = int(metadata[b'sheet2sql_duplicates'])
+        except Exception:
+            # 깨진(또는 이전 형식의) 사이드카는 무시하고 다시 파싱
+            return None
+        
+        return CachedSheet(PhoneKeys(keys.astype(np.int64), overflow), rows, duplicates)
+    
+    def _write_sidecar(self, key, cached):
+        if not self.sidecar:
+            return
+        
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return
+        
+        directory, prefix, path = self._sidecar_paths(key)
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        # 같은 원본 파일의 이전 사이드카 삭제
+        for stale in directory.glob(f"*.{prefix}-*.parquet"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        
+        # 키 배열은 int64 열로, 키로 바꿀 수 없는 번호는 메타데이터에 저장
+        table = pa.table({'key': pa.array(cached.phones.keys, type=pa.int64())})
+        table = table.replace_schema_metadata({
+            'sheet2sql_rows': str(cached.rows),
+            'sheet2sql_duplicates': str(cached.duplicates),
+            'sheet2sql_overflow': json.dumps(sorted(cached.phones.overflow), ensure_ascii=False)
+        })
+        
+        # 쓰는 도중 중단되어도 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+        temp_path = path.with_suffix('.tmp')
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+
+
+class ConnectionManager:
+    """DB 연결 재사용 관리 (MySQL/MariaDB: pool_size개까지 유휴 연결을 보관하는 풀, SQLite: PRAGMA를 적용한 지속 연결)
+
+    연결 설정이 바뀌면 기존 풀과 연결을 버리고 새로 만듦
+    풀은 직접 관리하므로 무효화할 때 유휴 연결을 확실히 닫고, 사용 중인 연결은 반납할 때 닫음
+    """
+    
+    # 연결 자체에 영향을 주는 DATABASE 설정 항목
+    CONNECTION_KEYS = ('type', 'host', 'port', 'database', 'user', 'password', 'pool_size')
+    
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.settings = None
+        self.sqlite_conn = None
+        self.sqlite_in_use = False
+        
+        # MySQL/MariaDB 풀: 유휴 연결, 풀에 속한 연결 수(사용 중 포함), 사용 중인 연결의 세대
+        # (무효화하면 세대가 바뀌어 이전 세대 연결은 반납할 때 닫힘)
+        self.idle = []
+        self.pooled_count = 0
+        self.generation = 0
+        self.checked_out = {}
+    
+    def current_settings(self):
+        """현재 설정에서 연결에 영향을 주는 값들의 스냅샷"""
+        database = tuple(self.config.get('DATABASE', key, fallback='') for key in self.CONNECTION_KEYS)
+        pragmas = tuple(self.config.items('SQLITE')) if self.config.has_section('SQLITE') else ()
+        return database, pragmas
+    
+    def refresh(self):
+        """연결 설정이 바뀌었으면 기존 풀과 연결을 무효화"""
+        with self.lock:
+            if self.settings is not None and self.settings != self.current_settings():
+                self._invalidate()
+    
+    def invalidate(self):
+        """풀과 지속 연결을 모두 닫음"""
+        with self.lock:
+            self._invalidate()
+    
+    def get_connection(self):
+        """재사용 가능한 연결 반환 (사용 후 release로 반납)"""
+        self.refresh()
+        db_type = self.config.get('DATABASE', 'type')
+        
+        with self.lock:
+            self.settings = self.current_settings()
+            
+            if db_type == 'sqlite':
+                # 지속 연결이 다른 작업에서 사용 중이면 이번 작업만 임시 연결 사용
+                if self.sqlite_in_use:
+                    return self._open_sqlite()
+                
+                if self.sqlite_conn is None:
+                    self.sqlite_conn = self._open_sqlite(check_same_thread=False)
+                
+                self.sqlite_in_use = True
+                return self.sqlite_conn
+            
+            elif db_type not in ['mysql', 'mariadb']:
+                raise ValueError(f"지원하지 않는 데이터베이스 유형: {db_type}")
+            
+            pool_size = self.config.getint('DATABASE', 'pool_size', fallback=5)
+            
+            if pool_size < 1:
+                raise ValueError("pool_size는 1 이상이어야 합니다.")
+            
+            generation = self.generation
+            conn = self.idle.pop() if self.idle else None
+            pooled = conn is not None or self.pooled_count < pool_size
+            
+            if conn is None and pooled:
+                self.pooled_count += 1
+        
+        # MySQL 드라이버는 처음 연결할 때 로드 (SQLite만 쓰면 로드하지 않음)
+        import mysql.connector
+        
+        if conn is None:
+            if not pooled:
+                # 풀이 모두 사용 중이면 풀 밖의 연결을 따로 만듦 (반납하면 닫힘)
+                logger.warning(f"커넥션 풀({pool_size}개)이 모두 사용 중이라 풀 밖의 연결을 새로 엽니다.")
+            
+            try:
+                conn = mysql.connector.connect(**self._mysql_options())
+            except Exception:
+                if pooled:
+                    self._forget(generation)
+                raise
+        else:
+            # 상태 확인: 서버가 끊은 유휴 연결이면 다시 연결
+            try:
+                conn.ping(reconnect=True, attempts=2, delay=1)
+            except mysql.connector.Error:
+                self._close_quietly(conn)
+                self._forget(generation)
+                raise
+        
+        if pooled:
+            with self.lock:
+                self.checked_out[id(conn)] = generation
+        
+        return conn
+    
+    def release(self, conn):
+        """연결 반납 (SQLite 지속 연결은 열어 둔 채 보관, 현재 풀의 연결은 세션을 초기화해 유휴 연결로 보관)"""
+        with self.lock:
+            if conn is self.sqlite_conn:
+                if conn.in_transaction:
+                    conn.rollback()
+                self.sqlite_in_use = False
+                return
+            
+            generation = self.checked_out.pop(id(conn), None)
+            reusable = generation is not None and generation == self.generation
+        
+        if reusable:
+            # 다음 사용자가 이전 작업의 트랜잭션, 임시 테이블, 세션 변수를 보지 않도록 초기화
+            try:
+                conn.rollback()
+                conn.reset_session()
+            except Exception as e:
+                logger.warning(f"반납한 연결의 세션 초기화 실패, 연결을 닫습니다: {e}")
+                reusable = False
+        
+        if reusable:
+            with self.lock:
+                if generation == self.generation:
+                    self.idle.append(conn)
+                    return
+        
+        # 풀 밖의 연결, 이전 세대 연결, 초기화하지 못한 연결은 닫음
+        if generation is not None:
+            self._forget(generation)
+        
+        self._close_quietly(conn)
+    
+    def _forget(self, generation):
+        """현재 세대 풀 연결 하나가 없어졌음을 반영 (다음에 새 연결을 열 수 있도록)"""
+        with self.lock:
+            if generation == self.generation:
+                self.pooled_count -= 1
+    
+    @staticmethod
+    def _close_quietly(conn):
+        """연결을 닫고 실패하면 로그만 남김"""
+        try:
+            conn.close()
+        except Exception as e:
+            logger.warning(f"DB 연결을 닫는 중 오류: {e}")
+    
+    def _invalidate(self):
+        if self.sqlite_conn is not None and not self.sqlite_in_use:
+            self.sqlite_conn.close()
+        self.sqlite_conn = None
+        self.sqlite_in_use = False
+        
+        # 유휴 연결은 바로 닫고, 사용 중인 연결은 세대가 바뀌었으므로 반납할 때 닫힘
+        for conn in self.idle:
+            self._close_quietly(conn)
+        
+        self.idle = []
+        self.pooled_count = 0
+        self.generation += 1
+        self.settings = None
+    
+    def _mysql_options(self):
+        return {
+            'host': self.config.get('DATABASE', 'host'),
+            'port': self.config.getint('DATABASE', 'port'),
+            'database': self.config.get('DATABASE', 'database'),
+            'user': self.config.get('DATABASE', 'user'),
+            'password': self.config.get('DATABASE', 'password'),
+            'charset': 'utf8mb4',
+            'collation': 'utf8mb4_unicode_ci'
+        }
+    
+    def _open_sqlite(self, check_same_thread=True):
+        """SQLite 연결을 열고 설정 파일의 [SQLITE] PRAGMA 적용"""
+        db_path = self.config.get('DATABASE', 'database')
+        conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        
+        # 정규화 키 표현식 인덱스가 있는 테이블을 읽고 쓰려면 함수 등록이 필요
+        conn.create_function('normalize_phone_number', 1, normalize_phone_number, deterministic=True)
+        
+        if self.config.has_section('SQLITE'):
+            for pragma, value in self.config.items('SQLITE'):
+                if not re.fullmatch(r'\w+', pragma) or not re.fullmatch(r'-?[\w.]+', value):
+                    raise ValueError(f"잘못된 SQLite PRAGMA 설정: {pragma} = {value}")
+                conn.execute(f"PRAGMA {pragma} = {value}")
+        
+        return conn
+
+
+def file_digest(file_path):
+    """파일 내용의 SHA-256 해시 (1MB씩 읽음)"""
+    digest = hashlib.sha256()
+    
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    
+    return digest.hexdigest()
+
+
+class CheckpointJournal:
+    """반영이 커밋된 항목을 기록하는 로컬 SQLite 저널
+
+    대상 컬럼(DB, 테이블, 전화번호 컬럼, 업데이트 컬럼)과 전화번호마다 마지막으로 커밋한 값을 기록하고,
+    다시 실행할 때 쓰려는 모든 컬럼에 같은 값이 이미 커밋된 전화번호만 건너뜀
+    다른 값이 커밋되면 기록이 그 값으로 바뀌므로, 값을 바꿨다가 되돌리는 실행도 다시 반영됨
+    실행 단위(파일 해시 + 대상 + 값) 상태도 남겨 중단된 실행을 이어서 하는지 알려 줌
+    """
+    
+    # 한 번에 조회할 전화번호 수 (SQLite 바인딩 변수 제한 안쪽)
+    LOOKUP_BATCH = SQLITE_MAX_VARIABLES - 1
+    
+    def __init__(self, path, file_hash, target_keys, constant=()):
+        """target_keys는 값을 쓰는 컬럼마다의 대상 키 (고정 값 컬럼이 있으면 맨 앞, constant는 그 고정 값 1개짜리 튜플)"""
+        self.target_keys = list(target_keys)
+        self.constant = tuple(constant)
+        self.update_key = hashlib.sha1(
+            json.dumps([self.target_keys, self.constant], ensure_ascii=False, default=str).encode('utf-8')
+        ).hexdigest()
+        self.run_key = hashlib.sha1(f"{file_hash}:{self.update_key}".encode('utf-8')).hexdigest()
+        
+        # 병렬 실행에서는 여러 작업 스레드가 기록하므로 잠금으로 직렬화
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS committed_values (
+                target_key TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                value TEXT NOT NULL,
+                run_key TEXT NOT NULL,
+                PRIMARY KEY (target_key, phone)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS runs (
+                run_key TEXT PRIMARY KEY,
+                file_hash TEXT NOT NULL,
+                update_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                checkpoints INTEGER NOT NULL DEFAULT 0,
+                items INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        
+        # 같은 파일/대상/값의 이전 실행 (status, checkpoints, items) 또는 None
+        self.previous = self.conn.execute(
+            "SELECT status, checkpoints, items FROM runs WHERE run_key = ?", (self.run_key,)
+        ).fetchone()
+        
+        self.conn.execute(
+            "INSERT OR REPLACE INTO runs (run_key, file_hash, update_key, status, started_at) VALUES (?, ?, ?, 'running', ?)",
+            (self.run_key, file_hash, self.update_key, datetime.now().isoformat(timespec='seconds'))
+        )
+        self.conn.commit()
+    
+    def split_item(self, item):
+        """항목을 (전화번호, 대상 컬럼 순서의 값 문자열 목록)으로 변환 (값 열이 있으면 항목은 (전화번호, 값...) 튜플)"""
+        if isinstance(item, str):
+            phone, values = item, self.constant
+        else:
+            phone, values = item[0], (*self.constant, *item[1:])
+        
+        return phone, [json.dumps(value, ensure_ascii=False, default=str) for value in values]
+    
+    def filter_new(self, items):
+        """쓰려는 모든 컬럼에 같은 값이 이미 커밋된 항목을 뺀 목록 반환"""
+        split = [self.split_item(item) for item in items]
+        phones = list({phone for phone, _ in split})
+        committed = {}  # (대상 키, 전화번호) → 커밋된 값
+        
+        # 병렬 실행의 작업 스레드가 같은 연결로 record를 호출할 수 있으므로 조회도 잠금 안에서
+        with self.lock:
+            for target_key in self.target_keys:
+                for batch in iter_chunks(phones, self.LOOKUP_BATCH):
+                    rows = self.conn.execute(
+                        f"SELECT phone, value FROM committed_values WHERE target_key = ? "
+                        f"AND phone IN ({', '.join('?' * len(batch))})",
+                        (target_key, *batch)
+                    )
+                    committed.update(((target_key, phone), value) for phone, value in rows)
+        
+        return [
+            item for item, (phone, values) in zip(items, split)
+            if any(committed.get((target_key, phone)) != value for target_key, value in zip(self.target_keys, values))
+        ]
+    
+    def record(self, items):
+        """DB에 커밋된 항목의 값을 기록 (DB 커밋 직후 호출, 그 사이에 중단되면 다음 실행에서 다시 반영될 뿐)
+
+        같은 컬럼/전화번호에 다른 값이 기록되어 있으면 이번 값으로 바꿈
+        """
+        rows = [
+            (target_key, phone, value, self.run_key)
+            for phone, values in map(self.split_item, items)
+            for target_key, value in zip(self.target_keys, values)
+        ]
+        
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO committed_values (target_key, phone, value, run_key) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.execute(
+                "UPDATE runs SET checkpoints = checkpoints + 1, items = items + ? WHERE run_key = ?",
+                (len(items), self.run_key)
+            )
+            self.conn.commit()
+    
+    def finish(self, status):
+        """실행 상태 기록 (ok, cancelled, error)"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_key = ?",
+                (status, datetime.now().isoformat(timespec='seconds'), self.run_key)
+            )
+            self.conn.commit()
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class UpdateCancelled(Exception):
+    """사용자가 진행 중인 업데이트를 취소함"""
+
+
+class NoValidPhonesError(ValueError):
+    """엑셀에서 유효한 전화번호를 찾지 못함"""
+
+
+class UpdateResult:
+    """업데이트 실행 결과 (매칭/반영 건수와 단계별 소요 시간)"""
+    
+    def __init__(self, progress, match_mode='staging', cancelled=False):
+        self.match_mode = match_mode
+        self.rows_read = progress['rows_read']
+        self.phones = progress['phones']
+        self.duplicates = progress['duplicates']
+        self.matched_phones = sorted(progress['matched_phones'])
+        self.unmatched_phones = sorted(progress['sheet_phones'].difference(progress['matched_phones']).tolist())
+        self.matched = len(self.matched_phones)
+        self.unmatched = len(self.unmatched_phones)
+        self.affected = progress['affected']
+        self.matched_rows = progress['matched_rows']
+        # 매칭되었지만 이미 같은 값이라 바뀌지 않은 행 (skip_unchanged이거나 MySQL/MariaDB의 변경 행 수 기준)
+        self.unchanged = max(self.matched_rows - self.affected, 0)
+        self.committed = progress['committed_rows']
+        self.skipped = progress['skipped']
+        self.chunks = progress['chunks']
+        self.cancelled = cancelled
+        self.timings = progress['profiler'].timings()
+        self.profile = progress['profiler'].to_dict()
+    
+    def to_dict(self):
+        """건수와 단계별 통계만 담은 딕셔너리 (전화번호 목록은 제외)"""
+        return {
+            key: value for key, value in vars(self).items()
+            if key not in ('matched_phones', 'unmatched_phones')
+        }
+
+
+class DryRunPlan:
+    """드라이런 결과 (DB를 바꾸지 않고 집계한 매칭 건수, UPDATE 실행 계획, 예상 실행 비용과 경고)"""
+    
+    def __init__(self, progress, match_mode='staging', cancelled=False):
+        self.match_mode = match_mode
+        self.rows_read = progress['rows_read']
+        self.phones = progress['phones']
+        self.duplicates = progress['duplicates']
+        self.matched_phones = sorted(progress['matched_phones'])
+        self.unmatched_phones = sorted(progress['sheet_phones'].difference(progress['matched_phones']).tolist())
+        self.matched = len(self.matched_phones)
+        self.unmatched = len(self.unmatched_phones)
+        self.matched_rows = progress['matched_rows']
+        self.chunks = progress['chunks']
+        self.cancelled = cancelled
+        self.update_sql = None
+        self.query_plan = []  # EXPLAIN QUERY PLAN(SQLite)/EXPLAIN(MySQL) 결과를 한 줄씩 요약
+        self.full_scan = False  # UPDATE가 대상 테이블을 전체 스캔하는지
+        self.phone_index = None  # 전화번호 컬럼(또는 정규화 키)에 쓸 수 있는 인덱스가 있는지 (해시 매칭은 확인하지 않음)
+        self.table_rows = None  # 대상 테이블 행 수 (MySQL/MariaDB는 통계 추정치)
+        self.estimated_cost = {}
+        self.warnings = []
+        self.timings = progress['profiler'].timings()
+    
+    def to_dict(self):
+        """건수, 실행 계획, 예상 비용만 담은 딕셔너리 (전화번호 목록은 제외)"""
+        return {
+            key: value for key, value in vars(self).items()
+            if key not in ('matched_phones', 'unmatched_phones')
+        }
+
+
+class UpdateEngine:
+    """엑셀 전화번호 열로 DB 행을 찾아 값을 갱신하는 엔진 (GUI/CLI 공통)"""
+    
+    def __init__(self, config, log=None, on_progress=None):
+        self.config = config
+        self.log_callback = log
+        self.on_progress = on_progress
+        
+        # 화면에는 잘라 낸 메시지만, 전체 내용은 로그 파일에만
+        self.max_log_chars = self.config.getint('LOG', 'max_message_chars', fallback=500)
+        configure_file_logging(self.config)
+        
+        # 실행마다 새로 연결하지 않도록 연결을 재사용
+        self.connections = ConnectionManager(self.config)
+        self.last_report_path = None
+        
+        # MySQL/MariaDB 스테이징 매칭 값 최대 길이 (create_staging_table이 대상 컬럼 길이로 설정)
+        self.staging_value_length = MYSQL_KEY_MAX_CHARS
+        
+        # 미리보기와 업데이트가 함께 쓰는 파싱 결과 캐시
+        self.sheet_cache = SheetCache(
+            max_bytes=int(self.config.getfloat('CACHE', 'memory_mb', fallback=256) * 1024 * 1024),
+            sidecar=self.config.getboolean('CACHE', 'sidecar', fallback=False),
+            sidecar_dir=self.config.get('CACHE', 'sidecar_dir', fallback='') or None
+        )
+    
+    def close(self):
+        """재사용하던 DB 연결 정리"""
+        self.connections.invalidate()
+    
+    def log(self, message):
+        """로그 메시지를 파일 로거에 그대로, 콜백에는 max_message_chars로 잘라서 전달"""
+        logger.info(message)
+        
+        if self.log_callback is not None:
+            self.log_callback(truncate_message(message, self.max_log_chars))
+    
+    def log_detail(self, build_message):
+        """청크별 SQL/파라미터 같은 상세 로그를 파일 로거에만 기록 (DEBUG가 아니면 메시지를 만들지도 않음)"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(build_message())
+    
+    def report_progress(self, progress):
+        """진행 상황을 on_progress 콜백으로 전달"""
+        if self.on_progress is not None:
+            self.on_progress(progress)
+    
+    def get_db_connection(self):
+        """데이터베이스 연결 객체 반환 (풀/지속 연결에서 가져오며 release_db_connection으로 반납)"""
+        return self.connections.get_connection()
+    
+    def release_db_connection(self, conn):
+        """데이터베이스 연결 반납"""
+        self.connections.release(conn)
+    
+    def setup_phone_key(self, conn):
+        """정규화된 전화번호 키와 인덱스 생성 (SQLite: 표현식 인덱스, MySQL: 생성 컬럼)"""
+        table = self.config.get('DATABASE', 'table')
+        phone_column = self.config.get('DATABASE', 'phone_column')
+        key_column = self.config.get('DATABASE', 'phone_key_column', fallback='phone_key')
+        db_type = self.config.get('DATABASE', 'type')
+        index_name = f"idx_{table}_{phone_column}_key"
+        cursor = conn.cursor()
+        
+        try:
+            if db_type == 'sqlite':
+                # 등록된 normalize_phone_number 함수로 표현식 인덱스 생성 (값 변경 시 SQLite가 자동 갱신)
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} "
+                    f"ON {table} (normalize_phone_number({phone_column}))"
+                )
+            else:  # MySQL/MariaDB
+                cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                    (table, key_column)
+                )
+                has_column = cursor.fetchone()[0] > 0
+                
+                cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                    (table, key_column)
+                )
+                has_index = cursor.fetchone()[0] > 0
+                
+                # 생성 컬럼은 phone_column 값이 바뀔 때 서버가 자동으로 다시 계산
+                # 키는 원본 값의 숫자만 남긴 것이므로 원본 컬럼 길이면 충분 (다른 클라이언트의 쓰기가 "Data too long"으로 실패하지 않도록)
+                if not has_column:
+                    key_length = mysql_value_length(self.mysql_column_types(conn, [phone_column]).get(phone_column.lower()))
+                    key_expression = mysql_phone_key_expression(phone_column)
+                    
+                    if key_length >= MYSQL_KEY_MAX_CHARS:
+                        # 인덱스 키 한도를 넘는 긴 텍스트 컬럼은 앞부분만 키로 사용
+                        key_length = MYSQL_KEY_MAX_CHARS
+                        key_expression = f"LEFT({key_expression}, {MYSQL_KEY_MAX_CHARS})"
+                    
+                    cursor.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {key_column} VARCHAR({key_length}) "
+                        f"AS ({key_expression}) STORED"
+                    )
+                if not has_index:
+                    cursor.execute(f"CREATE INDEX {index_name} ON {table} ({key_column})")
+            
+            conn.commit()
+        finally:
+            cursor.close()
+    
+    def execute_query(self, conn, query, params=None):
+        """쿼리 실행"""
+        db_type = self.config.get('DATABASE', 'type')
+        cursor = conn.cursor()
+        
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+                
+            if db_type in ['mysql', 'mariadb']:
+                result = cursor.fetchall()
+            else:  # sqlite
+                result = [dict(row) for row in cursor.fetchall()]
+                
+            return result
+        finally:
+            cursor.close()
+    
+    def staging_match_column(self):
+        """스테이징 match_value와 비교하는 대상 테이블 컬럼 (use_phone_key면 정규화 키 컬럼)"""
+        if self.config.getboolean('DATABASE', 'use_phone_key', fallback=False):
+            return self.config.get('DATABASE', 'phone_key_column', fallback='phone_key')
+        return self.config.get('DATABASE', 'phone_column')
+    
+    def mysql_column_types(self, conn, columns):
+        """대상 테이블 컬럼별 (문자 집합, 콜레이션, 최대 문자 길이)를 소문자 컬럼 이름 키로 반환 (MySQL/MariaDB)
+
+        문자열 컬럼이 아니면 문자 집합과 콜레이션이 None
+        """
+        table = self.config.get('DATABASE', 'table')
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "SELECT COLUMN_NAME, CHARACTER_SET_NAME, COLLATION_NAME, CHARACTER_MAXIMUM_LENGTH "
+                "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+                f"AND COLUMN_NAME IN ({', '.join(['%s'] * len(columns))})",
+                (table, *columns)
+            )
+            return {row[0].lower(): ColumnType(row[1], row[2], row[3]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+    
+    def value_columns(self):
+        """[EXCEL] value_columns 설정을 (엑셀 열 인덱스, DB 컬럼) 목록으로 반환 (비어 있으면 고정 값만 사용)"""
+        return parse_value_columns(self.config.get('EXCEL', 'value_columns', fallback=''))
+    
+    def create_staging_table(self, conn, value_count=0):
+        """매칭할 전화번호(와 행별 값 value_count개)를 담을 임시 스테이징 테이블 생성"""
+        db_type = self.config.get('DATABASE', 'type')
+        cursor = conn.cursor()
+        
+        try:
+            if db_type == 'sqlite':
+                # 값 열은 타입을 지정하지 않아 엑셀 값의 타입을 그대로 보관
+                value_defs = ''.join(f", v{i}" for i in range(value_count))
+                cursor.execute(f"DROP TABLE IF EXISTS temp.{STAGING_TABLE}")
+                cursor.execute(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} ("
+                    "phone TEXT NOT NULL, "
+                    f"match_value TEXT NOT NULL PRIMARY KEY{value_defs})"
+                )
+            else:  # MySQL/MariaDB
+                # 조인/대입하는 대상 컬럼과 같은 문자 집합과 콜레이션으로 선언해야 콜레이션 충돌(1267)이나
+                # 대상 쪽 변환으로 인덱스를 못 쓰는 일이 없음
+                value_targets = [column for _, column in self.value_columns()[:value_count]]
+                column_types = self.mysql_column_types(conn, [self.staging_match_column(), *value_targets])
+                match_type = column_types.get(self.staging_match_column().lower())
+                match_charset = mysql_charset_clause(match_type)
+                
+                # 대상 컬럼보다 긴 매칭 값은 어떤 행과도 같을 수 없으므로 적재하지 않음 (잘려서 다른 번호와 매칭되지 않도록)
+                self.staging_value_length = mysql_value_length(match_type)
+                value_defs = ''.join(
+                    f"v{i} TEXT{mysql_charset_clause(column_types.get(column.lower()))} NULL, "
+                    for i, column in enumerate(value_targets)
+                )
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE}")
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {STAGING_TABLE} ("
+                    f"phone VARCHAR({self.staging_value_length}){match_charset} NOT NULL, "
+                    f"match_value VARCHAR({self.staging_value_length}){match_charset} NOT NULL, "
+                    f"{value_defs}"
+                    "PRIMARY KEY (match_value)"
+                    ") DEFAULT CHARSET=utf8mb4"
+                )
+        finally:
+            cursor.close()
+    
+    def load_staging_table(self, conn, phones, value_count=0):
+        """정규화된 전화번호와 매칭 형식을 스테이징 테이블에 적재하고 적재 건수 반환 (기존 내용은 비움)
+
+        value_count가 있으면 phones는 (전화번호, 값...) 튜플 목록이며, 같은 전화번호는 뒤의 행 값을 사용
+        """
+        db_type = self.config.get('DATABASE', 'type')
+        columns = ', '.join(['phone', 'match_value'] + [f"v{i}" for i in range(value_count)])
+        
+        if db_type == 'sqlite':
+            placeholders = ', '.join(['?'] * (2 + value_count))
+            insert_sql = f"INSERT OR IGNORE INTO temp.{STAGING_TABLE} ({columns}) VALUES ({placeholders})"
+        else:  # MySQL/MariaDB
+            placeholders = ', '.join(['%s'] * (2 + value_count))
+            insert_sql = f"INSERT IGNORE INTO {STAGING_TABLE} ({columns}) VALUES ({placeholders})"
+        
+        if value_count:
+            # 전화번호별 마지막 행만 남김
+            phone_rows = list({row[0]: row for row in phones}.values())
+        else:
+            phone_rows = [(phone,) for phone in phones]
+        
+        if self.config.getboolean('DATABASE', 'use_phone_key', fallback=False):
+            # 정규화 키로 매칭하므로 형식 변형이 필요 없음
+            rows = [(row[0], row[0], *row[1:]) for row in phone_rows]
+        else:
+            rows = [(row[0], variant, *row[1:]) for row in phone_rows for variant in phone_match_variants(row[0])]
+        
+        if db_type != 'sqlite':
+            rows = [row for row in rows if len(row[1]) <= self.staging_value_length]
+        
+        cursor = conn.cursor()
+        
+        try:
+            # 이전 청크의 값 비우기
+            cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+            cursor.executemany(insert_sql, rows)
+        finally:
+            cursor.close()
+        
+        return len(rows)
+    
+    def staging_match_expression(self):
+        """스테이징 테이블의 match_value와 비교할 대상 테이블 식 (MySQL은 별칭 t 기준)"""
+        table = self.config.get('DATABASE', 'table')
+        phone_column = self.config.get('DATABASE', 'phone_column')
+        db_type = self.config.get('DATABASE', 'type')
+        
+        # 정규화 키 사용 시 키 값과 한 번의 동등 비교로 매칭 (인덱스 탐색)
+        use_phone_key = self.config.getboolean('DATABASE', 'use_phone_key', fallback=False)
+        
+        if db_type == 'sqlite':
+            if use_phone_key:
+                return f"normalize_phone_number({table}.{phone_column})"
+            return f"{table}.{phone_column}"
+        
+        # MySQL/MariaDB
+        if use_phone_key:
+            return "t." + self.config.get('DATABASE', 'phone_key_column', fallback='phone_key')
+        return f"t.{phone_column}"
+    
+    def build_staging_update_sql(self, value_columns=(), with_constant=True):
+        """스테이징 테이블과 조인하여 매칭된 행을 업데이트하는 쿼리 생성
+
+        with_constant면 update_column에 고정 값(자리표시자 1개)을, value_columns의 DB 컬럼에는 스테이징 값을 넣음
+        """
+        table = self.config.get('DATABASE', 'table')
+        update_column = self.config.get('DATABASE', 'update_column')
+        db_type = self.config.get('DATABASE', 'type')
+        match_expr = self.staging_match_expression()
+        value_targets = [column for _, column in value_columns]
+        
+        if with_constant and update_column in value_targets:
+            raise ValueError(f"업데이트 컬럼({update_column})이 값 열 매핑에도 있습니다.")
+        
+        # skip_unchanged: 새 값과 NULL까지 같게 보는 바이트 단위 비교로 이미 같은 행은 제외 (고정 값 자리표시자가 한 번 더 필요)
+        # (컬럼 콜레이션이 NOCASE/대소문자 무시여도 대소문자나 뒤 공백만 바뀐 값은 변경으로 봄)
+        skip_unchanged = self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False)
+        
+        if db_type == 'sqlite':
+            if sqlite3.sqlite_version_info >= (3, 33, 0):
+                # UPDATE ... FROM (SQLite 3.33 이상)
+                # +s.match_value: 스테이징 테이블을 바깥 루프로 두고 대상 테이블은 인덱스로 탐색하도록 유도
+                pairs = [(update_column, '?')] if with_constant else []
+                pairs += [(column, f"s.v{i}") for i, column in enumerate(value_targets)]
+                update_sql = (
+                    f"UPDATE {table} SET {', '.join(f'{column} = {value}' for column, value in pairs)} "
+                    f"FROM temp.{STAGING_TABLE} AS s "
+                    f"WHERE {match_expr} = +s.match_value"
+                )
+            else:
+                pairs = [(update_column, '?')] if with_constant else []
+                pairs += [
+                    (column, f"(SELECT s.v{i} FROM temp.{STAGING_TABLE} AS s WHERE s.match_value = {match_expr})")
+                    for i, column in enumerate(value_targets)
+                ]
+                update_sql = (
+                    f"UPDATE {table} SET {', '.join(f'{column} = {value}' for column, value in pairs)} "
+                    f"WHERE {match_expr} IN (SELECT match_value FROM temp.{STAGING_TABLE})"
+                )
+            
+            if skip_unchanged:
+                update_sql += f" AND ({' OR '.join(f'{table}.{column} IS NOT {value} COLLATE BINARY' for column, value in pairs)})"
+        else:  # MySQL/MariaDB
+            pairs = [(f"t.{update_column}", '%s')] if with_constant else []
+            pairs += [(f"t.{column}", f"s.v{i}") for i, column in enumerate(value_targets)]
+            update_sql = (
+                f"UPDATE {table} AS t "
+                f"JOIN {STAGING_TABLE} AS s ON {match_expr} = s.match_value "
+                f"SET {', '.join(f'{column} = {value}' for column, value in pairs)}"
+            )
+            
+            if skip_unchanged:
+                update_sql += f" WHERE {' OR '.join(mysql_changed_condition(column, value) for column, value in pairs)}"
+        
+        return update_sql
+    
+    def staging_update_params(self, update_value):
+        """build_staging_update_sql 쿼리의 자리표시자 값 (skip_unchanged면 고정 값이 비교에 한 번 더 쓰임)"""
+        if update_value is None:
+            return ()
+        if self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False):
+            return (update_value, update_value)
+        return (update_value,)
+    
+    def build_staging_matched_phones_sql(self):
+        """스테이징 테이블의 전화번호 중 DB 행과 매칭되는 전화번호와 전화번호별 매칭 행 수를 조회하는 쿼리 생성"""
+        table = self.config.get('DATABASE', 'table')
+        db_type = self.config.get('DATABASE', 'type')
+        match_expr = self.staging_match_expression()
+        
+        if db_type == 'sqlite':
+            return (
+                f"SELECT s.phone, COUNT(*) FROM temp.{STAGING_TABLE} AS s "
+                f"JOIN {table} ON {match_expr} = +s.match_value GROUP BY s.phone"
+            )
+        
+        # MySQL/MariaDB
+        return (
+            f"SELECT s.phone, COUNT(*) FROM {STAGING_TABLE} AS s "
+            f"JOIN {table} AS t ON {match_expr} = s.match_value GROUP BY s.phone"
+        )
+    
+    def iter_phone_chunks(self, file_path, phone_col_idx, start_row, has_header, progress=None, value_col_idxs=(),
+                          sheets=None):
+        """시트 파일의 전화번호 열을 청크 단위로 읽어 정규화된 전화번호 리스트로 반환 (캐시가 있으면 파싱 생략)
+
+        전화번호는 PhoneKeys로 앞 청크까지 나온 번호와 청크 안의 중복을 빼고 키 순서로 정렬해 반환
+        value_col_idxs가 있으면 그 열도 함께 읽어 (전화번호, 값...) 튜플 리스트로 반환
+        (시트 전체를 읽은 뒤 같은 전화번호는 뒤의 행만 남겨 반환, 캐시 사용 안 함)
+        sheets에 여러 시트를 지정하면 병렬로 읽어 시트 순서대로 이어서 반환 (한 번의 업데이트로 처리)
+        """
+        import pandas as pd
+        
+        chunk_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        
+        if chunk_size < 1:
+            raise ValueError("chunk_size는 1 이상이어야 합니다.")
+        
+        sheet_names = resolve_sheet_names(file_path, sheets)
+        
+        if progress is not None:
+            progress['sheets'] = sheet_names
+        
+        cache_key = SheetCache.make_key(file_path, start_row, has_header, phone_col_idx, sheet_names)
+        cached = None if value_col_idxs else self.sheet_cache.get(cache_key)
+        
+        if cached is not None:
+            self.log(f"캐시된 전화번호 {len(cached.phones)}개를 사용합니다. (엑셀 파싱 생략)")
+            
+            if progress is not None:
+                progress['total_rows'] = progress['rows_read'] = cached.rows
+                progress['phones'] = len(cached.phones)
+                progress['duplicates'] = cached.duplicates
+                self.report_progress(progress)
+            
+            yield from cached.phones.iter_chunks(chunk_size)
+            return
+        
+        # 지금까지 반환한 전화번호 (끝까지 읽은 경우에만 캐시에 저장, 취소 등으로 중간에 멈추면 저장하지 않음)
+        seen = PhoneKeys()
+        rows_read = 0
+        valid_count = 0
+        duplicates = 0
+        
+        # 값 열이 있으면 시트 전체에서 전화번호별 마지막 행 (같은 전화번호가 여러 청크에 나와도 DB에는 한 번만, 뒤의 행 값으로)
+        latest_rows = {}
+        
+        def on_size(total_rows):
+            if progress is not None:
+                progress['total_rows'] = total_rows
+                self.report_progress(progress)
+        
+        col_idxs = [phone_col_idx, *value_col_idxs]
+        
+        if len(sheet_names) > 1:
+            self.log(f"시트 {len(sheet_names)}개를 병렬로 읽습니다: {', '.join(sheet_names)}")
+            column_chunks = iter_sheets_parallel(file_path, col_idxs, start_row, has_header, sheet_names, chunk_size,
+                                                 on_size)
+        else:
+            column_chunks = iter(iter_sheet_columns(
+                file_path,
+                col_idxs,
+                start_row,
+                has_header,
+                chunk_size,
+                stream=self.config.getboolean('EXCEL', 'stream_read', fallback=True),
+                on_size=on_size,
+                sheet=sheet_names[0]
+            ))
+        
+        # 단계별 실행 통계 (진행 상황 딕셔너리가 없으면 버림)
+        profiler = progress['profiler'] if progress is not None else PhaseProfiler()
+        profiler.count('read', bytes=os.path.getsize(file_path))
+        
+        while True:
+            with profiler.phase('read'):
+                columns = next(column_chunks, None)
+            
+            if columns is None:
+                break
+            
+            values = columns[0]
+            
+            with profiler.phase('normalize'):
+                normalized = normalize_phone_series(pd.Series(values, dtype=object))
+                
+                valid = normalized.dropna().tolist()
+                
+                if value_col_idxs:
+                    # 전화번호가 유효한 행만 값 열과 묶어 두고 다 읽은 뒤 반환 (같은 전화번호는 뒤의 행 값이 남음)
+                    latest_rows.update((row[0], row) for row in zip(normalized.tolist(), *columns[1:]) if row[0] is not None)
+                    phones = []
+                else:
+                    new_phones = PhoneKeys.from_phones(valid).difference(seen)
+                    seen.update(new_phones)
+                    phones = new_phones.tolist()
+            
+            rows_read += len(values)
+            valid_count += len(valid)
+            duplicates = valid_count - (len(latest_rows) if value_col_idxs else len(seen))
+            profiler.count('read', rows=len(values))
+            profiler.count('normalize', rows=len(valid))
+            
+            if progress is not None:
+                progress['rows_read'] += len(values)
+                progress['phones'] += len(phones)
+                progress['duplicates'] = duplicates
+            
+            if phones:
+                yield phones
+        
+        if latest_rows:
+            if progress is not None:
+                progress['phones'] = len(latest_rows)
+            
+            yield from iter_chunks(list(latest_rows.values()), chunk_size)
+        
+        if duplicates:
+            self.log(f"중복된 전화번호 {duplicates}개는 한 번만 반영합니다.")
+        
+        if self.sheet_cache.enabled and not value_col_idxs:
+            self.sheet_cache.put(cache_key, CachedSheet(seen, rows_read, duplicates))
+    
+    def build_preview_store(self, store, file_path, phone_col_idx, start_row, has_header, sheets=None, on_chunk=None,
+                            cancel_event=None):
+        """시트의 모든 행을 청크 단위로 읽어 미리보기 저장소에 쌓고 읽은 시트 목록 반환 (여러 시트면 첫 시트만)
+
+        시트가 하나면 정규화한 전화번호를 업데이트와 같은 키로 캐시에 저장하여 업데이트에서 다시 파싱하지 않음
+        on_chunk는 청크를 저장할 때마다 호출, cancel_event가 설정되면 그때까지 쌓은 행만 남기고 중단
+        """
+        import pandas as pd
+        
+        chunk_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        sheet_names = resolve_sheet_names(file_path, sheets)
+        has_phone_column = phone_col_idx < len(store.columns)
+        seen = PhoneKeys()
+        valid_count = 0
+        
+        column_chunks = iter_sheet_columns(
+            file_path,
+            list(range(len(store.columns))),
+            start_row,
+            has_header,
+            chunk_size,
+            stream=self.config.getboolean('EXCEL', 'stream_read', fallback=True),
+            sheet=sheet_names[0]
+        )
+        
+        for columns in column_chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                return sheet_names
+            
+            if has_phone_column:
+                normalized = normalize_phone_series(pd.Series(columns[phone_col_idx], dtype=object)).tolist()
+                valid_phones = [phone for phone in normalized if phone is not None]
+                valid_count += len(valid_phones)
+                seen.update(valid_phones)
+                valid = [phone is not None for phone in normalized]
+            else:
+                # 전화번호 열이 범위를 벗어나면 필터로 거를 행이 없음
+                valid = [True] * len(columns[0])
+            
+            store.append(columns, valid)
+            
+            if on_chunk is not None:
+                on_chunk()
+        
+        store.complete = True
+        
+        if has_phone_column and len(sheet_names) == 1 and self.sheet_cache.enabled:
+            cache_key = SheetCache.make_key(file_path, start_row, has_header, phone_col_idx, sheet_names)
+            self.sheet_cache.put(cache_key, CachedSheet(seen, store.rows, valid_count - len(seen)))
+        
+        return sheet_names
+    
+    def apply_staging_chunk(self, conn, chunk, update_sql, matched_phones_sql, params, value_count, profiler, chunk_no):
+        """청크를 스테이징 테이블에 적재하고 매칭된 전화번호 조회 후 UPDATE 실행
+
+        (영향받은 행 수, 매칭된 전화번호 목록, 매칭된 행 수) 반환
+        """
+        with profiler.phase('stage'):
+            staged = self.load_staging_table(conn, chunk, value_count)
+        profiler.count('stage', rows=staged, statements=2)
+        
+        cursor = conn.cursor()
+        try:
+            # 매칭 여부는 UPDATE 전에 조회해야 값이 이미 같은 행도 포함됨
+            with profiler.phase('match'):
+                cursor.execute(matched_phones_sql)
+                matched_counts = cursor.fetchall()
+            
+            matched = [row[0] for row in matched_counts]
+            matched_rows = sum(row[1] for row in matched_counts)
+            
+            self.log_detail(lambda: f"청크 {chunk_no}: {update_sql} {params} 전화번호: {chunk}")
+            
+            with profiler.phase('execute'):
+                cursor.execute(update_sql, params)
+                affected = cursor.rowcount
+            
+            profiler.count('match', rows=matched_rows, statements=1)
+            profiler.count('execute', rows=affected, statements=1)
+        finally:
+            cursor.close()
+        
+        return affected, matched, matched_rows
+    
+    def transaction_row_limit(self):
+        """한 트랜잭션에서 바꿀 최대 행 수 (0이면 제한 없음)"""
+        row_limit = self.config.getint('DATABASE', 'max_rows_per_transaction', fallback=0)
+        
+        if row_limit < 0:
+            raise ValueError("max_rows_per_transaction은 0 이상이어야 합니다.")
+        
+        return row_limit
+    
+    def commit_batch(self, conn, progress, pending, committed_rows):
+        """커밋 후 커밋된 항목을 저널에 기록하고 커밋된 행 수 갱신"""
+        profiler = progress['profiler'] if progress is not None else PhaseProfiler()
+        
+        with profiler.phase('commit'):
+            conn.commit()
+        
+        self.record_checkpoint(progress, pending)
+        
+        if progress is not None:
+            progress['committed_rows'] = committed_rows
+    
+    def execute_batched_update(self, conn, phone_chunks, update_value, progress=None, cancel_event=None):
+        """전화번호 청크마다 스테이징 조인 UPDATE를 실행하고 영향받은 행 수 합계 반환
+
+        cancel_event가 설정되면 청크 사이에서 UpdateCancelled를 발생시키고 커밋되지 않은 청크는 롤백
+        """
+        commit_interval = self.config.getint('DATABASE', 'commit_interval', fallback=1)
+        
+        if commit_interval < 1:
+            raise ValueError("commit_interval은 1 이상이어야 합니다.")
+        
+        # 행별 값 열이 있으면 청크는 (전화번호, 값...) 튜플 목록, update_value가 None이면 고정 값은 쓰지 않음
+        value_columns = self.value_columns()
+        with_constant = update_value is not None
+        params = self.staging_update_params(update_value)
+        row_limit = self.transaction_row_limit()
+        
+        if row_limit:
+            # 청크 하나가 트랜잭션 행 수 한도를 넘지 않도록 나눔 (전화번호 하나에 보통 한 행)
+            phone_chunks = (part for chunk in phone_chunks for part in iter_chunks(chunk, row_limit))
+        
+        profiler = progress['profiler'] if progress is not None else PhaseProfiler()
+        
+        with profiler.phase('build'):
+            update_sql = self.build_staging_update_sql(value_columns, with_constant)
+            matched_phones_sql = self.build_staging_matched_phones_sql()
+        self.log(f"실행 쿼리: {update_sql}")
+        
+        affected_rows = 0
+        phone_count = 0
+        chunk_no = 0
+        txn_chunks = 0  # 커밋하지 않은 청크 수
+        txn_rows = 0  # 커밋하지 않은 변경 행 수
+        pending = []  # 다음 커밋에서 저널에 기록할 매칭 항목
+        
+        with profiler.phase('stage'):
+            self.create_staging_table(conn, len(value_columns))
+        profiler.count('stage', statements=2)
+        
+        try:
+            for chunk_no, chunk in enumerate(phone_chunks, start=1):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise UpdateCancelled()
+                
+                # 이 청크까지 넣으면 트랜잭션 행 수 한도를 넘을 것 같으면 먼저 커밋
+                if row_limit and txn_rows and txn_rows + len(chunk) > row_limit:
+                    self.commit_batch(conn, progress, pending, affected_rows)
+                    txn_chunks = txn_rows = 0
+                
+                affected, matched, matched_rows = self.apply_staging_chunk(
+                    conn, chunk, update_sql, matched_phones_sql, params, len(value_columns), profiler, chunk_no
+                )
+                affected_rows += affected
+                txn_rows += affected
+                txn_chunks += 1
+                phone_count += len(chunk)
+                
+                if progress is not None:
+                    progress['sheet_phones'].update([row[0] for row in chunk] if value_columns else chunk)
+                    progress['matched_phones'].update(matched)
+                    progress['matched_rows'] += matched_rows
+                
+                matched_set = set(matched)
+                pending.extend(item for item in chunk if (item[0] if value_columns else item) in matched_set)
+                
+                # 커밋 간격(또는 트랜잭션 행 수 한도)마다 커밋하여 행 잠금 시간을 짧게 유지
+                if txn_chunks >= commit_interval or (row_limit and txn_rows >= row_limit):
+                    self.commit_batch(conn, progress, pending, affected_rows)
+                    txn_chunks = txn_rows = 0
+                
+                if progress is not None:
+                    progress['chunks'] = chunk_no
+                    progress['affected'] = affected_rows
+                    self.report_progress(progress)
+            
+            self.commit_batch(conn, progress, pending, affected_rows)
+            
+            if progress is not None:
+                self.report_progress(progress)
+        except Exception:
+            # 아직 커밋되지 않은 청크만 롤백됨
+            conn.rollback()
+            raise
+        finally:
+            self.drop_staging_table(conn)
+        
+        self.log(f"{phone_count}개의 전화번호를 {chunk_no}개 청크로 처리했습니다. (커밋 간격: {commit_interval})")
+        return affected_rows
+    
+    def execute_partitioned_update(self, conn, phone_chunks, update_value, progress=None, cancel_event=None):
+        """전화번호를 해시로 나눈 파티션마다 별도 연결에서 스테이징 조인 UPDATE를 동시에 실행하고 영향받은 행 수 합계 반환
+
+        파티션끼리는 전화번호(따라서 매칭되는 행)가 겹치지 않음. 교착 상태/잠금 대기 시간 초과가 나면
+        해당 파티션의 커밋되지 않은 청크만 롤백하고 대기 후 다시 실행 (MySQL/MariaDB 전용)
+        """
+        commit_interval = self.config.getint('DATABASE', 'commit_interval', fallback=1)
+        chunk_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        partitions = self.config.getint('DATABASE', 'parallel_connections', fallback=1)
+        pool_size = self.config.getint('DATABASE', 'pool_size', fallback=5)
+        
+        if commit_interval < 1:
+            raise ValueError("commit_interval은 1 이상이어야 합니다.")
+        
+        # 이미 받은 conn이 첫 파티션을 맡고 나머지는 풀에서 받음
+        if partitions > pool_size:
+            self.log(f"병렬 연결 수({partitions})가 커넥션 풀 크기({pool_size})보다 커서 {pool_size}개로 실행합니다.")
+            partitions = pool_size
+        
+        value_columns = self.value_columns()
+        with_constant = update_value is not None
+        params = self.staging_update_params(update_value)
+        row_limit = self.transaction_row_limit()
+        
+        if row_limit:
+            # 파티션에 넘기는 청크도 트랜잭션 행 수 한도 이하로 (전화번호 하나에 보통 한 행)
+            chunk_size = min(chunk_size, row_limit)
+        
+        profiler = progress['profiler'] if progress is not None else PhaseProfiler()
+        
+        with profiler.phase('build'):
+            update_sql = self.build_staging_update_sql(value_columns, with_constant)
+            matched_phones_sql = self.build_staging_matched_phones_sql()
+        self.log(f"실행 쿼리: {update_sql}")
+        self.log(f"전화번호를 {partitions}개 파티션으로 나누어 동시에 실행합니다.")
+        
+        # 파티션별 작업 큐 (읽기가 실행보다 너무 앞서지 않도록 크기 제한)
+        queues = [queue.Queue(maxsize=2) for _ in range(partitions)]
+        stop_event = threading.Event()
+        lock = threading.Lock()
+        totals = {'affected': 0, 'chunks': 0}
+        errors = []
+        
+        def put(partition_no, item):
+            # 작업 스레드가 오류로 멈췄으면 더 넣지 않음
+            while not stop_event.is_set():
+                try:
+                    queues[partition_no].put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+        
+        def worker(partition_no, worker_conn):
+            try:
+                self.run_partition(
+                    worker_conn, partition_no, queues[partition_no], update_sql, matched_phones_sql, params,
+                    len(value_columns), commit_interval, row_limit, progress, cancel_event, stop_event, lock, totals
+                )
+            except BaseException as e:
+                errors.append(e)
+                stop_event.set()
+            finally:
+                if worker_conn is not conn:
+                    self.connections.release(worker_conn)
+        
+        threads = []
+        
+        try:
+            for partition_no in range(partitions):
+                with profiler.phase('connect'):
+                    worker_conn = conn if partition_no == 0 else self.connections.get_connection()
+                
+                thread = threading.Thread(target=worker, args=(partition_no, worker_conn), daemon=True)
+                thread.start()
+                threads.append(thread)
+            
+            # 청크를 파티션별로 나누어 chunk_size만큼 모이면 해당 파티션에 넘김
+            buffers = [[] for _ in range(partitions)]
+            
+            for chunk in phone_chunks:
+                if stop_event.is_set() or (cancel_event is not None and cancel_event.is_set()):
+                    break
+                
+                for item in chunk:
+                    phone = item[0] if value_columns else item
+                    partition_no = zlib.crc32(phone.encode('utf-8')) % partitions
+                    buffers[partition_no].append(item)
+                    
+                    if len(buffers[partition_no]) >= chunk_size:
+                        put(partition_no, buffers[partition_no])
+                        buffers[partition_no] = []
+            
+            if not stop_event.is_set() and not (cancel_event is not None and cancel_event.is_set()):
+                for partition_no, buffer in enumerate(buffers):
+                    if buffer:
+                        put(partition_no, buffer)
+        except BaseException:
+            # 엑셀 읽기 등이 실패하면 작업 스레드는 커밋하지 않고 멈춤
+            stop_event.set()
+            raise
+        finally:
+            # 작업 종료 신호 (취소/오류 시에도 작업 스레드가 큐를 기다리다 멈추지 않도록)
+            for partition_no in range(len(threads)):
+                put(partition_no, None)
+            
+            for thread in threads:
+                thread.join()
+        
+        if errors:
+            # 다른 파티션의 취소보다 실제 오류를 먼저 알림
+            raise next((e for e in errors if not isinstance(e, UpdateCancelled)), errors[0])
+        
+        if cancel_event is not None and cancel_event.is_set():
+            raise UpdateCancelled()
+        
+        self.log(f"{partitions}개 파티션에서 {totals['chunks']}개 청크를 처리했습니다. (커밋 간격: {commit_interval})")
+        return totals['affected']
+    
+    def run_partition(self, conn, partition_no, chunk_queue, update_sql, matched_phones_sql, params, value_count,
+                      commit_interval, row_limit, progress, cancel_event, stop_event, lock, totals):
+        """파티션 하나의 청크를 큐에서 받아 실행 (작업 스레드, 커밋 간격/행 수 한도마다 커밋하고 교착 상태는 재시도)"""
+        import mysql.connector
+        
+        retries = self.config.getint('DATABASE', 'lock_retries', fallback=5)
+        backoff = self.config.getfloat('DATABASE', 'retry_backoff', fallback=0.2)
+        value_columns = bool(value_count)
+        profiler = progress['profiler'] if progress is not None else PhaseProfiler()
+        
+        # 커밋되지 않은 청크 (롤백되면 처음부터 다시 실행)
+        uncommitted = []
+        txn_affected = 0
+        txn_matched = []
+        txn_matched_rows = 0
+        
+        def commit():
+            nonlocal txn_affected, txn_matched, txn_matched_rows
+            
+            with profiler.phase('commit'):
+                conn.commit()
+            
+            matched_set = set(txn_matched)
+            pending = [
+                item for chunk in uncommitted for item in chunk
+                if (item[0] if value_columns else item) in matched_set
+            ]
+            self.record_checkpoint(progress, pending)
+            
+            with lock:
+                totals['affected'] += txn_affected
+                totals['chunks'] += len(uncommitted)
+                
+                if progress is not None:
+                    progress['matched_phones'].update(txn_matched)
+                    progress['matched_rows'] += txn_matched_rows
+                    progress['affected'] = progress['committed_rows'] = totals['affected']
+                    progress['chunks'] = totals['chunks']
+                    self.report_progress(progress)
+            
+            uncommitted.clear()
+            txn_affected = 0
+            txn_matched = []
+            txn_matched_rows = 0
+        
+        with profiler.phase('stage'):
+            self.create_staging_table(conn, value_count)
+        profiler.count('stage', statements=2)
+        
+        try:
+            while not stop_event.is_set():
+                try:
+                    chunk = chunk_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                
+                if chunk is None:
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    raise UpdateCancelled()
+                
+                if progress is not None:
+                    with lock:
+                        progress['sheet_phones'].update([row[0] for row in chunk] if value_columns else chunk)
+                
+                # 이 청크까지 넣으면 트랜잭션 행 수 한도를 넘을 것 같으면 먼저 커밋 (전화번호 하나에 보통 한 행)
+                if row_limit and uncommitted and txn_affected + len(chunk) > row_limit:
+                    commit()
+                
+                uncommitted.append(chunk)
+                todo = [chunk]
+                
+                for attempt in itertools.count():
+                    try:
+                        for chunk_to_run in todo:
+                            affected, matched, matched_rows = self.apply_staging_chunk(
+                                conn, chunk_to_run, update_sql, matched_phones_sql, params, value_count, profiler,
+                                f"{partition_no}-{totals['chunks'] + len(uncommitted)}"
+                            )
+                            txn_affected += affected
+                            txn_matched.extend(matched)
+                            txn_matched_rows += matched_rows
+                        break
+                    except mysql.connector.Error as e:
+                        if e.errno not in LOCK_RETRY_ERRNOS or attempt >= retries:
+                            raise
+                        
+                        # 롤백으로 이 파티션의 커밋되지 않은 청크가 모두 취소되므로 처음부터 다시 실행
+                        conn.rollback()
+                        txn_affected = 0
+                        txn_matched = []
+                        txn_matched_rows = 0
+                        todo = list(uncommitted)
+                        delay = backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                        profiler.count('retry', rows=len(todo), statements=1)
+                        self.log(f"파티션 {partition_no}: {e.msg} (오류 {e.errno}), {delay:.2f}초 후 재시도 ({attempt + 1}/{retries})")
+                        time.sleep(delay)
+                
+                if len(uncommitted) >= commit_interval or (row_limit and txn_affected >= row_limit):
+                    commit()
+            
+            if cancel_event is not None and cancel_event.is_set():
+                raise UpdateCancelled()
+            
+            if stop_event.is_set():
+                # 다른 파티션이나 읽기가 실패했으면 커밋하지 않은 청크는 버림
+                conn.rollback()
+            elif uncommitted:
+                commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.drop_staging_table(conn)
+    
+    def drop_staging_table(self, conn):
+        """스테이징 테이블 삭제"""
+        db_type = self.config.get('DATABASE', 'type')
+        cursor = conn.cursor()
+        
+        try:
+            if db_type == 'sqlite':
+                cursor.execute(f"DROP TABLE IF EXISTS temp.{STAGING_TABLE}")
+            else:  # MySQL/MariaDB
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE}")
+        finally:
+            cursor.close()
+    
+    def build_pk_update_sql(self, key_count, value_columns=(), with_constant=True):
+        """기본 키 목록에 해당하는 행을 업데이트하는 쿼리 생성
+
+        value_columns의 DB 컬럼은 CASE 기본 키 WHEN ? THEN ? 로 행마다 다른 값을 넣음
+        (자리표시자 순서: 고정 값, 컬럼별 (기본 키, 값) 쌍, WHERE의 기본 키,
+        skip_unchanged면 이어서 비교용 고정 값과 컬럼별 (기본 키, 값) 쌍을 한 번 더 — pk_update_params 참고)
+        """
+        table = self.config.get('DATABASE', 'table')
+        update_column = self.config.get('DATABASE', 'update_column')
+        primary_key = self.config.get('DATABASE', 'primary_key', fallback='id')
+        placeholder = '?' if self.config.get('DATABASE', 'type') == 'sqlite' else '%s'
+        key_placeholders = ', '.join([placeholder] * key_count)
+        
+        if with_constant and update_column in [column for _, column in value_columns]:
+            raise ValueError(f"업데이트 컬럼({update_column})이 값 열 매핑에도 있습니다.")
+        
+        cases = f" WHEN {placeholder} THEN {placeholder}" * key_count
+        pairs = [(update_column, placeholder)] if with_constant else []
+        pairs += [(column, f"CASE {primary_key}{cases} END") for _, column in value_columns]
+        update_sql = (
+            f"UPDATE {table} SET {', '.join(f'{column} = {value}' for column, value in pairs)} "
+            f"WHERE {primary_key} IN ({key_placeholders})"
+        )
+        
+        if self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False):
+            if placeholder == '?':
+                update_sql += f" AND ({' OR '.join(f'{column} IS NOT {value} COLLATE BINARY' for column, value in pairs)})"
+            else:
+                update_sql += f" AND ({' OR '.join(mysql_changed_condition(column, value) for column, value in pairs)})"
+        
+        return update_sql
+    
+    def pk_batch_size(self, value_count):
+        """해시 매칭에서 UPDATE 한 번에 넣을 기본 키 수 (chunk_size, 트랜잭션 행 수 한도, SQLite 변수 수 제한 중 작은 값)"""
+        batch_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        row_limit = self.transaction_row_limit()
+        
+        if row_limit:
+            # 묶음 하나가 트랜잭션 행 수 한도를 넘지 않도록
+            batch_size = min(batch_size, row_limit)
+        
+        if self.config.get('DATABASE', 'type') == 'sqlite':
+            # 고정 값 자리표시자를 빼고, 기본 키마다 WHERE 1개와 값 열마다 CASE 2개씩 (skip_unchanged면 비교용으로 한 벌 더)
+            if self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False):
+                batch_size = min(batch_size, (SQLITE_MAX_VARIABLES - 2) // (1 + 4 * value_count))
+            else:
+                batch_size = min(batch_size, (SQLITE_MAX_VARIABLES - 1) // (1 + 2 * value_count))
+        
+        return batch_size
+    
+    def pk_update_params(self, rows, update_value, phone_values, value_count):
+        """build_pk_update_sql 쿼리의 자리표시자 값 ((기본 키, 전화번호) 목록 rows 기준)"""
+        params = [update_value] if update_value is not None else []
+        
+        for i in range(value_count):
+            params += [item for key, phone in rows for item in (key, phone_values[phone][i])]
+        
+        assignments = list(params)
+        params += [key for key, _ in rows]
+        
+        if self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False):
+            params += assignments
+        
+        return params
+    
+    def scan_matching_keys(self, conn, sheet_phones, matched_phones, profiler):
+        """대상 테이블의 (기본 키, 전화번호)를 스트리밍하며 정규화한 전화번호가 sheet_phones에 있는 행의 (기본 키, 전화번호) 반환"""
+        import pandas as pd
+        import numpy as np
+        
+        table = self.config.get('DATABASE', 'table')
+        phone_column = self.config.get('DATABASE', 'phone_column')
+        primary_key = self.config.get('DATABASE', 'primary_key', fallback='id')
+        chunk_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        
+        scan_sql = f"SELECT {primary_key}, {phone_column} FROM {table}"
+        self.log(f"대상 테이블 스캔: {scan_sql}")
+        
+        if self.config.get('DATABASE', 'type') == 'sqlite':
+            cursor = conn.cursor()
+        else:  # MySQL/MariaDB: 결과를 클라이언트에 모두 받아 두지 않는 서버 측 커서
+            cursor = conn.cursor(buffered=False)
+        
+        matched_keys = []
+        scanned = 0
+        
+        try:
+            with profiler.phase('scan'):
+                cursor.execute(scan_sql)
+            
+            while True:
+                with profiler.phase('scan'):
+                    rows = cursor.fetchmany(chunk_size)
+                
+                if not rows:
+                    break
+                
+                scanned += len(rows)
+                profiler.count('scan', rows=len(rows))
+                
+                # 엑셀과 같은 규칙으로 정규화한 뒤 정렬된 키 배열에서 한 번에 찾음
+                with profiler.phase('match'):
+                    phones = normalize_phone_series(pd.Series([row[1] for row in rows], dtype=object)).tolist()
+                    
+                    for i in np.flatnonzero(sheet_phones.contains(phones)):
+                        matched_keys.append((rows[i][0], phones[i]))
+                        matched_phones.add(phones[i])
+        finally:
+            cursor.close()
+        
+        profiler.count('scan', statements=1)
+        profiler.count('match', rows=len(matched_keys))
+        self.log(f"{scanned}개 행을 훑어 {len(matched_keys)}개 행이 매칭되었습니다.")
+        return matched_keys
+    
+    def execute_hash_join_update(self, conn, phone_chunks, update_value, progress=None, cancel_event=None):
+        """대상 테이블을 한 번 훑어 엑셀 전화번호 집합과 대조하고, 매칭된 행을 기본 키 묶음으로 업데이트
+
+        DB 전화번호도 같은 규칙으로 정규화하므로 전화번호 컬럼에 인덱스나 생성 컬럼이 없어도 됨
+        """
+        commit_interval = self.config.getint('DATABASE', 'commit_interval', fallback=1)
+        
+        if commit_interval < 1:
+            raise ValueError("commit_interval은 1 이상이어야 합니다.")
+        
+        # 행별 값 열이 있으면 청크는 (전화번호, 값...) 튜플 목록, update_value가 None이면 고정 값은 쓰지 않음
+        value_columns = self.value_columns()
+        with_constant = update_value is not None
+        row_limit = self.transaction_row_limit()
+        chunk_size = self.pk_batch_size(len(value_columns))
+        
+        profiler = progress['profiler'] if progress is not None else PhaseProfiler()
+        sheet_phones = progress['sheet_phones'] if progress is not None else PhoneKeys()
+        matched_phones = progress['matched_phones'] if progress is not None else set()
+        phone_values = {}
+        
+        # 엑셀 전화번호로 해시 집합 구성 (값 열이 있으면 같은 전화번호는 뒤의 행 값을 사용)
+        for chunk in phone_chunks:
+            if cancel_event is not None and cancel_event.is_set():
+                raise UpdateCancelled()
+            
+            if value_columns:
+                phone_values.update((row[0], row[1:]) for row in chunk)
+                sheet_phones.update([row[0] for row in chunk])
+            else:
+                sheet_phones.update(chunk)
+        
+        matched_keys = self.scan_matching_keys(conn, sheet_phones, matched_phones, profiler)
+        
+        if progress is not None:
+            progress['matched_rows'] = len(matched_keys)
+        
+        affected_rows = 0
+        chunk_no = 0
+        txn_chunks = 0  # 커밋하지 않은 묶음 수
+        txn_rows = 0  # 커밋하지 않은 변경 행 수
+        pending = []  # 다음 커밋에서 저널에 기록할 매칭 항목
+        
+        try:
+            for chunk_no, rows in enumerate(iter_chunks(matched_keys, chunk_size), start=1):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise UpdateCancelled()
+                
+                # 이 묶음까지 넣으면 트랜잭션 행 수 한도를 넘으면 먼저 커밋 (묶음의 기본 키 수가 바뀔 수 있는 최대 행 수)
+                if row_limit and txn_chunks and txn_rows + len(rows) > row_limit:
+                    self.commit_batch(conn, progress, pending, affected_rows)
+                    txn_chunks = txn_rows = 0
+                
+                params = self.pk_update_params(rows, update_value, phone_values, len(value_columns))
+                
+                cursor = conn.cursor()
+                try:
+                    with profiler.phase('build'):
+                        update_sql = self.build_pk_update_sql(len(rows), value_columns, with_constant)
+                    
+                    self.log_detail(lambda: f"묶음 {chunk_no}: {update_sql} {params}")
+                    
+                    with profiler.phase('execute'):
+                        cursor.execute(update_sql, params)
+                        affected_rows += cursor.rowcount
+                        txn_rows += cursor.rowcount
+                    
+                    profiler.count('execute', rows=cursor.rowcount, statements=1)
+                finally:
+                    cursor.close()
+                
+                txn_chunks += 1
+                pending.extend((phone, *phone_values[phone]) if value_columns else phone for _, phone in rows)
+                
+                # 커밋 간격(또는 트랜잭션 행 수 한도)마다 커밋하여 행 잠금 시간을 짧게 유지
+                if txn_chunks >= commit_interval or (row_limit and txn_rows >= row_limit):
+                    self.commit_batch(conn, progress, pending, affected_rows)
+                    txn_chunks = txn_rows = 0
+                
+                if progress is not None:
+                    progress['chunks'] = chunk_no
+                    progress['affected'] = affected_rows
+                    self.report_progress(progress)
+            
+            self.commit_batch(conn, progress, pending, affected_rows)
+            
+            if progress is not None:
+                self.report_progress(progress)
+        except Exception:
+            # 아직 커밋되지 않은 묶음만 롤백됨
+            conn.rollback()
+            raise
+        
+        self.log(f"{len(matched_keys)}개 행을 기본 키 기준 {chunk_no}개 묶음으로 처리했습니다. (커밋 간격: {commit_interval})")
+        return affected_rows
+    
+    def journal_target_keys(self, update_value):
+        """저널 대상 키 목록 (DB, 테이블, 전화번호 컬럼, 값을 쓰는 컬럼마다 하나, 고정 값 컬럼이 있으면 맨 앞)"""
+        database = self.config['DATABASE']
+        location = [database.get('type'), database.get('host'), database.get('port'), database.get('database')]
+        
+        if database.get('type') == 'sqlite':
+            # SQLite는 파일 위치만 의미가 있음
+            location = [database.get('type'), None, None, str(Path(database.get('database')).resolve())]
+        
+        columns = [database.get('update_column')] if update_value is not None else []
+        columns += [column for _, column in self.value_columns()]
+        
+        return [
+            hashlib.sha1(
+                json.dumps([*location, database.get('table'), database.get('phone_column'), column],
+                           ensure_ascii=False).encode('utf-8')
+            ).hexdigest()
+            for column in columns
+        ]
+    
+    def open_journal(self, file_path, update_value, progress):
+        """체크포인트 저널을 열어 progress에 연결하고 이전 실행 상태를 알림"""
+        path = self.config.get('JOURNAL', 'path', fallback='') or 'sheet2sql_journal.db'
+        
+        with progress['profiler'].phase('journal'):
+            # 같은 파일이라도 읽은 시트가 다르면 다른 실행으로 봄
+            run_source = f"{file_digest(file_path)}:{progress['sheets']}"
+            journal = CheckpointJournal(path, run_source, self.journal_target_keys(update_value),
+                                        (update_value,) if update_value is not None else ())
+        
+        progress['journal'] = journal
+        
+        if journal.previous is None:
+            self.log(f"체크포인트 저널: {path} (같은 컬럼에 같은 값이 이미 커밋된 전화번호는 건너뜀)")
+        elif journal.previous[0] == 'ok':
+            self.log("체크포인트 저널: 같은 파일/값으로 완료된 실행이 있어 변경분만 반영합니다.")
+        else:
+            self.log(f"체크포인트 저널: 이전 실행이 중단되었습니다({journal.previous[0]}, 커밋된 항목 {journal.previous[2]:,}개). 이어서 진행합니다.")
+        
+        return journal
+    
+    def iter_unapplied_chunks(self, phone_chunks, progress):
+        """저널에 이미 커밋된 것으로 기록된 항목을 청크에서 빼고 남은 청크만 반환"""
+        journal = progress['journal']
+        
+        for chunk in phone_chunks:
+            with progress['profiler'].phase('journal'):
+                remaining = journal.filter_new(chunk)
+            progress['skipped'] += len(chunk) - len(remaining)
+            
+            if remaining:
+                yield remaining
+    
+    def record_checkpoint(self, progress, items):
+        """DB 커밋 직후 커밋된 항목을 저널에 기록하고 목록을 비움"""
+        journal = progress['journal'] if progress is not None else None
+        
+        if journal is not None and items:
+            with progress['profiler'].phase('journal'):
+                journal.record(items)
+            progress['profiler'].count('journal', rows=len(items), statements=1)
+        
+        items.clear()
+    
+    def new_progress(self):
+        """진행 상황 집계용 딕셔너리 생성"""
+        return {
+            'total_rows': None,
+            'rows_read': 0,
+            'phones': 0,  # 중복을 뺀 유효 전화번호 수
+            'duplicates': 0,  # 같은 시트 안에서 다시 나와 제외한 전화번호 수
+            'chunks': 0,
+            'sheet_phones': PhoneKeys(),  # 매칭을 시도한 전화번호
+            'matched_phones': set(),  # DB 행과 매칭된 전화번호
+            'matched_rows': 0,  # 매칭된 DB 행 수 (값이 이미 같아 바뀌지 않은 행 포함)
+            'affected': 0,
+            'committed_rows': 0,
+            'skipped': 0,  # 저널에 이미 커밋된 것으로 기록되어 건너뛴 항목 수
+            'journal': None,  # 실행 중인 CheckpointJournal (사용하지 않으면 None)
+            'sheets': None,  # 읽은 시트 이름 목록 (None은 첫 시트)
+            'profiler': PhaseProfiler()  # 단계별 실행 통계
+        }
+    
+    def log_db_sample(self, conn):
+        """DB에 저장된 전화번호 형식 샘플을 로그에 출력"""
+        table = self.config.get('DATABASE', 'table')
+        phone_column = self.config.get('DATABASE', 'phone_column')
+        db_type = self.config.get('DATABASE', 'type')
+        
+        try:
+            sample_query = f"SELECT {phone_column} FROM {table} LIMIT {PHONE_SAMPLE_ROWS}"
+            cursor = conn.cursor()
+            cursor.execute(sample_query)
+            
+            if db_type in ['mysql', 'mariadb']:
+                db_samples = [row[0] for row in cursor.fetchall()]
+            else:  # sqlite
+                db_samples = [dict(row)[phone_column] for row in cursor.fetchall()]
+            
+            cursor.close()
+            
+            self.log(f"DB 전화번호 샘플: {db_samples}")
+        except Exception as e:
+            self.log(f"샘플 쿼리 실행 중 오류: {str(e)}")
+    
+    def run_update(self, file_path, update_value, phone_col_idx=None, start_row=None, has_header=None,
+                   cancel_event=None, sheets=None, ignore_journal=False):
+        """엑셀 읽기부터 DB 반영까지 실행하고 UpdateResult 반환 (엑셀 설정을 생략하면 [EXCEL] 값 사용)
+
+        입력 형식(xlsx/xls/CSV/Parquet)은 파일 내용으로 판별하고, sheets에 여러 시트를 지정하면 한 번의 업데이트로 처리
+        [JOURNAL]이 켜져 있으면 저널에 커밋된 항목은 건너뜀 (ignore_journal이면 전체를 다시 반영하고 기록만 함)
+        
+        [EXCEL] value_columns가 있으면 매핑된 열 값을 행마다 반영하며, 이때 update_value는 None이어도 됨
+        유효한 전화번호가 없으면 NoValidPhonesError, cancel_event로 취소되면 cancelled=True인 결과 반환
+        [PROFILE] 설정에 따라 실행마다 JSON 보고서(와 cProfile 결과)를 저장
+        """
+        started_at = datetime.now()
+        progress = self.new_progress()
+        self.last_report_path = None  # 이번 실행의 보고서 경로 (오류로 끝나도 남음)
+        profile = cProfile.Profile() if self.config.getboolean('PROFILE', 'cprofile', fallback=False) else None
+        result = None
+        error = None
+        
+        if profile is not None:
+            profile.enable()
+        
+        try:
+            with progress['profiler'].phase('total'):
+                cancelled = self._run_update(file_path, update_value, phone_col_idx, start_row, has_header,
+                                             cancel_event, progress, sheets, ignore_journal)
+            
+            result = UpdateResult(progress, self.config.get('DATABASE', 'match_mode', fallback='staging'), cancelled)
+            
+            if cancelled:
+                self.log(f"업데이트가 취소되었습니다. 진행 중이던 트랜잭션은 롤백되었고, 이미 커밋된 {result.committed}개 행은 유지됩니다.")
+            else:
+                self.log(f"{result.affected}개 행이 업데이트되었습니다. (매칭된 전화번호: {result.matched}개, 매칭되지 않은 전화번호: {result.unmatched}개)")
+                
+                if result.unchanged:
+                    self.log(f"매칭된 {result.matched_rows}개 행 중 {result.unchanged}개는 이미 같은 값이라 바뀌지 않았습니다.")
+            
+            if result.skipped:
+                self.log(f"저널에 이미 커밋된 것으로 기록된 {result.skipped:,}개 항목은 건너뛰었습니다.")
+            
+            if result.unmatched_phones:
+                self.log(f"매칭되지 않은 전화번호 샘플: {result.unmatched_phones[:PHONE_SAMPLE_ROWS]}")
+                self.log_detail(lambda: f"매칭되지 않은 전화번호 전체: {result.unmatched_phones}")
+            
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+            
+            if self.config.getboolean('PROFILE', 'report', fallback=True):
+                try:
+                    report_path = self.write_run_report(file_path, started_at, progress, result, error, profile)
+                    self.last_report_path = report_path
+                    self.log(f"실행 보고서: {report_path}")
+                    
+                    if result is not None:
+                        result.report_path = str(report_path)
+                except OSError as e:
+                    self.log(f"실행 보고서 저장 중 오류: {str(e)}")
+    
+    def write_run_report(self, file_path, started_at, progress, result=None, error=None, profile=None):
+        """실행 보고서(JSON)를 [PROFILE] report_dir에 저장하고 경로 반환 (cProfile 결과가 있으면 .prof도 저장)"""
+        import pandas as pd
+        import numpy as np
+        
+        report_dir = Path(self.config.get('PROFILE', 'report_dir', fallback='reports') or 'reports')
+        report_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"run-{started_at:%Y%m%d-%H%M%S-%f}"
+        
+        if error is not None:
+            status = 'error'
+        elif result is not None and result.cancelled:
+            status = 'cancelled'
+        else:
+            status = 'ok'
+        
+        report = {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'status': status,
+            'error': str(error) if error is not None else None,
+            'file': str(Path(file_path).resolve()),
+            'file_bytes': os.path.getsize(file_path) if os.path.exists(file_path) else None,
+            'file_format': detect_sheet_format(file_path) if os.path.exists(file_path) else None,
+            'settings': {
+                'db_type': self.config.get('DATABASE', 'type'),
+                'table': self.config.get('DATABASE', 'table'),
+                'match_mode': self.config.get('DATABASE', 'match_mode', fallback='staging'),
+                'use_phone_key': self.config.getboolean('DATABASE', 'use_phone_key', fallback=False),
+                'chunk_size': self.config.getint('DATABASE', 'chunk_size', fallback=5000),
+                'commit_interval': self.config.getint('DATABASE', 'commit_interval', fallback=1),
+                'value_columns': self.config.get('EXCEL', 'value_columns', fallback=''),
+                'skip_unchanged': self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False),
+                'max_rows_per_transaction': self.config.getint('DATABASE', 'max_rows_per_transaction', fallback=0),
+                'sheets': progress['sheets']
+            },
+            'counts': {
+                'rows_read': progress['rows_read'],
+                'phones': progress['phones'],
+                'duplicates': progress['duplicates'],
+                'matched': len(progress['matched_phones']),
+                'unmatched': len(progress['sheet_phones'].difference(progress['matched_phones'])),
+                'matched_rows': progress['matched_rows'],
+                'affected': progress['affected'],
+                'unchanged': max(progress['matched_rows'] - progress['affected'], 0),
+                'committed': progress['committed_rows'],
+                'skipped': progress['skipped'],
+                'chunks': progress['chunks']
+            },
+            'phases': progress['profiler'].to_dict(),
+            'peak_rss_mb': peak_rss_mb(),
+            'versions': {
+                'python': sys.version.split()[0],
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'sqlite': sqlite3.sqlite_version
+            },
+            'cprofile': None
+        }
+        
+        if profile is not None:
+            profile_path = report_dir / f"{stem}.prof"
+            profile.dump_stats(profile_path)
+            report['cprofile'] = str(profile_path)
+        
+        report_path = report_dir / f"{stem}.json"
+        
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        
+        return report_path
+    
+    def sheet_settings(self, phone_col_idx=None, start_row=None, has_header=None, sheets=None):
+        """생략한 엑셀 설정을 [EXCEL] 값으로 채워 (전화번호 열, 시작 행, 헤더 여부, 시트 목록) 반환"""
+        if phone_col_idx is None:
+            phone_col_idx = self.config.getint('EXCEL', 'phone_column_index')
+        if start_row is None:
+            start_row = self.config.getint('EXCEL', 'start_row')
+        if has_header is None:
+            has_header = self.config.getboolean('EXCEL', 'has_header')
+        if sheets is None:
+            sheets = parse_sheet_names(self.config.get('EXCEL', 'sheets', fallback=''))
+        
+        return phone_col_idx, start_row, has_header, sheets
+    
+    def _run_update(self, file_path, update_value, phone_col_idx, start_row, has_header, cancel_event, progress,
+                    sheets=None, ignore_journal=False):
+        """run_update 본체 (progress에 건수와 단계별 통계를 기록하고 취소 여부 반환)"""
+        phone_col_idx, start_row, has_header, sheets = self.sheet_settings(phone_col_idx, start_row, has_header, sheets)
+        
+        match_mode = self.config.get('DATABASE', 'match_mode', fallback='staging')
+        
+        parallel = self.config.getint('DATABASE', 'parallel_connections', fallback=1) > 1
+        
+        if match_mode == 'hash':
+            execute_update = self.execute_hash_join_update
+        elif match_mode == 'staging':
+            execute_update = self.execute_batched_update
+        else:
+            raise ValueError(f"지원하지 않는 매칭 방식: {match_mode} (staging 또는 hash)")
+        
+        if parallel:
+            # 파티션 병렬 실행은 MySQL/MariaDB 스테이징 매칭에서만 (SQLite는 쓰기가 직렬화됨)
+            if match_mode == 'staging' and self.config.get('DATABASE', 'type') != 'sqlite':
+                execute_update = self.execute_partitioned_update
+            else:
+                self.log("병렬 연결은 MySQL/MariaDB 스테이징 매칭에서만 사용하므로 하나의 연결로 실행합니다.")
+        
+        value_columns = self.value_columns()
+        
+        if update_value is None and not value_columns:
+            raise ValueError("업데이트할 값이 없습니다. (고정 값 또는 [EXCEL] value_columns 필요)")
+        
+        profiler = progress['profiler']
+        
+        self.log(f"입력 형식: {detect_sheet_format(file_path)}")
+        
+        # 전화번호 열(과 값 열)만 청크 단위로 읽어 정규화 (나머지 열은 읽지 않음)
+        phone_chunks = self.iter_phone_chunks(
+            file_path, phone_col_idx, start_row, has_header, progress,
+            value_col_idxs=[col_idx for col_idx, _ in value_columns],
+            sheets=sheets
+        )
+        first_chunk = next(phone_chunks, None)
+        
+        if first_chunk is None:
+            raise NoValidPhonesError("유효한 전화번호를 찾을 수 없습니다.")
+        
+        phone_chunks = itertools.chain([first_chunk], phone_chunks)
+        
+        # 체크포인트 저널: 같은 대상에 이미 커밋된 항목은 건너뛰고, 커밋할 때마다 기록
+        journal = None
+        
+        if self.config.getboolean('JOURNAL', 'enabled', fallback=False):
+            journal = self.open_journal(file_path, update_value, progress)
+            
+            if ignore_journal:
+                self.log("저널을 무시하고 전체를 다시 반영합니다.")
+            else:
+                phone_chunks = self.iter_unapplied_chunks(phone_chunks, progress)
+        
+        try:
+            # 데이터베이스 연결
+            with profiler.phase('connect'):
+                conn = self.connections.get_connection()
+            
+            try:
+                table = self.config.get('DATABASE', 'table')
+                phone_column = self.config.get('DATABASE', 'phone_column')
+                update_column = self.config.get('DATABASE', 'update_column')
+                
+                # 로그에 데이터베이스 테이블 구조 출력
+                self.log(f"테이블: {table}, 전화번호 컬럼: {phone_column}, 업데이트 컬럼: {update_column}")
+                
+                if value_columns:
+                    self.log(f"값 열 매핑: {', '.join(f'{col_idx}→{column}' for col_idx, column in value_columns)}")
+                
+                # 전화번호 샘플 확인
+                self.log(f"데이터베이스 연결 성공. 전화번호 형식 확인 중...")
+                self.log_db_sample(conn)
+                
+                # staging: 청크 단위 스테이징 조인 UPDATE, hash: 테이블 한 번 스캔 후 기본 키로 UPDATE
+                try:
+                    execute_update(conn, phone_chunks, update_value, progress, cancel_event)
+                    cancelled = False
+                except UpdateCancelled:
+                    cancelled = True
+            finally:
+                self.connections.release(conn)
+            
+            if journal is not None:
+                journal.finish('cancelled' if cancelled else 'ok')
+        except Exception:
+            if journal is not None:
+                journal.finish('error')
+            raise
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        return cancelled
+    
+    def plan_update(self, file_path, update_value, phone_col_idx=None, start_row=None, has_header=None, sheets=None,
+                    cancel_event=None):
+        """DB를 바꾸지 않고 업데이트를 점검하여 DryRunPlan 반환 (드라이런)
+
+        매칭 건수는 읽기 전용 SELECT COUNT를 청크 단위로 실행하여 집계 (hash 매칭은 업데이트와 같은 테이블 스캔)
+        실행될 UPDATE의 EXPLAIN QUERY PLAN(SQLite)/EXPLAIN(MySQL)으로 전체 스캔 여부와 예상 실행 비용을 확인
+        임시 스테이징 테이블 외에는 쓰지 않으며 끝나면 롤백 (저널은 확인하지 않고, 실행 보고서도 저장하지 않음)
+        """
+        phone_col_idx, start_row, has_header, sheets = self.sheet_settings(phone_col_idx, start_row, has_header, sheets)
+        match_mode = self.config.get('DATABASE', 'match_mode', fallback='staging')
+        
+        if match_mode not in MATCH_MODES:
+            raise ValueError(f"지원하지 않는 매칭 방식: {match_mode} (staging 또는 hash)")
+        
+        value_columns = self.value_columns()
+        
+        if update_value is None and not value_columns:
+            raise ValueError("업데이트할 값이 없습니다. (고정 값 또는 [EXCEL] value_columns 필요)")
+        
+        progress = self.new_progress()
+        profiler = progress['profiler']
+        
+        self.log(f"드라이런: 입력 형식 {detect_sheet_format(file_path)}, 매칭 방식 {match_mode} (DB는 바꾸지 않음)")
+        
+        with profiler.phase('total'):
+            # 매칭 건수에는 전화번호만 필요 (값 열은 읽지 않음)
+            phone_chunks = self.iter_phone_chunks(file_path, phone_col_idx, start_row, has_header, progress, sheets=sheets)
+            first_chunk = next(phone_chunks, None)
+            
+            if first_chunk is None:
+                raise NoValidPhonesError("유효한 전화번호를 찾을 수 없습니다.")
+            
+            phone_chunks = itertools.chain([first_chunk], phone_chunks)
+            
+            with profiler.phase('connect'):
+                conn = self.connections.get_connection()
+            
+            try:
+                try:
+                    if match_mode == 'hash':
+                        # 업데이트와 같은 방식으로 테이블을 훑어 정규화한 전화번호로 대조 (읽기만 함)
+                        for chunk in phone_chunks:
+                            if cancel_event is not None and cancel_event.is_set():
+                                raise UpdateCancelled()
+                            
+                            progress['sheet_phones'].update(chunk)
+                            progress['chunks'] += 1
+                        
+                        matched_keys = self.scan_matching_keys(conn, progress['sheet_phones'],
+                                                               progress['matched_phones'], profiler)
+                        progress['matched_rows'] = len(matched_keys)
+                    else:
+                        self.count_staging_matches(conn, phone_chunks, progress, cancel_event)
+                    
+                    cancelled = False
+                except UpdateCancelled:
+                    cancelled = True
+                
+                plan = DryRunPlan(progress, match_mode, cancelled)
+                
+                if not cancelled:
+                    with profiler.phase('explain'):
+                        self.inspect_update_plan(conn, plan, first_chunk, update_value, value_columns)
+            finally:
+                # 스테이징 테이블 적재도 남기지 않음
+                conn.rollback()
+                self.connections.release(conn)
+        
+        plan.timings = profiler.timings()
+        
+        if cancelled:
+            self.log("드라이런이 취소되었습니다.")
+            return plan
+        
+        self.log(
+            f"드라이런: 매칭된 전화번호 {plan.matched}개 ({plan.matched_rows}개 행), 매칭되지 않은 전화번호 {plan.unmatched}개, "
+            f"중복 {plan.duplicates}개"
+        )
+        
+        for line in plan.query_plan:
+            self.log(f"실행 계획: {line}")
+        
+        self.log(f"예상 실행 비용: {plan.estimated_cost}")
+        
+        for warning in plan.warnings:
+            self.log(f"경고: {warning}")
+        
+        if plan.unmatched_phones:
+            self.log(f"매칭되지 않은 전화번호 샘플: {plan.unmatched_phones[:PHONE_SAMPLE_ROWS]}")
+        
+        return plan
+    
+    def build_match_count_sql(self, value_count):
+        """매칭 값 value_count개 중 DB 행과 일치하는 값과 값별 행 수를 세는 읽기 전용 쿼리 생성 (스테이징 매칭과 같은 비교식)"""
+        table = self.config.get('DATABASE', 'table')
+        match_expr = self.staging_match_expression()
+        
+        if self.config.get('DATABASE', 'type') == 'sqlite':
+            placeholders = ', '.join(['?'] * value_count)
+            from_clause = table
+        else:  # MySQL/MariaDB (비교식이 별칭 t 기준)
+            placeholders = ', '.join(['%s'] * value_count)
+            from_clause = f"{table} AS t"
+        
+        return f"SELECT {match_expr}, COUNT(*) FROM {from_clause} WHERE {match_expr} IN ({placeholders}) GROUP BY {match_expr}"
+    
+    def count_staging_matches(self, conn, phone_chunks, progress, cancel_event=None):
+        """전화번호 청크를 매칭 형식으로 바꿔 SELECT COUNT로 매칭 전화번호와 행 수를 progress에 집계"""
+        use_phone_key = self.config.getboolean('DATABASE', 'use_phone_key', fallback=False)
+        profiler = progress['profiler']
+        batch_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        
+        if self.config.get('DATABASE', 'type') == 'sqlite':
+            # 전화번호 하나에 매칭 형식이 최대 2개
+            batch_size = min(batch_size, SQLITE_MAX_VARIABLES // 2)
+        
+        cursor = conn.cursor()
+        
+        try:
+            for chunk in phone_chunks:
+                progress['sheet_phones'].update(chunk)
+                progress['chunks'] += 1
+                
+                for batch in iter_chunks(chunk, batch_size):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise UpdateCancelled()
+                    
+                    # 매칭 형식 → 정규화된 전화번호
+                    variants = {
+                        variant: phone
+                        for phone in batch
+                        for variant in ([phone] if use_phone_key else phone_match_variants(phone))
+                    }
+                    
+                    with profiler.phase('match'):
+                        cursor.execute(self.build_match_count_sql(len(variants)), list(variants))
+                        rows = cursor.fetchall()
+                    
+                    profiler.count('match', rows=len(batch), statements=1)
+                    
+                    for value, count in rows:
+                        phone = variants.get(value) or normalize_phone_number(value)
+                        progress['matched_phones'].add(phone)
+                        progress['matched_rows'] += count
+                
+                self.report_progress(progress)
+        finally:
+            cursor.close()
+    
+    def has_phone_index(self, conn):
+        """매칭에 쓰는 전화번호 컬럼(use_phone_key면 정규화 키)이 맨 앞 열인 인덱스가 대상 테이블에 있는지"""
+        table = self.config.get('DATABASE', 'table')
+        phone_column = self.config.get('DATABASE', 'phone_column')
+        use_phone_key = self.config.getboolean('DATABASE', 'use_phone_key', fallback=False)
+        cursor = conn.cursor()
+        
+        try:
+            if self.config.get('DATABASE', 'type') == 'sqlite':
+                cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))
+                
+                for name, sql in cursor.fetchall():
+                    if use_phone_key:
+                        # setup_phone_key가 만드는 표현식 인덱스
+                        pattern = rf"\(\s*normalize_phone_number\(\s*(\w+\.)?{re.escape(phone_column)}\s*\)"
+                        
+                        if sql and re.search(pattern, sql, re.IGNORECASE):
+                            return True
+                    else:
+                        cursor.execute(f"PRAGMA index_info({name})")
+                        columns = [row[2] for row in cursor.fetchall()]
+                        
+                        if columns and (columns[0] or '').lower() == phone_column.lower():
+                            return True
+                
+                return False
+            
+            # MySQL/MariaDB
+            column = self.config.get('DATABASE', 'phone_key_column', fallback='phone_key') if use_phone_key else phone_column
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s AND SEQ_IN_INDEX = 1",
+                (table, column)
+            )
+            return cursor.fetchone()[0] > 0
+        finally:
+            cursor.close()
+    
+    def count_table_rows(self, conn):
+        """대상 테이블 행 수 (MySQL/MariaDB는 전체를 세지 않고 information_schema의 통계 추정치)"""
+        table = self.config.get('DATABASE', 'table')
+        cursor = conn.cursor()
+        
+        try:
+            if self.config.get('DATABASE', 'type') == 'sqlite':
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            else:  # MySQL/MariaDB
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    (table,)
+                )
+            
+            row = cursor.fetchone()
+            return int(row[0]) if row is not None and row[0] is not None else None
+        finally:
+            cursor.close()
+    
+    def explain_query(self, conn, query, params=()):
+        """쿼리 실행 계획을 (요약 줄 목록, 대상 테이블 전체 스캔 여부, 한 번 실행할 때 훑는 예상 행 수, 옵티마이저 비용) 반환
+
+        SQLite는 EXPLAIN QUERY PLAN에 행 수/비용이 없어 예상 행 수와 비용은 None
+        """
+        table = self.config.get('DATABASE', 'table')
+        cursor = conn.cursor()
+        
+        try:
+            if self.config.get('DATABASE', 'type') == 'sqlite':
+                cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+                lines = [row[3] for row in cursor.fetchall()]
+                
+                # "SCAN users" (3.36 미만은 "SCAN TABLE users")는 전체 스캔, "SEARCH users USING INDEX ..."는 인덱스 탐색
+                # AUTOMATIC 인덱스는 실행할 때마다 테이블 전체를 읽어 만드는 임시 인덱스이므로 전체 스캔으로 봄
+                full_scan = any(
+                    re.match(rf"SCAN (TABLE )?{re.escape(table)}\b", line, re.IGNORECASE)
+                    or re.match(rf"SEARCH (TABLE )?{re.escape(table)}\b.* USING AUTOMATIC", line, re.IGNORECASE)
+                    for line in lines
+                )
+                return lines, full_scan, None, None
+            
+            # MySQL/MariaDB
+            cursor.execute(f"EXPLAIN {query}", params)
+            names = [column[0] for column in cursor.description]
+            rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+            
+            lines = [
+                f"{row.get('table')}: type={row.get('type')}, key={row.get('key')}, rows={row.get('rows')}, "
+                f"Extra={row.get('Extra')}"
+                for row in rows
+            ]
+            
+            # ALL은 테이블 전체, index는 인덱스 전체 스캔
+            full_scan = any(row.get('table') in (table, 't') and row.get('type') in ('ALL', 'index') for row in rows)
+            
+            # 중첩 루프 조인이므로 단계별 예상 행 수의 곱이 한 번 실행할 때 훑는 행 수
+            examined = 1
+            for row in rows:
+                examined *= int(row.get('rows') or 1)
+            
+            # 옵티마이저 비용은 MySQL의 JSON 형식에만 있음 (MariaDB나 지원하지 않는 버전은 None)
+            query_cost = None
+            
+            try:
+                cursor.execute(f"EXPLAIN FORMAT=JSON {query}", params)
+                plan = json.loads(cursor.fetchone()[0])
+                query_cost = float(plan['query_block']['cost_info']['query_cost'])
+            except Exception:
+                pass
+            
+            return lines, full_scan, examined, query_cost
+        finally:
+            cursor.close()
+    
+    def inspect_update_plan(self, conn, plan, sample_phones, update_value, value_columns):
+        """실행될 UPDATE의 실행 계획을 확인하고 plan에 전체 스캔/인덱스 경고와 예상 실행 비용 기록
+
+        staging은 첫 청크를 임시 스테이징 테이블에 넣은 상태로, hash는 기본 키 하나짜리 UPDATE로 확인
+        """
+        with_constant = update_value is not None
+        value_count = len(value_columns)
+        chunk_size = self.config.getint('DATABASE', 'chunk_size', fallback=5000)
+        plan.table_rows = self.count_table_rows(conn)
+        table_rows = plan.table_rows or 0
+        
+        if plan.match_mode == 'hash':
+            phone = sample_phones[0]
+            plan.update_sql = self.build_pk_update_sql(1, value_columns, with_constant)
+            params = self.pk_update_params([(0, phone)], update_value, {phone: (None,) * value_count}, value_count)
+            plan.query_plan, plan.full_scan, _, query_cost = self.explain_query(conn, plan.update_sql, params)
+            
+            # 매칭을 위한 테이블 스캔은 해시 매칭의 정상 동작이므로 계획만 함께 기록
+            scan_sql = (
+                f"SELECT {self.config.get('DATABASE', 'primary_key', fallback='id')}, "
+                f"{self.config.get('DATABASE', 'phone_column')} FROM {self.config.get('DATABASE', 'table')}"
+            )
+            scan_plan = self.explain_query(conn, scan_sql)[0]
+            plan.query_plan = [f"(스캔) {line}" for line in scan_plan] + plan.query_plan
+            
+            # 테이블을 한 번 훑은 뒤 매칭된 행을 기본 키 묶음으로 업데이트
+            statements = -(-plan.matched_rows // self.pk_batch_size(value_count))
+            per_statement = table_rows if plan.full_scan else self.pk_batch_size(value_count)
+            plan.estimated_cost = {
+                'statements': 1 + statements,
+                'rows_examined': table_rows + (statements * table_rows if plan.full_scan else plan.matched_rows),
+                'query_cost': query_cost * statements if query_cost is not None else None
+            }
+            
+            if plan.full_scan:
+                plan.warnings.append(
+                    f"기본 키 UPDATE가 대상 테이블 전체 스캔입니다. primary_key 설정을 확인해주세요. "
+                    f"(묶음 {statements}개 × 약 {per_statement:,}행)"
+                )
+        else:
+            plan.phone_index = self.has_phone_index(conn)
+            plan.update_sql = self.build_staging_update_sql(value_columns, with_constant)
+            params = self.staging_update_params(update_value)
+            
+            # 실제 청크처럼 첫 청크를 적재해 두어야 옵티마이저가 빈 테이블로 보고 계획을 생략하지 않음
+            self.create_staging_table(conn, value_count)
+            
+            try:
+                sample = sample_phones[:chunk_size]
+                staged = self.load_staging_table(
+                    conn, [(phone,) + (None,) * value_count for phone in sample] if value_count else sample, value_count
+                )
+                plan.query_plan, plan.full_scan, examined, query_cost = self.explain_query(conn, plan.update_sql, params)
+            finally:
+                self.drop_staging_table(conn)
+            
+            statements = plan.chunks
+            
+            if examined is None:
+                # SQLite: 전체 스캔이면 청크마다 테이블 전체, 인덱스 탐색이면 스테이징 행과 매칭 행만
+                examined = table_rows if plan.full_scan else staged + -(-plan.matched_rows // max(statements, 1))
+            
+            plan.estimated_cost = {
+                'statements': statements,
+                'rows_examined': statements * examined,
+                'query_cost': query_cost * statements if query_cost is not None else None
+            }
+            
+            if not plan.phone_index:
+                column = (self.config.get('DATABASE', 'phone_key_column', fallback='phone_key')
+                          if self.config.getboolean('DATABASE', 'use_phone_key', fallback=False)
+                          else self.config.get('DATABASE', 'phone_column'))
+                plan.warnings.append(
+                    f"전화번호 컬럼({column})에 쓸 수 있는 인덱스가 없습니다. "
+                    "(설정 탭의 키 인덱스 생성 또는 match_mode = hash 사용 권장)"
+                )
+            
+            if plan.full_scan:
+                plan.warnings.append(
+                    f"UPDATE가 대상 테이블을 전체 스캔합니다. 청크 {statements}개 × 약 {table_rows:,}행을 훑습니다."
+                )
+        
+        if not plan.matched:
+            plan.warnings.append("매칭되는 DB 행이 없습니다. 전화번호 열 인덱스와 DB 전화번호 형식을 확인해주세요.")
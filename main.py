@@ -1,13 +1,63 @@
+import time
+
+# 시작 시간 측정 기준 (모듈 import 시간 포함)
+STARTED_AT = time.perf_counter()
+
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
-import sqlite3
-import mysql.connector
-from configparser import ConfigParser
-import re
-import sys
+import json
+import queue
+import threading
+from collections import deque
 from pathlib import Path
+from engine import (MATCH_MODES, PHONE_SAMPLE_ROWS, NoValidPhonesError, PreviewStore, UpdateEngine, list_sheet_names,
+                    load_config, logger, normalize_phone_number, parse_sheet_names, read_sheet_preview, truncate_message)
+
+# import가 끝난 시각 (pandas 등 무거운 모듈은 엔진에서 처음 쓸 때 로드)
+IMPORTED_AT = time.perf_counter()
+
+# 열 이름과 전화번호 샘플을 확인하려고 먼저 읽는 행 수
+PREVIEW_ROWS = 100
+
+# 미리보기 트리뷰에 실제로 만들어 두는 행 수 (나머지는 스크롤할 때 임시 저장소에서 읽음)
+PREVIEW_WINDOW_ROWS = 15
+
+# 마우스 휠 한 칸에 움직이는 행 수
+PREVIEW_WHEEL_ROWS = 3
+
+# 작업 스레드 → Tk 메인 루프 큐 확인 간격 (ms)
+UI_POLL_MS = 100
+
+# 로그 위젯에 모아 둔 메시지를 반영하는 간격 (ms)과 위젯에 남길 최대 줄 수
+LOG_FLUSH_MS = 250
+LOG_MAX_LINES = 2000
+
+
+class LogBuffer:
+    """위젯에 반영하기 전까지 로그 메시지를 모아 두는 링 버퍼 (가득 차면 오래된 메시지부터 버림)"""
+    
+    def __init__(self, max_messages):
+        self.messages = deque(maxlen=max_messages)
+        self.dropped = 0
+        self.lock = threading.Lock()
+    
+    def append(self, message):
+        with self.lock:
+            if len(self.messages) == self.messages.maxlen:
+                self.dropped += 1
+            self.messages.append(message)
+    
+    def drain(self):
+        """모아 둔 메시지와 버린 메시지 수를 꺼내고 비움"""
+        with self.lock:
+            messages = list(self.messages)
+            dropped = self.dropped
+            self.messages.clear()
+            self.dropped = 0
+        
+        return messages, dropped
+
 
 class DatabaseUpdater:
     def __init__(self, root):
@@ -18,14 +68,63 @@ class DatabaseUpdater:
         
         # 설정 파일 경로
         self.config_file = Path("db_config.ini")
-        self.config = ConfigParser()
         
         # 기본 설정 로드 또는 생성
         self.load_or_create_config()
         
+        # 어느 스레드에서든 로그를 모아 두었다가 LOG_FLUSH_MS마다 한 번에 위젯에 반영
+        self.log_buffer = LogBuffer(LOG_MAX_LINES)
+        
+        # 설정 로드부터 DB 반영까지는 GUI 없는 엔진이 담당 (화면은 입력과 결과 표시만)
+        self.engine = UpdateEngine(self.config, log=self.log_message, on_progress=self.report_progress)
+        
+        # 작업 스레드가 Tk 위젯을 직접 건드리지 않도록 메인 루프로 넘기는 큐
+        self.ui_queue = queue.Queue()
+        self.preview_generation = 0
+        
+        # 미리보기 행 저장소와 트리뷰에 표시 중인 첫 행의 보기 내 위치, 진행 중인 미리보기 작업의 중단 신호
+        self.preview_store = None
+        self.preview_offset = 0
+        self.preview_cancel = None
+        
+        # 시트 목록을 읽어 온 파일 경로 (파일이 바뀌면 미리보기 작업에서 다시 읽음)
+        self.sheet_list_path = None
+        
+        # 진행 중인 업데이트 작업 스레드와 취소 신호
+        self.update_thread = None
+        self.cancel_event = threading.Event()
+        
         # UI 초기화
         self.create_widgets()
+        self.root.after(UI_POLL_MS, self.process_ui_queue)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def report_startup_time(self):
+        """import와 첫 화면 표시까지 걸린 시간 기록 (SHEET2SQL_STARTUP_EXIT가 설정되면 표준 출력에 JSON으로 출력하고 종료)"""
+        self.root.update_idletasks()
+        timings = {
+            'import': round(IMPORTED_AT - STARTED_AT, 3),
+            'first_paint': round(time.perf_counter() - STARTED_AT, 3)
+        }
+        logger.info("시작 시간: %s", timings)
+        self.log_message(f"시작 시간: import {timings['import']:.2f}초, 첫 화면 {timings['first_paint']:.2f}초")
+        
+        if os.environ.get('SHEET2SQL_STARTUP_EXIT'):
+            print(json.dumps(timings), flush=True)
+            self.on_close()
+    
+    def on_close(self):
+        """창을 닫을 때 재사용하던 DB 연결과 미리보기 임시 저장소 정리"""
+        if self.preview_cancel is not None:
+            self.preview_cancel.set()
         
+        if self.preview_store is not None:
+            self.preview_store.close()
+        
+        self.engine.close()
+        self.root.destroy()
+    
     def _on_mousewheel(self, event):
         """마우스 휠 스크롤 이벤트 처리"""
         main_canvas = None
@@ -42,31 +141,7 @@ class DatabaseUpdater:
                 
     def load_or_create_config(self):
         """설정 파일을 로드하거나 없으면 기본 설정으로 생성"""
-        if self.config_file.exists():
-            self.config.read(self.config_file)
-        else:
-            # 기본 설정 생성
-            self.config['DATABASE'] = {
-                'type': 'sqlite',
-                'host': 'localhost',
-                'port': '3306',
-                'database': 'mydatabase.db',
-                'user': 'username',
-                'password': 'password',
-                'table': 'users',
-                'phone_column': 'phone_number',
-                'update_column': 'status'
-            }
-            
-            self.config['EXCEL'] = {
-                'phone_column_index': '1',  # 0부터 시작하므로 두 번째 열은 1
-                'start_row': '1',
-                'has_header': 'True'
-            }
-            
-            # 설정 파일 저장
-            with open(self.config_file, 'w') as f:
-                self.config.write(f)
+        self.config = load_config(self.config_file)
     
     def create_widgets(self):
         # 메인 캔버스 생성 (스크롤을 위해)
@@ -93,38 +168,85 @@ class DatabaseUpdater:
         upload_frame = ttk.Frame(notebook, padding="10")
         notebook.add(upload_frame, text="엑셀 업로드 및 업데이트")
         
-        # 설정 탭
-        settings_frame = ttk.Frame(notebook, padding="10")
-        notebook.add(settings_frame, text="설정")
+        # 설정 탭 (내용은 처음 선택할 때 생성)
+        self.settings_frame = ttk.Frame(notebook, padding="10")
+        self.settings_built = False
+        notebook.add(self.settings_frame, text="설정")
+        notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
+        # 설정 값은 탭을 열지 않아도 쓰이므로 Tk 변수는 먼저 만듦
+        self.create_settings_vars()
         
         # 파일 업로드 탭 내용
         self.create_upload_widgets(upload_frame)
+    
+    def on_tab_changed(self, event):
+        """설정 탭을 처음 선택하면 위젯 생성"""
+        notebook = event.widget
         
-        # 설정 탭 내용
-        self.create_settings_widgets(settings_frame)
+        if not self.settings_built and notebook.nametowidget(notebook.select()) is self.settings_frame:
+            self.settings_built = True
+            self.create_settings_widgets(self.settings_frame)
     
     def create_upload_widgets(self, parent):
         """엑셀 업로드 및 업데이트 탭 위젯 생성"""
         # 엑셀 파일 선택
-        file_frame = ttk.LabelFrame(parent, text="엑셀 파일 선택", padding="10")
+        file_frame = ttk.LabelFrame(parent, text="엑셀 파일 선택 (xlsx, xls, CSV, Parquet)", padding="10")
         file_frame.pack(fill=tk.X, pady=5)
         
         self.file_path_var = tk.StringVar()
         ttk.Entry(file_frame, textvariable=self.file_path_var, width=50).pack(side=tk.LEFT, padx=5, pady=5, fill=tk.X, expand=True)
         ttk.Button(file_frame, text="찾아보기", command=self.browse_file).pack(side=tk.LEFT, padx=5, pady=5)
         
+        # 시트 선택 (여러 개를 선택하면 병렬로 읽어 한 번의 업데이트로 처리, CSV/Parquet은 목록 없음)
+        sheet_frame = ttk.LabelFrame(parent, text="시트 선택 (Ctrl/Shift로 여러 개 선택)", padding="10")
+        sheet_frame.pack(fill=tk.X, pady=5)
+        
+        self.sheet_listbox = tk.Listbox(sheet_frame, selectmode=tk.EXTENDED, height=3, exportselection=False)
+        self.sheet_listbox.pack(fill=tk.X, expand=True, side=tk.LEFT)
+        self.sheet_listbox.bind("<<ListboxSelect>>", lambda event: self.refresh_preview())
+        
+        sheet_scrollbar = ttk.Scrollbar(sheet_frame, orient="vertical", command=self.sheet_listbox.yview)
+        sheet_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.sheet_listbox.configure(yscrollcommand=sheet_scrollbar.set)
+        
         # 미리보기 영역
         preview_frame = ttk.LabelFrame(parent, text="엑셀 데이터 미리보기", padding="10")
         preview_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        # 트리뷰 생성 (테이블 형태로 데이터 표시)
-        self.preview_tree = ttk.Treeview(preview_frame)
+        # 행 이동과 정규화 실패 행 필터
+        preview_tools = ttk.Frame(preview_frame)
+        preview_tools.pack(fill=tk.X, side=tk.TOP, pady=(0, 5))
+        
+        ttk.Label(preview_tools, text="행 번호:").pack(side=tk.LEFT)
+        self.preview_jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(preview_tools, textvariable=self.preview_jump_var, width=10)
+        jump_entry.pack(side=tk.LEFT, padx=5)
+        jump_entry.bind("<Return>", lambda event: self.jump_preview_row())
+        ttk.Button(preview_tools, text="이동", command=self.jump_preview_row).pack(side=tk.LEFT)
+        
+        self.preview_invalid_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(preview_tools, text="정규화 실패 행만", variable=self.preview_invalid_only_var,
+                        command=self.on_preview_filter_change).pack(side=tk.LEFT, padx=10)
+        
+        self.preview_status_var = tk.StringVar()
+        ttk.Label(preview_tools, textvariable=self.preview_status_var, font=("", 8)).pack(side=tk.RIGHT)
+        
+        # 트리뷰 생성 (보이는 행만 만들어 두고 스크롤할 때 내용만 바꿈)
+        self.preview_tree = ttk.Treeview(preview_frame, height=PREVIEW_WINDOW_ROWS)
         self.preview_tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
         
-        # 스크롤바 추가
-        scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", command=self.preview_tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.preview_tree.configure(yscrollcommand=scrollbar.set)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.preview_tree.bind(sequence, self.on_preview_wheel)
+        
+        self.preview_tree.bind("<Prior>", lambda event: self.on_preview_scroll("scroll", -1, "pages"))
+        self.preview_tree.bind("<Next>", lambda event: self.on_preview_scroll("scroll", 1, "pages"))
+        self.preview_tree.bind("<Home>", lambda event: self.show_preview_window(0))
+        self.preview_tree.bind("<End>", lambda event: self.show_preview_window(self.preview_total()))
+        
+        # 스크롤바는 트리뷰가 아니라 저장소 전체 행 수를 기준으로 동작
+        self.preview_scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", command=self.on_preview_scroll)
+        self.preview_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # 수정할 값 입력
         update_frame = ttk.LabelFrame(parent, text="업데이트 정보", padding="10")
@@ -143,7 +265,21 @@ class DatabaseUpdater:
         action_frame.pack(fill=tk.X, pady=5)
         
         ttk.Button(action_frame, text="미리보기 갱신", command=self.refresh_preview).pack(side=tk.LEFT, padx=5, pady=5)
-        ttk.Button(action_frame, text="DB 업데이트 실행", command=self.run_update).pack(side=tk.RIGHT, padx=5, pady=5)
+        self.run_button = ttk.Button(action_frame, text="DB 업데이트 실행", command=self.run_update)
+        self.run_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        self.dry_run_button = ttk.Button(action_frame, text="드라이런 (DB 변경 없음)", command=self.run_dry_run)
+        self.dry_run_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        self.cancel_button = ttk.Button(action_frame, text="취소", command=self.cancel_update, state="disabled")
+        self.cancel_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        
+        # 진행 상황
+        progress_frame = ttk.Frame(parent, padding="10")
+        progress_frame.pack(fill=tk.X)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, orient=tk.HORIZONTAL, mode="determinate")
+        self.progress_bar.pack(fill=tk.X, padx=5)
+        self.progress_text_var = tk.StringVar(value="대기 중")
+        ttk.Label(progress_frame, textvariable=self.progress_text_var, font=("", 8)).pack(anchor=tk.W, padx=5)
         
         # 로그 영역
         log_frame = ttk.LabelFrame(parent, text="실행 로그", padding="10")
@@ -156,45 +292,70 @@ class DatabaseUpdater:
         log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.log_text.configure(yscrollcommand=log_scrollbar.set)
     
+    def create_settings_vars(self):
+        """설정 탭 위젯과 연결할 Tk 변수 생성 (탭을 열기 전에도 미리보기/업데이트/설정 저장에서 값을 읽음)"""
+        # DB 연결 설정
+        self.db_type_var = tk.StringVar(value=self.config.get('DATABASE', 'type'))
+        self.host_var = tk.StringVar(value=self.config.get('DATABASE', 'host'))
+        self.port_var = tk.StringVar(value=self.config.get('DATABASE', 'port'))
+        self.database_var = tk.StringVar(value=self.config.get('DATABASE', 'database'))
+        self.user_var = tk.StringVar(value=self.config.get('DATABASE', 'user'))
+        self.password_var = tk.StringVar(value=self.config.get('DATABASE', 'password'))
+        
+        # 테이블 설정
+        self.table_var = tk.StringVar(value=self.config.get('DATABASE', 'table'))
+        self.phone_column_var = tk.StringVar(value=self.config.get('DATABASE', 'phone_column'))
+        self.update_column_var = tk.StringVar(value=self.config.get('DATABASE', 'update_column'))
+        self.use_phone_key_var = tk.BooleanVar(value=self.config.getboolean('DATABASE', 'use_phone_key', fallback=False))
+        self.phone_key_column_var = tk.StringVar(value=self.config.get('DATABASE', 'phone_key_column', fallback='phone_key'))
+        self.match_mode_var = tk.StringVar(value=self.config.get('DATABASE', 'match_mode', fallback='staging'))
+        self.primary_key_var = tk.StringVar(value=self.config.get('DATABASE', 'primary_key', fallback='id'))
+        self.skip_unchanged_var = tk.BooleanVar(value=self.config.getboolean('DATABASE', 'skip_unchanged', fallback=False))
+        self.max_rows_per_transaction_var = tk.StringVar(value=self.config.get('DATABASE', 'max_rows_per_transaction', fallback='0'))
+        
+        # 엑셀 파일 설정
+        self.phone_col_idx_var = tk.StringVar(value=self.config.get('EXCEL', 'phone_column_index'))
+        self.start_row_var = tk.StringVar(value=self.config.get('EXCEL', 'start_row'))
+        self.has_header_var = tk.BooleanVar(value=self.config.getboolean('EXCEL', 'has_header'))
+        self.value_columns_var = tk.StringVar(value=self.config.get('EXCEL', 'value_columns', fallback=''))
+        
+        # 체크포인트 저널
+        self.journal_enabled_var = tk.BooleanVar(value=self.config.getboolean('JOURNAL', 'enabled', fallback=False))
+        self.journal_path_var = tk.StringVar(value=self.config.get('JOURNAL', 'path', fallback='sheet2sql_journal.db'))
+    
     def create_settings_widgets(self, parent):
-        """설정 탭 위젯 생성"""
+        """설정 탭 위젯 생성 (시작 시간을 줄이려고 탭을 처음 열 때 한 번만 만듦)"""
         # 데이터베이스 설정
         db_frame = ttk.LabelFrame(parent, text="데이터베이스 설정", padding="10")
         db_frame.pack(fill=tk.X, pady=5)
         
         # DB 유형 선택
         ttk.Label(db_frame, text="DB 유형:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-        self.db_type_var = tk.StringVar(value=self.config.get('DATABASE', 'type'))
         db_type_combo = ttk.Combobox(db_frame, textvariable=self.db_type_var, values=["sqlite", "mysql", "mariadb"])
         db_type_combo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
         db_type_combo.bind("<<ComboboxSelected>>", self.on_db_type_change)
         
         # 호스트
         ttk.Label(db_frame, text="호스트:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
-        self.host_var = tk.StringVar(value=self.config.get('DATABASE', 'host'))
         self.host_entry = ttk.Entry(db_frame, textvariable=self.host_var, width=30)
         self.host_entry.grid(row=1, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
         
         # 포트
         ttk.Label(db_frame, text="포트:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
-        self.port_var = tk.StringVar(value=self.config.get('DATABASE', 'port'))
         self.port_entry = ttk.Entry(db_frame, textvariable=self.port_var, width=10)
         self.port_entry.grid(row=2, column=1, sticky=tk.W, padx=5, pady=2)
         
         # 데이터베이스명
         ttk.Label(db_frame, text="데이터베이스:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
-        self.database_var = tk.StringVar(value=self.config.get('DATABASE', 'database'))
         ttk.Entry(db_frame, textvariable=self.database_var, width=30).grid(row=3, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
         
         # 사용자명
         ttk.Label(db_frame, text="사용자명:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
-        self.user_var = tk.StringVar(value=self.config.get('DATABASE', 'user'))
         self.user_entry = ttk.Entry(db_frame, textvariable=self.user_var, width=20)
         self.user_entry.grid(row=4, column=1, sticky=tk.W, padx=5, pady=2)
         
         # 비밀번호
         ttk.Label(db_frame, text="비밀번호:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=2)
-        self.password_var = tk.StringVar(value=self.config.get('DATABASE', 'password'))
         self.password_entry = ttk.Entry(db_frame, textvariable=self.password_var, width=20, show="*")
         self.password_entry.grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
         
@@ -204,38 +365,71 @@ class DatabaseUpdater:
         
         # 테이블명
         ttk.Label(table_frame, text="테이블명:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-        self.table_var = tk.StringVar(value=self.config.get('DATABASE', 'table'))
         ttk.Entry(table_frame, textvariable=self.table_var, width=30).grid(row=0, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
         
         # 전화번호 컬럼명
         ttk.Label(table_frame, text="전화번호 컬럼:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
-        self.phone_column_var = tk.StringVar(value=self.config.get('DATABASE', 'phone_column'))
         ttk.Entry(table_frame, textvariable=self.phone_column_var, width=30).grid(row=1, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
         
         # 업데이트할 컬럼명
         ttk.Label(table_frame, text="업데이트할 컬럼:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
-        self.update_column_var = tk.StringVar(value=self.config.get('DATABASE', 'update_column'))
         ttk.Entry(table_frame, textvariable=self.update_column_var, width=30).grid(row=2, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
         
+        # 정규화 키 인덱스 사용 여부
+        ttk.Label(table_frame, text="정규화 키로 매칭:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Checkbutton(table_frame, variable=self.use_phone_key_var).grid(row=3, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        # 정규화 키 컬럼명 (MySQL/MariaDB 생성 컬럼)
+        ttk.Label(table_frame, text="정규화 키 컬럼:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(table_frame, textvariable=self.phone_key_column_var, width=30).grid(row=4, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
+        ttk.Button(table_frame, text="키 인덱스 생성", command=self.create_phone_key_index).grid(row=4, column=2, sticky=tk.W, padx=5, pady=2)
+        
+        # 매칭 방식 (hash: 전화번호 컬럼에 인덱스를 만들 수 없을 때 테이블을 한 번 훑어 기본 키로 업데이트)
+        ttk.Label(table_frame, text="매칭 방식:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Combobox(table_frame, textvariable=self.match_mode_var, values=list(MATCH_MODES), state="readonly", width=10).grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        # 기본 키 컬럼명 (hash 매칭)
+        ttk.Label(table_frame, text="기본 키 컬럼:").grid(row=6, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(table_frame, textvariable=self.primary_key_var, width=30).grid(row=6, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
+        
+        # 이미 같은 값인 행은 쓰지 않음
+        ttk.Label(table_frame, text="같은 값이면 건너뛰기:").grid(row=7, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Checkbutton(table_frame, variable=self.skip_unchanged_var).grid(row=7, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        # 트랜잭션당 최대 행 수 (0이면 커밋 간격만 사용)
+        ttk.Label(table_frame, text="트랜잭션당 최대 행 수 (0: 제한 없음):").grid(row=8, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(table_frame, textvariable=self.max_rows_per_transaction_var, width=10).grid(row=8, column=1, sticky=tk.W, padx=5, pady=2)
+        
         # 엑셀 설정
         excel_frame = ttk.LabelFrame(parent, text="엑셀 파일 설정", padding="10")
         excel_frame.pack(fill=tk.X, pady=5)
         
         # 전화번호 열 인덱스
         ttk.Label(excel_frame, text="전화번호 열 인덱스 (0부터 시작):").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-        self.phone_col_idx_var = tk.StringVar(value=self.config.get('EXCEL', 'phone_column_index'))
         ttk.Entry(excel_frame, textvariable=self.phone_col_idx_var, width=5).grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
         
         # 시작 행
         ttk.Label(excel_frame, text="데이터 시작 행 (0부터 시작):").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
-        self.start_row_var = tk.StringVar(value=self.config.get('EXCEL', 'start_row'))
         ttk.Entry(excel_frame, textvariable=self.start_row_var, width=5).grid(row=1, column=1, sticky=tk.W, padx=5, pady=2)
         
         # 헤더 여부
         ttk.Label(excel_frame, text="헤더 포함 여부:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
-        self.has_header_var = tk.BooleanVar(value=self.config.getboolean('EXCEL', 'has_header'))
         ttk.Checkbutton(excel_frame, variable=self.has_header_var).grid(row=2, column=1, sticky=tk.W, padx=5, pady=2)
         
+        # 행마다 다른 값을 넣을 열 매핑
+        ttk.Label(excel_frame, text="값 열 매핑 (예: 2:status, 3:memo):").grid(row=3, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(excel_frame, textvariable=self.value_columns_var, width=30).grid(row=3, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
+        
+        # 체크포인트 저널 (중단된 실행 이어서 하기, 같은 파일/값은 변경분만 반영)
+        journal_frame = ttk.LabelFrame(parent, text="체크포인트 저널", padding="10")
+        journal_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(journal_frame, text="커밋된 전화번호 건너뛰기:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Checkbutton(journal_frame, variable=self.journal_enabled_var).grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        ttk.Label(journal_frame, text="저널 파일:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(journal_frame, textvariable=self.journal_path_var, width=30).grid(row=1, column=1, sticky=tk.W+tk.E, padx=5, pady=2)
+        
         # 저장 버튼
         ttk.Button(parent, text="설정 저장", command=self.save_config).pack(pady=10)
         
@@ -260,8 +454,14 @@ class DatabaseUpdater:
             self.password_entry.config(state="normal")
     
     def browse_file(self):
-        """엑셀 파일 선택 다이얼로그"""
-        filetypes = (("Excel 파일", "*.xlsx *.xls"), ("모든 파일", "*.*"))
+        """시트 파일 선택 다이얼로그 (형식은 파일 내용으로 자동 판별)"""
+        filetypes = (
+            ("시트 파일", "*.xlsx *.xlsm *.xls *.csv *.tsv *.txt *.parquet"),
+            ("Excel 파일", "*.xlsx *.xlsm *.xls"),
+            ("CSV 파일", "*.csv *.tsv *.txt"),
+            ("Parquet 파일", "*.parquet"),
+            ("모든 파일", "*.*")
+        )
         filename = filedialog.askopenfilename(title="엑셀 파일 선택", filetypes=filetypes)
         
         if filename:
@@ -269,7 +469,7 @@ class DatabaseUpdater:
             self.refresh_preview()
     
     def refresh_preview(self):
-        """엑셀 데이터 미리보기 갱신"""
+        """엑셀 데이터 미리보기 갱신 (파일은 백그라운드 스레드에서 읽음)"""
         file_path = self.file_path_var.get()
         
         if not file_path or not os.path.exists(file_path):
@@ -277,62 +477,270 @@ class DatabaseUpdater:
             return
         
         try:
-            # 엑셀 파일 로드
             start_row = int(self.start_row_var.get())
             has_header = self.has_header_var.get()
+            phone_col_idx = int(self.phone_col_idx_var.get())
+        except ValueError as e:
+            messagebox.showerror("오류", f"엑셀 설정 값이 올바르지 않습니다: {str(e)}")
+            return
+        
+        # 파일이 바뀌었으면 시트 목록은 작업 스레드에서 다시 읽음 (큰 통합 문서도 화면이 멈추지 않도록)
+        reload_sheets = file_path != self.sheet_list_path
+        sheets = None if reload_sheets else self.selected_sheets()
+        self.sheet_list_path = file_path
+        
+        # 이전 미리보기 작업은 중단하고 결과는 무시하도록 세대 번호 증가
+        self.preview_generation += 1
+        generation = self.preview_generation
+        
+        if self.preview_cancel is not None:
+            self.preview_cancel.set()
+        
+        self.preview_cancel = threading.Event()
+        
+        self.log_message("미리보기를 불러오는 중...")
+        threading.Thread(
+            target=self.load_preview,
+            args=(generation, file_path, start_row, has_header, phone_col_idx, sheets, reload_sheets, self.preview_cancel),
+            daemon=True
+        ).start()
+    
+    def selected_sheets(self):
+        """시트 목록에서 선택한 시트 이름 (목록이 비었거나 선택이 없으면 None = 설정의 sheets)"""
+        return [self.sheet_listbox.get(i) for i in self.sheet_listbox.curselection()] or None
+    
+    def load_preview(self, generation, file_path, start_row, has_header, phone_col_idx, sheets=None, reload_sheets=False,
+                     cancel_event=None):
+        """열 이름을 확인한 뒤 시트 전체 행을 임시 저장소에 청크 단위로 쌓음 (작업 스레드, 쌓이는 대로 화면에 표시)"""
+        try:
+            if reload_sheets:
+                # 설정의 sheets에 있는 시트를 미리 선택하고, 없으면 첫 시트
+                names = list_sheet_names(file_path)
+                configured = parse_sheet_names(self.config.get('EXCEL', 'sheets', fallback=''))
+                sheets = names if '*' in configured else [name for name in names if name in configured]
+                sheets = sheets or names[:1] or None
+                self.post_to_ui(self.show_sheet_names, generation, names, sheets or [])
             
-            if has_header:
-                df = pd.read_excel(file_path, header=start_row)
-            else:
-                df = pd.read_excel(file_path, header=None, skiprows=start_row)
-            
-            # 트리뷰 초기화
-            for child in self.preview_tree.get_children():
-                self.preview_tree.delete(child)
-            
-            # 열 헤더 설정
-            columns = list(df.columns)
-            self.preview_tree["columns"] = columns
-            
-            # 첫 번째 열 (인덱스) 설정
-            self.preview_tree.column("#0", width=50, stretch=tk.NO)
-            self.preview_tree.heading("#0", text="No.")
+            # 여러 시트를 선택했으면 첫 시트를 미리보기로 표시
+            df = read_sheet_preview(file_path, start_row, has_header, PREVIEW_ROWS, sheet=sheets[0] if sheets else None)
+            store = PreviewStore(df.columns)
             
-            # 나머지 열 설정
-            for col in columns:
-                self.preview_tree.column(col, width=100, stretch=tk.YES)
-                self.preview_tree.heading(col, text=str(col))
+            self.post_to_ui(self.show_preview, generation, store, df, phone_col_idx)
             
-            # 데이터 추가 (최대 100행까지만 표시)
-            for i, row in df.head(100).iterrows():
-                values = [row[col] for col in columns]
-                self.preview_tree.insert("", "end", text=str(i+1), values=values)
+            sheet_names = self.engine.build_preview_store(
+                store,
+                file_path,
+                phone_col_idx,
+                start_row,
+                has_header,
+                sheets,
+                on_chunk=lambda: self.post_to_ui(self.refresh_preview_window, generation),
+                cancel_event=cancel_event
+            )
             
-            self.log_message(f"{len(df)} 행의 데이터를 로드했습니다.")
+            if not store.complete:
+                return
             
-            # 전화번호 열 인덱스를 기준으로 특정 열의 데이터를 추출
-            phone_col_idx = int(self.phone_col_idx_var.get())
+            self.post_to_ui(self.refresh_preview_window, generation)
             
             if phone_col_idx >= len(df.columns):
-                self.log_message(f"오류: 전화번호 열 인덱스({phone_col_idx})가 범위를 벗어났습니다. 열 개수: {len(df.columns)}")
                 return
             
-            phone_col_name = df.columns[phone_col_idx]
-            self.log_message(f"전화번호 열: {phone_col_name}")
+            total_rows = store.rows
             
-            # 전화번호 데이터 샘플 표시
-            sample_phones = df.iloc[:5, phone_col_idx].tolist()
-            self.log_message(f"전화번호 샘플: {sample_phones}")
+            # 여러 시트를 한 번에 업데이트할 때는 전화번호 열 전체를 읽어 행 수를 계산하고 업데이트에서 다시 쓰도록 캐시에 저장
+            if len(sheet_names) > 1:
+                progress = self.engine.new_progress()
+                
+                for _ in self.engine.iter_phone_chunks(file_path, phone_col_idx, start_row, has_header, progress, sheets=sheets):
+                    pass
+                
+                total_rows = progress['rows_read']
+            
+            self.post_to_ui(self.show_preview_row_count, generation, total_rows, store.bad_rows)
             
         except Exception as e:
-            messagebox.showerror("오류", f"엑셀 파일 로드 중 오류 발생: {str(e)}")
-            self.log_message(f"오류: {str(e)}")
+            self.post_to_ui(self.show_preview_error, generation, str(e))
+    
+    def show_preview(self, generation, store, df, phone_col_idx):
+        """새 미리보기 저장소로 바꾸고 열 헤더 설정 (행은 저장소에 쌓이는 대로 show_preview_window가 표시)"""
+        if generation != self.preview_generation:
+            store.close()
+            return
+        
+        if self.preview_store is not None:
+            self.preview_store.close()
+        
+        self.preview_store = store
+        self.preview_offset = 0
+        
+        # 트리뷰 초기화
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        
+        # 열 헤더 설정
+        columns = list(df.columns)
+        self.preview_tree["columns"] = columns
+        
+        # 첫 번째 열 (데이터 행 번호) 설정
+        self.preview_tree.column("#0", width=70, stretch=tk.NO)
+        self.preview_tree.heading("#0", text="No.")
+        
+        # 나머지 열 설정
+        for col in columns:
+            self.preview_tree.column(col, width=100, stretch=tk.YES)
+            self.preview_tree.heading(col, text=str(col))
+        
+        self.show_preview_window(0)
+        self.log_message("시트 전체 행을 미리보기 저장소로 읽는 중...")
+        
+        # 전화번호 열 인덱스를 기준으로 특정 열의 데이터를 추출
+        if phone_col_idx >= len(df.columns):
+            self.log_message(f"오류: 전화번호 열 인덱스({phone_col_idx})가 범위를 벗어났습니다. 열 개수: {len(df.columns)}")
+            return
+        
+        phone_col_name = df.columns[phone_col_idx]
+        self.log_message(f"전화번호 열: {phone_col_name}")
+        
+        # 전화번호 데이터 샘플 표시
+        sample_phones = df.iloc[:PHONE_SAMPLE_ROWS, phone_col_idx].tolist()
+        self.log_message(f"전화번호 샘플: {sample_phones}")
+    
+    def preview_total(self):
+        """현재 보기(전체 또는 정규화 실패 행만)의 행 수"""
+        if self.preview_store is None:
+            return 0
+        return self.preview_store.count(self.preview_invalid_only_var.get())
+    
+    def show_preview_window(self, offset=None):
+        """보기의 offset번째 행부터 PREVIEW_WINDOW_ROWS개만 저장소에서 읽어 트리뷰에 표시하고 스크롤바 갱신"""
+        store = self.preview_store
+        invalid_only = self.preview_invalid_only_var.get()
+        total = self.preview_total()
+        offset = self.preview_offset if offset is None else offset
+        self.preview_offset = max(0, min(offset, total - PREVIEW_WINDOW_ROWS))
+        rows = store.fetch(self.preview_offset, PREVIEW_WINDOW_ROWS, invalid_only) if store is not None else []
+        
+        # 트리뷰에는 보이는 행만 둠 (시트 크기와 관계없이 항목 수가 일정)
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        
+        for row_no, values in rows:
+            self.preview_tree.insert("", "end", iid=str(row_no), text=str(row_no),
+                                     values=["" if value is None else value for value in values])
+        
+        if total:
+            self.preview_scrollbar.set(self.preview_offset / total, min((self.preview_offset + len(rows)) / total, 1.0))
+            status = f"{self.preview_offset + 1:,}-{self.preview_offset + len(rows):,} / {total:,}행"
+        else:
+            self.preview_scrollbar.set(0.0, 1.0)
+            status = "표시할 행 없음" if store is not None and store.complete else ""
+        
+        if store is not None and not store.complete:
+            status += " (읽는 중)"
+        
+        self.preview_status_var.set(status)
+    
+    def refresh_preview_window(self, generation):
+        """저장소에 행이 더 쌓이면 스크롤바와 (비어 있던) 보이는 행 갱신"""
+        if generation != self.preview_generation:
+            return
+        
+        self.show_preview_window()
+    
+    def on_preview_scroll(self, action, amount=None, unit=None):
+        """스크롤바 조작(끌기, 화살표, 빈 곳 클릭)을 보기 위치로 변환"""
+        if action == "moveto":
+            offset = int(float(amount) * self.preview_total())
+        else:
+            offset = self.preview_offset + int(amount) * (PREVIEW_WINDOW_ROWS if unit == "pages" else 1)
+        
+        self.show_preview_window(offset)
+        return "break"
+    
+    def on_preview_wheel(self, event):
+        """트리뷰 위 마우스 휠 (Windows/macOS: delta, X11: Button-4/5)"""
+        step = PREVIEW_WHEEL_ROWS if event.num == 5 or event.delta < 0 else -PREVIEW_WHEEL_ROWS
+        self.show_preview_window(self.preview_offset + step)
+        return "break"
+    
+    def on_preview_filter_change(self):
+        """정규화 실패 행 필터를 바꾸면 보고 있던 위치 근처로 이동"""
+        store = self.preview_store
+        
+        if store is None:
+            return
+        
+        children = self.preview_tree.get_children()
+        first_row = int(children[0]) if children else 1
+        self.show_preview_window(store.position_of(first_row, self.preview_invalid_only_var.get()))
+    
+    def jump_preview_row(self):
+        """입력한 데이터 행 번호로 이동 (필터 중이면 그 행 이후 첫 정규화 실패 행)"""
+        if self.preview_store is None:
+            return
+        
+        try:
+            row_no = int(self.preview_jump_var.get())
+        except ValueError:
+            messagebox.showerror("오류", "이동할 행 번호를 숫자로 입력해주세요.")
+            return
+        
+        self.show_preview_window(self.preview_store.position_of(row_no, self.preview_invalid_only_var.get()))
+        
+        if self.preview_tree.exists(str(row_no)):
+            self.preview_tree.selection_set(str(row_no))
+            self.preview_tree.focus(str(row_no))
+    
+    def show_sheet_names(self, generation, names, selected):
+        """읽어 온 시트 목록을 표시하고 기본 시트 선택"""
+        if generation != self.preview_generation:
+            return
+        
+        self.sheet_listbox.delete(0, tk.END)
+        
+        for i, name in enumerate(names):
+            self.sheet_listbox.insert(tk.END, name)
+            
+            if name in selected:
+                self.sheet_listbox.selection_set(i)
+    
+    def show_preview_row_count(self, generation, total_rows, bad_rows):
+        """백그라운드에서 계산한 전체 행 수와 정규화 실패 행 수 표시"""
+        if generation != self.preview_generation:
+            return
+        
+        self.log_message(f"{total_rows} 행의 데이터를 로드했습니다. (전화번호 정규화 실패: {bad_rows}행)")
+    
+    def show_preview_error(self, generation, message):
+        """미리보기 작업 중 발생한 오류 표시"""
+        if generation != self.preview_generation:
+            return
+        
+        # 시트 목록을 읽지 못했을 수 있으므로 다음 미리보기에서 다시 읽음
+        self.sheet_list_path = None
+        messagebox.showerror("오류", f"엑셀 파일 로드 중 오류 발생: {message}")
+        self.log_message(f"오류: {message}")
+    
+    def post_to_ui(self, callback, *args):
+        """작업 스레드에서 Tk 메인 루프로 콜백 전달 (Tk 위젯은 메인 스레드에서만 다룸)"""
+        self.ui_queue.put((callback, args))
+    
+    def process_ui_queue(self):
+        """작업 스레드가 보낸 콜백을 메인 스레드에서 실행"""
+        try:
+            while True:
+                try:
+                    callback, args = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            self.root.after(UI_POLL_MS, self.process_ui_queue)
     
     def save_config(self):
         """설정 저장"""
         try:
-            # 데이터베이스 설정
-            self.config['DATABASE'] = {
+            # 데이터베이스 설정 (화면에 없는 설정 값은 그대로 유지)
+            self.config.read_dict({'DATABASE': {
                 'type': self.db_type_var.get(),
                 'host': self.host_var.get(),
                 'port': self.port_var.get(),
@@ -341,91 +749,64 @@ class DatabaseUpdater:
                 'password': self.password_var.get(),
                 'table': self.table_var.get(),
                 'phone_column': self.phone_column_var.get(),
-                'update_column': self.update_column_var.get()
-            }
+                'update_column': self.update_column_var.get(),
+                'use_phone_key': str(self.use_phone_key_var.get()),
+                'phone_key_column': self.phone_key_column_var.get(),
+                'match_mode': self.match_mode_var.get(),
+                'primary_key': self.primary_key_var.get(),
+                'skip_unchanged': str(self.skip_unchanged_var.get()),
+                'max_rows_per_transaction': self.max_rows_per_transaction_var.get()
+            }})
             
             # 엑셀 설정
-            self.config['EXCEL'] = {
+            self.config.read_dict({'EXCEL': {
                 'phone_column_index': self.phone_col_idx_var.get(),
                 'start_row': self.start_row_var.get(),
-                'has_header': str(self.has_header_var.get())
-            }
+                'has_header': str(self.has_header_var.get()),
+                'value_columns': self.value_columns_var.get()
+            }})
+            
+            # 체크포인트 저널 설정
+            self.config.read_dict({'JOURNAL': {
+                'enabled': str(self.journal_enabled_var.get()),
+                'path': self.journal_path_var.get()
+            }})
             
             # 설정 파일 저장
             with open(self.config_file, 'w') as f:
                 self.config.write(f)
             
+            # 연결 설정이 바뀌었으면 재사용하던 연결을 버림
+            self.engine.connections.refresh()
+            
             messagebox.showinfo("알림", "설정이 저장되었습니다.")
             
         except Exception as e:
             messagebox.showerror("오류", f"설정 저장 중 오류 발생: {str(e)}")
     
-    def normalize_phone_number(self, phone):
-        """전화번호 형식 정규화"""
-        if phone is None:
-            return None
+    def create_phone_key_index(self):
+        """저장된 설정으로 정규화 키 인덱스 생성"""
+        try:
+            conn = self.engine.get_db_connection()
             
-        # 숫자만 추출
-        digits = re.sub(r'\D', '', str(phone))
-        
-        # 빈 문자열이면 None 반환
-        if not digits:
-            return None
+            try:
+                self.engine.setup_phone_key(conn)
+            finally:
+                self.engine.release_db_connection(conn)
             
-        # 국가 코드 처리 (한국의 경우 +82 또는 82로 시작하는 경우)
-        if digits.startswith('82'):
-            digits = '0' + digits[2:]
-        
-        return digits
-    
-    def get_db_connection(self):
-        """데이터베이스 연결 객체 반환"""
-        db_type = self.config.get('DATABASE', 'type')
-        
-        if db_type == 'sqlite':
-            # SQLite 연결
-            db_path = self.config.get('DATABASE', 'database')
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-        
-        elif db_type in ['mysql', 'mariadb']:
-            # MySQL/MariaDB 연결
-            return mysql.connector.connect(
-                host=self.config.get('DATABASE', 'host'),
-                port=self.config.getint('DATABASE', 'port'),
-                database=self.config.get('DATABASE', 'database'),
-                user=self.config.get('DATABASE', 'user'),
-                password=self.config.get('DATABASE', 'password'),
-                charset='utf8mb4',
-                collation='utf8mb4_unicode_ci'
-            )
-        
-        else:
-            raise ValueError(f"지원하지 않는 데이터베이스 유형: {db_type}")
+            self.log_message("정규화 전화번호 키 인덱스를 생성했습니다.")
+            messagebox.showinfo("알림", "정규화 키 인덱스가 준비되었습니다.\n'정규화 키로 매칭'을 켜고 설정을 저장하세요.")
+            
+        except Exception as e:
+            messagebox.showerror("오류", f"키 인덱스 생성 중 오류 발생: {str(e)}")
+            self.log_message(f"오류: {str(e)}")
     
-    def execute_query(self, conn, query, params=None):
-        """쿼리 실행"""
-        db_type = self.config.get('DATABASE', 'type')
-        cursor = conn.cursor()
-        
-        try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-                
-            if db_type in ['mysql', 'mariadb']:
-                result = cursor.fetchall()
-            else:  # sqlite
-                result = [dict(row) for row in cursor.fetchall()]
-                
-            return result
-        finally:
-            cursor.close()
+    def normalize_phone_number(self, phone):
+        """전화번호 형식 정규화"""
+        return normalize_phone_number(phone)
     
-    def run_update(self):
-        """데이터베이스 업데이트 실행"""
+    def run_update(self, dry_run=False):
+        """데이터베이스 업데이트 실행 (작업 스레드에서 처리, dry_run이면 DB를 바꾸지 않고 점검만)"""
         file_path = self.file_path_var.get()
         update_value = self.update_value_var.get()
         
@@ -433,176 +814,170 @@ class DatabaseUpdater:
             messagebox.showerror("오류", "유효한 엑셀 파일을 선택해주세요.")
             return
         
+        try:
+            value_columns = self.engine.value_columns()
+        except ValueError as e:
+            messagebox.showerror("오류", str(e))
+            return
+        
+        # 값 열 매핑이 있으면 고정 값은 비워 둘 수 있음 (비우면 매핑된 열만 업데이트)
         if not update_value:
-            messagebox.showerror("오류", "업데이트할 값을 입력해주세요.")
+            if not value_columns:
+                messagebox.showerror("오류", "업데이트할 값을 입력해주세요.")
+                return
+            update_value = None
+        
+        if self.update_thread is not None and self.update_thread.is_alive():
+            messagebox.showerror("오류", "이미 업데이트가 진행 중입니다.")
             return
         
         try:
-            # 엑셀 파일 로드
+            phone_col_idx = int(self.phone_col_idx_var.get())
             start_row = int(self.start_row_var.get())
             has_header = self.has_header_var.get()
-            
-            if has_header:
-                df = pd.read_excel(file_path, header=start_row)
-            else:
-                df = pd.read_excel(file_path, header=None, skiprows=start_row)
-            
-            # 전화번호 열 추출
-            phone_col_idx = int(self.phone_col_idx_var.get())
-            
-            if phone_col_idx >= len(df.columns):
-                messagebox.showerror("오류", f"전화번호 열 인덱스({phone_col_idx})가 범위를 벗어났습니다.")
-                return
-            
-            # 전화번호 정규화
-            phones = df.iloc[:, phone_col_idx].apply(self.normalize_phone_number).dropna().tolist()
-            
-            if not phones:
-                messagebox.showerror("오류", "유효한 전화번호를 찾을 수 없습니다.")
+        except ValueError as e:
+            messagebox.showerror("오류", f"엑셀 설정 값이 올바르지 않습니다: {str(e)}")
+            return
+        
+        # 미리보기한 파일이면 시트 목록의 선택을 따르고, 아니면 설정의 sheets 사용
+        sheets = self.selected_sheets() if file_path == self.sheet_list_path else None
+        
+        self.cancel_event = threading.Event()
+        self.set_update_running(True)
+        
+        self.update_thread = threading.Thread(
+            target=self.update_worker,
+            args=(file_path, update_value, phone_col_idx, start_row, has_header, self.cancel_event, sheets, dry_run),
+            daemon=True
+        )
+        self.update_thread.start()
+    
+    def run_dry_run(self):
+        """매칭 건수와 UPDATE 실행 계획만 확인하는 드라이런 실행"""
+        self.run_update(dry_run=True)
+    
+    def cancel_update(self):
+        """진행 중인 업데이트 취소 요청 (현재 청크가 끝나면 중단)"""
+        self.cancel_event.set()
+        self.cancel_button.config(state="disabled")
+        self.log_message("취소 요청됨. 현재 청크가 끝나면 중단합니다...")
+    
+    def update_worker(self, file_path, update_value, phone_col_idx, start_row, has_header, cancel_event, sheets=None,
+                      dry_run=False):
+        """엔진으로 업데이트(또는 드라이런)를 실행하고 결과를 표시 (작업 스레드)"""
+        try:
+            if dry_run:
+                plan = self.engine.plan_update(file_path, update_value, phone_col_idx, start_row, has_header, sheets,
+                                               cancel_event)
+                
+                if plan.cancelled:
+                    self.post_to_ui(messagebox.showinfo, "취소", "드라이런이 취소되었습니다.")
+                else:
+                    self.post_to_ui(
+                        messagebox.showwarning if plan.warnings else messagebox.showinfo,
+                        "드라이런 결과",
+                        f"매칭된 전화번호: {plan.matched}개 ({plan.matched_rows}개 행)\n"
+                        f"매칭되지 않은 전화번호: {plan.unmatched}개\n"
+                        f"중복 전화번호: {plan.duplicates}개\n"
+                        f"예상 쿼리 수: {plan.estimated_cost.get('statements')}, "
+                        f"훑는 예상 행 수: {plan.estimated_cost.get('rows_examined')}"
+                        + "".join(f"\n\n경고: {warning}" for warning in plan.warnings)
+                    )
                 return
             
-            self.log_message(f"{len(phones)}개의 전화번호를 처리합니다.")
+            result = self.engine.run_update(file_path, update_value, phone_col_idx, start_row, has_header, cancel_event,
+                                            sheets)
             
-            # 데이터베이스 연결
-            conn = self.get_db_connection()
+            if result.cancelled:
+                self.post_to_ui(messagebox.showinfo, "취소", f"업데이트가 취소되었습니다. (커밋된 행: {result.committed}개)")
+            else:
+                self.post_to_ui(
+                    messagebox.showinfo,
+                    "완료",
+                    f"{result.affected}개 행이 성공적으로 업데이트되었습니다.\n"
+                    f"매칭되지 않은 전화번호: {result.unmatched}개"
+                    + (f"\n이미 같은 값이라 바뀌지 않은 행: {result.unchanged}개" if result.unchanged else "")
+                    + (f"\n이미 반영되어 건너뛴 항목(저널): {result.skipped}개" if result.skipped else "")
+                )
             
-            try:
-              table = self.config.get('DATABASE', 'table')
-              phone_column = self.config.get('DATABASE', 'phone_column')
-              update_column = self.config.get('DATABASE', 'update_column')
-              db_type = self.config.get('DATABASE', 'type')
-              
-              # 로그에 데이터베이스 테이블 구조 출력
-              self.log_message(f"테이블: {table}, 전화번호 컬럼: {phone_column}, 업데이트 컬럼: {update_column}")
-              
-              # 전화번호 샘플 확인
-              self.log_message(f"데이터베이스 연결 성공. 전화번호 형식 확인 중...")
-              
-              try:
-                  # 데이터베이스의 전화번호 샘플 확인
-                  sample_query = f"SELECT {phone_column} FROM {table} LIMIT 5"
-                  cursor = conn.cursor()
-                  cursor.execute(sample_query)
-                  
-                  if db_type in ['mysql', 'mariadb']:
-                      db_samples = [row[0] for row in cursor.fetchall()]
-                  else:  # sqlite
-                      db_samples = [dict(row)[phone_column] for row in cursor.fetchall()]
-                  
-                  cursor.close()
-                  
-                  self.log_message(f"DB 전화번호 샘플: {db_samples}")
-              except Exception as e:
-                  self.log_message(f"샘플 쿼리 실행 중 오류: {str(e)}")
-              
-              # 플레이스홀더 형식 (SQLite는 ?, MySQL은 %s)
-              placeholder = "?" if db_type == 'sqlite' else "%s"
-              
-              # 전화번호 정규화를 위한 SQL 조건 생성
-              if db_type == 'sqlite':
-                  # SQLite의 경우, 정규식을 사용할 수 없으므로 OR 조건으로 처리
-                  phone_conditions = []
-                  
-                  for phone in phones:
-                      # 여러 형식의 전화번호 매칭을 위한 조건 추가
-                      phone_conditions.append(f"{phone_column} = '{phone}'")
-                      
-                      # 지역번호가 있는 경우 (예: 010-1234-5678 -> 01012345678)
-                      if len(phone) >= 10:  # 최소 10자리 번호 (예: 0101234567)
-                          # 하이픈 추가된 형식
-                          if len(phone) == 10:  # 10자리
-                              formatted = f"{phone[:3]}-{phone[3:6]}-{phone[6:]}"
-                          elif len(phone) == 11:  # 11자리
-                              formatted = f"{phone[:3]}-{phone[3:7]}-{phone[7:]}"
-                          else:
-                              formatted = phone
-                          
-                          phone_conditions.append(f"{phone_column} = '{formatted}'")
-                          
-                          # 하이픈이 있는 경우, 하이픈 없는 형식도 추가
-                          if '-' in phone:
-                              cleaned = phone.replace('-', '')
-                              phone_conditions.append(f"{phone_column} = '{cleaned}'")
-                  
-                  phone_condition_sql = " OR ".join(phone_conditions)
-                  
-              else:  # MySQL/MariaDB
-                  # LIKE 연산자를 사용하여 전화번호 매칭을 더 유연하게 처리
-                  like_conditions = []
-                  params = [update_value]  # 첫 번째 파라미터는 업데이트 값
-                  
-                  for phone in phones:
-                      # 전화번호에서 하이픈 제거한 버전
-                      cleaned = re.sub(r'[-\s]', '', phone)
-                      
-                      # 원본 전화번호와 정규화된 전화번호 모두 찾기
-                      like_conditions.append(f"{phone_column} = %s")
-                      params.append(phone)  # 원본 형식 (하이픈 포함)
-                      
-                      # 정규화된 번호가 원본과 다르면 이것도 추가
-                      if cleaned != phone:
-                          like_conditions.append(f"{phone_column} = %s")
-                          params.append(cleaned)  # 하이픈 제거 형식
-                      
-                      # 하이픈 추가 형식도 시도 (10-11자리 번호인 경우)
-                      cleaned_len = len(cleaned)
-                      if 10 <= cleaned_len <= 11:
-                          if cleaned_len == 10:
-                              formatted = f"{cleaned[:3]}-{cleaned[3:6]}-{cleaned[6:]}"
-                          else:  # 11자리
-                              formatted = f"{cleaned[:3]}-{cleaned[3:7]}-{cleaned[7:]}"
-                          
-                          if formatted != phone:  # 이미 추가한 형식이 아니면
-                              like_conditions.append(f"{phone_column} = %s")
-                              params.append(formatted)
-                  
-                  # 모든 조건을 OR로 연결
-                  where_clause = " OR ".join(like_conditions)
-                  update_sql = f"UPDATE {table} SET {update_column} = %s WHERE {where_clause}"
-                  
-                  self.log_message(f"수정된 쿼리: {update_sql}")
-                  self.log_message(f"파라미터: {params}")
-                  
-                  cursor = conn.cursor()
-                  cursor.execute(update_sql, params)
-                  affected_rows = cursor.rowcount
-                  cursor.close()
-                  
-                  conn.commit()
-                  
-                  self.log_message(f"{affected_rows}개 행이 업데이트되었습니다.")
-                  messagebox.showinfo("완료", f"{affected_rows}개 행이 성공적으로 업데이트되었습니다.")
-                  
-              # SQLite 처리 및 커밋
-              if db_type == 'sqlite':
-                  update_sql = f"UPDATE {table} SET {update_column} = ? WHERE {phone_condition_sql}"
-                  self.log_message(f"실행 쿼리: {update_sql}")
-                  
-                  cursor = conn.cursor()
-                  cursor.execute(f"UPDATE {table} SET {update_column} = ? WHERE {phone_condition_sql}", (update_value,))
-                  affected_rows = cursor.rowcount
-                  cursor.close()
-                  
-                  conn.commit()
-                  
-                  self.log_message(f"{affected_rows}개 행이 업데이트되었습니다.")
-                  messagebox.showinfo("완료", f"{affected_rows}개 행이 성공적으로 업데이트되었습니다.")
-                  
-            finally:
-                conn.close()
+        except NoValidPhonesError as e:
+            self.post_to_ui(messagebox.showerror, "오류", str(e))
             
         except Exception as e:
-            messagebox.showerror("오류", f"업데이트 과정에서 오류 발생: {str(e)}")
+            self.post_to_ui(messagebox.showerror, "오류", f"업데이트 과정에서 오류 발생: {str(e)}")
             self.log_message(f"오류: {str(e)}")
+        
+        finally:
+            self.post_to_ui(self.set_update_running, False)
+    
+    def report_progress(self, progress):
+        """작업 스레드의 진행 상황을 메인 루프로 전달"""
+        self.post_to_ui(self.show_progress, dict(progress))
+    
+    def show_progress(self, progress):
+        """진행 막대와 진행 상황 문구 갱신"""
+        total_rows = progress['total_rows']
+        
+        if total_rows:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", maximum=total_rows, value=min(progress['rows_read'], total_rows))
+        elif str(self.progress_bar.cget("mode")) != "indeterminate":
+            # 전체 행 수를 모르면 움직이는 막대로 표시
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.start()
+        
+        self.progress_text_var.set(
+            f"읽은 행: {progress['rows_read']:,} / 정규화된 전화번호: {progress['phones']:,} / "
+            f"실행한 청크: {progress['chunks']:,} / 반영된 행: {progress['affected']:,}"
+        )
+    
+    def set_update_running(self, running):
+        """업데이트 진행 여부에 따라 버튼과 진행 막대 상태 변경"""
+        if running:
+            self.run_button.config(state="disabled")
+            self.dry_run_button.config(state="disabled")
+            self.cancel_button.config(state="normal")
+            self.progress_bar.config(mode="determinate", value=0)
+            self.progress_text_var.set("엑셀 파일을 읽는 중...")
+        else:
+            self.run_button.config(state="normal")
+            self.dry_run_button.config(state="normal")
+            self.cancel_button.config(state="disabled")
+            self.progress_bar.stop()
+            
+            if str(self.progress_bar.cget("mode")) == "indeterminate":
+                self.progress_bar.config(mode="determinate", value=0)
     
     def log_message(self, message):
-        """로그 메시지 추가"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)  # 스크롤 맨 아래로
+        """로그 메시지 추가 (어느 스레드에서나 호출 가능, 위젯에는 flush_log가 모아서 반영)"""
+        self.log_buffer.append(truncate_message(message, self.engine.max_log_chars))
+    
+    def flush_log(self):
+        """모아 둔 로그를 한 번의 insert로 위젯에 반영하고 LOG_MAX_LINES 줄만 남김"""
+        try:
+            messages, dropped = self.log_buffer.drain()
+            
+            if dropped:
+                messages.insert(0, f"... (로그 {dropped:,}건 생략)")
+            
+            if messages:
+                self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+                
+                # 오래된 줄 삭제 (마지막 빈 줄 제외)
+                excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+                if excess > 0:
+                    self.log_text.delete("1.0", f"{excess + 1}.0")
+                
+                self.log_text.see(tk.END)  # 스크롤 맨 아래로
+        finally:
+            self.root.after(LOG_FLUSH_MS, self.flush_log)
 
 def main():
     root = tk.Tk()
     app = DatabaseUpdater(root)
+    
+    # 창이 처음 그려진 뒤 시작 시간 기록
+    root.after_idle(app.report_startup_time)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""Sheet2SQL 명령줄 실행기: GUI 없이 엑셀 전화번호로 DB 행을 업데이트 (cron/서버용)
+
+사용법: python sheet2sql.py 고객목록.xlsx 완료 --config db_config.ini --json
+       python sheet2sql.py 고객목록.csv 완료 --config db_config.ini
+       python sheet2sql.py 고객목록.xlsx 완료 --sheet 1월 --sheet 2월  (여러 시트를 한 번에 업데이트)
+       python sheet2sql.py 고객목록.xlsx --config db_config.ini  (value_columns로 행마다 다른 값 반영)
+       python sheet2sql.py 고객목록.xlsx 완료 --dry-run  (DB를 바꾸지 않고 매칭 건수와 실행 계획만 확인)
+
+종료 코드:
+    0  성공
+    1  실행 중 오류 (엑셀 읽기, DB 연결/쿼리 등)
+    2  잘못된 인자 또는 설정 파일 없음
+    3  유효한 전화번호 없음
+    4  취소됨 (Ctrl+C, 이미 커밋된 청크는 유지)
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+
+from engine import NoValidPhonesError, UpdateEngine, load_config, parse_value_columns
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NO_PHONES = 3
+EXIT_CANCELLED = 4
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="sheet2sql", description="엑셀 전화번호 열로 DB 행을 찾아 값을 업데이트합니다.")
+    parser.add_argument("file", help="시트 파일 경로 (xlsx, xls, CSV, Parquet — 형식은 자동 판별)")
+    parser.add_argument("value", nargs="?", help="업데이트할 값 (설정에 value_columns가 있으면 생략 가능)")
+    parser.add_argument("--config", default="db_config.ini", help="설정 파일 경로 (기본값: db_config.ini)")
+    parser.add_argument("--phone-column-index", type=int, help="전화번호 열 인덱스 (기본값: 설정의 phone_column_index)")
+    parser.add_argument("--start-row", type=int, help="데이터 시작 행 (기본값: 설정의 start_row)")
+    parser.add_argument("--sheet", dest="sheets", action="append",
+                        help="읽을 시트 이름 (여러 번 지정하면 병렬로 읽어 한 번에 업데이트, 전체는 '*', 기본값: 설정의 sheets)")
+    header = parser.add_mutually_exclusive_group()
+    header.add_argument("--header", dest="has_header", action="store_true", default=None, help="첫 행이 헤더임")
+    header.add_argument("--no-header", dest="has_header", action="store_false", help="헤더 행 없음")
+    parser.add_argument("--full", action="store_true",
+                        help="체크포인트 저널에 커밋된 것으로 기록된 전화번호도 다시 반영 ([JOURNAL] enabled일 때)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="DB를 바꾸지 않고 매칭/매칭 안 됨/중복 건수, UPDATE 실행 계획, 예상 실행 비용만 확인")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 표준 출력에 출력")
+    parser.add_argument("--unmatched-out", help="매칭되지 않은 전화번호를 한 줄에 하나씩 저장할 파일")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 로그를 출력하지 않음")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # 설정 파일이 없으면 기본값으로 만들지 않고 실패 (무인 실행에서 잘못된 DB를 건드리지 않도록)
+    try:
+        config = load_config(args.config, create=False)
+    except FileNotFoundError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if not os.path.exists(args.file):
+        print(f"오류: 시트 파일을 찾을 수 없습니다: {args.file}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        value_columns = parse_value_columns(config.get('EXCEL', 'value_columns', fallback=''))
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.value is None and not value_columns:
+        print("오류: 업데이트할 값을 입력하거나 설정에 value_columns를 지정해주세요.", file=sys.stderr)
+        return EXIT_USAGE
+
+    # 로그는 표준 에러로 보내 --json 출력과 섞이지 않게 함
+    log = None if args.quiet else (lambda message: print(message, file=sys.stderr, flush=True))
+    engine = UpdateEngine(config, log=log)
+
+    # Ctrl+C는 현재 청크가 끝난 뒤 취소 (커밋되지 않은 청크는 롤백)
+    cancel_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel_event.set())
+
+    try:
+        if args.dry_run:
+            result = engine.plan_update(
+                args.file,
+                args.value,
+                phone_col_idx=args.phone_column_index,
+                start_row=args.start_row,
+                has_header=args.has_header,
+                sheets=args.sheets,
+                cancel_event=cancel_event
+            )
+        else:
+            result = engine.run_update(
+                args.file,
+                args.value,
+                phone_col_idx=args.phone_column_index,
+                start_row=args.start_row,
+                has_header=args.has_header,
+                cancel_event=cancel_event,
+                sheets=args.sheets,
+                ignore_journal=args.full
+            )
+    except NoValidPhonesError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return EXIT_NO_PHONES
+    except Exception as e:
+        print(f"오류: 업데이트 과정에서 오류 발생: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        engine.close()
+
+    if args.unmatched_out:
+        with open(args.unmatched_out, 'w', encoding='utf-8') as f:
+            f.writelines(phone + "\n" for phone in result.unmatched_phones)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+    elif args.dry_run:
+        print(
+            f"[드라이런] 매칭: {result.matched} ({result.matched_rows}행), 매칭 안 됨: {result.unmatched}, "
+            f"중복: {result.duplicates}, 예상 실행 비용: {result.estimated_cost}"
+        )
+
+        for warning in result.warnings:
+            print(f"경고: {warning}")
+    else:
+        print(
+            f"매칭: {result.matched}, 반영: {result.affected}, 매칭 안 됨: {result.unmatched}, "
+            + (f"변경 없음: {result.unchanged}, " if result.unchanged else "")
+            + (f"건너뜀(저널): {result.skipped}, " if result.skipped else "")
+            + f"소요 시간: {result.timings.get('total', 0.0):.2f}초"
+        )
+
+    return EXIT_CANCELLED if result.cancelled else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
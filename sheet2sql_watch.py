@@ -0,0 +1,427 @@
+"""Sheet2SQL 감시 폴더 모드: 폴더에 들어오는 시트 파일을 차례로 업데이트하는 상주 프로세스
+
+사용법: python sheet2sql_watch.py drop --config db_config.ini
+       python sheet2sql_watch.py drop --once  (지금 있는 파일만 처리하고 종료)
+
+업데이트 값은 사이드카 파일(고객목록.xlsx.value 또는 고객목록.value의 첫 줄)에서 읽고,
+없으면 파일 이름에서 [WATCH] value_pattern으로 찾음 (기본값: "완료__고객목록.xlsx" → 완료)
+설정 파싱, import, DB 연결은 처음 한 번만 하고 파일마다 재사용하며,
+처리한 파일은 실행 보고서와 함께 done 폴더로, 실패한 파일은 failed 폴더로 옮김
+watchdog이 설치되어 있으면 파일 시스템 이벤트(inotify 등)로, 없으면 poll_interval마다 폴더를 훑어 새 파일을 찾음
+
+종료 코드:
+    0  정상 종료 (Ctrl+C/SIGTERM, --once면 모든 파일 처리 후)
+    2  잘못된 인자 또는 설정 파일 없음
+"""
+import argparse
+import fnmatch
+import json
+import os
+import queue
+import re
+import shutil
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from engine import DEFAULT_CONFIG, NoValidPhonesError, UpdateEngine, load_config, parse_value_columns
+
+EXIT_OK = 0
+EXIT_USAGE = 2
+
+# 사이드카 값 파일 확장자 (고객목록.xlsx.value 또는 고객목록.value)
+VALUE_SUFFIX = ".value"
+
+
+def watch_setting(config, key):
+    """[WATCH] 설정 값 (설정 파일에 없으면 기본값)"""
+    return config.get('WATCH', key, fallback=DEFAULT_CONFIG['WATCH'][key])
+
+
+def unique_destination(directory, name):
+    """directory에 같은 이름이 있으면 시각을 붙인 새 경로 반환"""
+    destination = directory / name
+
+    if destination.exists():
+        destination = directory / f"{destination.stem}-{datetime.now():%Y%m%d-%H%M%S-%f}{destination.suffix}"
+
+    return destination
+
+
+class FolderWatcher:
+    """감시 폴더의 새 시트 파일을 크기가 멈출 때까지 기다렸다가 제한된 작업 큐에 넣고 하나씩 업데이트"""
+
+    def __init__(self, engine, directory, log=print):
+        self.engine = engine
+        self.config = engine.config
+        self.log = log
+        self.directory = Path(directory)
+        self.done_dir = Path(watch_setting(self.config, 'done_dir') or self.directory / 'done')
+        self.failed_dir = Path(watch_setting(self.config, 'failed_dir') or self.directory / 'failed')
+        self.patterns = [part.strip() for part in watch_setting(self.config, 'patterns').split(',') if part.strip()]
+        self.value_pattern = re.compile(watch_setting(self.config, 'value_pattern'))
+
+        if 'value' not in self.value_pattern.groupindex:
+            raise ValueError("[WATCH] value_pattern에는 (?P<value>...) 그룹이 있어야 합니다.")
+
+        self.poll_interval = float(watch_setting(self.config, 'poll_interval'))
+        self.settle_seconds = float(watch_setting(self.config, 'settle_seconds'))
+        self.value_columns = parse_value_columns(self.config.get('EXCEL', 'value_columns', fallback=''))
+
+        # 감시 스레드 → 처리 스레드 작업 큐 (가득 차면 새 파일은 다음 확인 때 넣음)
+        self.work_queue = queue.Queue(maxsize=max(int(watch_setting(self.config, 'queue_size')), 1))
+
+        # 복사가 끝났는지 지켜보는 파일 {경로: (크기, 수정 시각, 마지막으로 바뀐 시각)}
+        self.pending = {}
+        # 큐에 넣었거나 처리 중인 파일
+        self.claimed = set()
+        # 옮기지 못해 내용이 바뀌기 전까지 다시 처리하지 않을 파일 {경로: 수정 시각}
+        # (처리 스레드가 쓰고 감시 스레드가 읽으므로 lock으로 보호, 파일이 없어지거나 바뀌면 제거)
+        self.stuck = {}
+        self.lock = threading.Lock()
+
+        self.stop_event = threading.Event()
+        self.cancel_event = threading.Event()
+        self.changed = threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def is_candidate(self, path):
+        """감시 대상 시트 파일인지 (사이드카 값 파일, 임시 파일, 하위 폴더 제외)"""
+        name = path.name
+
+        if name.startswith(('.', '~$')) or name.endswith(VALUE_SUFFIX):
+            return False
+
+        return any(fnmatch.fnmatch(name.lower(), pattern.lower()) for pattern in self.patterns)
+
+    def scan(self):
+        """폴더를 훑어 새 파일을 대기 목록에 추가"""
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            self.log(f"감시 폴더를 읽을 수 없습니다: {e}")
+            return
+
+        present = set()
+
+        for entry in entries:
+            if entry.is_file():
+                present.add(Path(entry.path))
+                self.notice(Path(entry.path))
+
+        # 폴더에서 없어진 파일은 옮기지 못한 파일 목록에서도 뺌
+        with self.lock:
+            for path in [path for path in self.stuck if path not in present]:
+                del self.stuck[path]
+
+    def notice(self, path):
+        """파일 생성/수정 알림 (watchdog 이벤트 또는 폴더 훑기)"""
+        if path.parent != self.directory or not self.is_candidate(path):
+            return
+
+        with self.lock:
+            if path not in self.claimed and path not in self.pending:
+                self.pending[path] = (None, None, time.monotonic())
+
+        self.changed.set()
+
+    def collect_ready(self):
+        """크기와 수정 시각이 settle_seconds 동안 바뀌지 않은 파일을 작업 큐에 넣음"""
+        now = time.monotonic()
+
+        with self.lock:
+            paths = list(self.pending)
+
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                with self.lock:
+                    self.pending.pop(path, None)
+                    self.stuck.pop(path, None)
+                continue
+
+            # 옮기지 못한 파일은 내용이 바뀌기 전까지 다시 처리하지 않음 (바뀌었으면 목록에서 빼고 다시 처리)
+            with self.lock:
+                stuck_mtime = self.stuck.get(path)
+
+                if stuck_mtime == stat.st_mtime_ns:
+                    self.pending.pop(path, None)
+                    continue
+                elif stuck_mtime is not None:
+                    del self.stuck[path]
+
+            with self.lock:
+                size, mtime, since = self.pending[path]
+
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                with self.lock:
+                    self.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+
+            if now - since < self.settle_seconds:
+                continue
+
+            try:
+                self.work_queue.put_nowait(path)
+            except queue.Full:
+                return
+
+            with self.lock:
+                self.pending.pop(path, None)
+                self.claimed.add(path)
+
+    def resolve_value(self, path):
+        """사이드카 파일 또는 파일 이름에서 업데이트 값과 사이드카 경로 반환 (값 열만 쓰면 None 허용)"""
+        for sidecar in (path.with_name(path.name + VALUE_SUFFIX), path.with_suffix(VALUE_SUFFIX)):
+            if sidecar.is_file():
+                lines = sidecar.read_text(encoding='utf-8-sig').splitlines()
+                value = lines[0].strip() if lines else ''
+
+                if value:
+                    return value, sidecar
+
+        match = self.value_pattern.search(path.stem)
+
+        if match and match.group('value'):
+            return match.group('value'), None
+
+        if self.value_columns:
+            return None, None
+
+        raise ValueError(f"업데이트 값을 찾을 수 없습니다: {path.name} ({path.name}{VALUE_SUFFIX} 파일이나 파일 이름 규칙 필요)")
+
+    def process(self, path):
+        """파일 하나를 업데이트하고 결과에 따라 done/failed 폴더로 옮김"""
+        self.log(f"처리 시작: {path.name}")
+        sidecar = None
+        result = None
+        error = None
+        self.engine.last_report_path = None
+
+        try:
+            update_value, sidecar = self.resolve_value(path)
+            result = self.engine.run_update(str(path), update_value, cancel_event=self.cancel_event)
+        except Exception as e:
+            error = e
+
+        # 종료 요청으로 취소된 파일은 그대로 두어 다음 실행에서 다시 처리 (저널이 켜져 있으면 이어서 반영)
+        if result is not None and result.cancelled:
+            self.log(f"처리 중단: {path.name} (이미 커밋된 {result.committed}개 행은 유지, 파일은 감시 폴더에 남김)")
+
+            with self.lock:
+                self.claimed.discard(path)
+            return
+
+        if error is None:
+            self.processed += 1
+            self.log(f"처리 완료: {path.name} (반영 {result.affected}, 매칭 안 됨 {result.unmatched})")
+            self.finish(path, sidecar, self.done_dir, result, None)
+        else:
+            self.failed += 1
+            reason = "유효한 전화번호 없음" if isinstance(error, NoValidPhonesError) else error
+            self.log(f"처리 실패: {path.name}: {reason}")
+            self.finish(path, sidecar, self.failed_dir, None, error)
+
+    def finish(self, path, sidecar, directory, result, error):
+        """파일과 사이드카를 directory로 옮기고 옆에 실행 보고서(<파일 이름>.report.json)를 둠"""
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            destination = unique_destination(directory, path.name)
+            shutil.move(str(path), str(destination))
+        except OSError as e:
+            self.log(f"파일을 옮기지 못했습니다: {path.name}: {e} (내용이 바뀔 때까지 다시 처리하지 않음)")
+
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                return
+
+            with self.lock:
+                self.stuck[path] = mtime
+            return
+        finally:
+            with self.lock:
+                self.claimed.discard(path)
+
+        if sidecar is not None:
+            try:
+                shutil.move(str(sidecar), str(destination.with_name(destination.name + VALUE_SUFFIX)))
+            except OSError as e:
+                self.log(f"사이드카 파일을 옮기지 못했습니다: {sidecar.name}: {e}")
+
+        report_path = destination.with_name(destination.name + ".report.json")
+        engine_report = self.engine.last_report_path
+
+        try:
+            if engine_report is not None and Path(engine_report).exists():
+                # 엔진이 남긴 실행 보고서(와 cProfile 결과)를 파일 옆으로 옮김
+                shutil.move(str(engine_report), str(report_path))
+                profile_path = Path(engine_report).with_suffix('.prof')
+
+                if profile_path.exists():
+                    shutil.move(str(profile_path), str(report_path.with_suffix('.prof')))
+            else:
+                report = {
+                    'finished_at': datetime.now().isoformat(timespec='seconds'),
+                    'status': 'error' if error is not None else 'ok',
+                    'error': str(error) if error is not None else None,
+                    'file': str(destination.resolve()),
+                    'result': result.to_dict() if result is not None else None
+                }
+                report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        except OSError as e:
+            self.log(f"실행 보고서를 저장하지 못했습니다: {e}")
+
+    def worker(self):
+        """작업 큐의 파일을 하나씩 처리 (DB 연결과 캐시는 엔진이 파일 사이에 재사용)"""
+        while not self.stop_event.is_set():
+            try:
+                path = self.work_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                if path.exists():
+                    self.process(path)
+                else:
+                    with self.lock:
+                        self.claimed.discard(path)
+            except Exception as e:
+                # 파일 하나의 예기치 않은 오류로 상주 프로세스가 멈추지 않도록
+                self.log(f"처리 중 예기치 않은 오류: {path.name}: {e}")
+
+                with self.lock:
+                    self.claimed.discard(path)
+            finally:
+                self.work_queue.task_done()
+
+    def start_observer(self):
+        """watchdog이 있으면 파일 시스템 이벤트 감시 시작 (없으면 None, 폴더 훑기로 대신함)"""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notice(Path(event.src_path))
+
+            def on_modified(self, event):
+                self.on_created(event)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notice(Path(event.dest_path))
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self.directory), recursive=False)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def run(self, once=False):
+        """stop_event가 설정될 때까지 감시 (once면 지금 있는 파일만 처리하고 반환)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        observer = None if once else self.start_observer()
+
+        if observer is not None:
+            self.log(f"감시 시작 (파일 시스템 이벤트): {self.directory.resolve()}")
+        elif not once:
+            self.log(f"감시 시작 ({self.poll_interval:g}초마다 폴더 확인): {self.directory.resolve()}")
+
+        worker = threading.Thread(target=self.worker, name="sheet2sql-watch-worker", daemon=True)
+        worker.start()
+        self.scan()
+        last_scan = time.monotonic()
+
+        try:
+            while not self.stop_event.is_set():
+                self.collect_ready()
+
+                if once:
+                    with self.lock:
+                        idle = not self.pending and not self.claimed
+
+                    if idle:
+                        break
+
+                # 이벤트 감시 중이면 훑기는 가끔만 (놓친 이벤트 보완), 아니면 poll_interval마다
+                rescan_interval = self.poll_interval * 10 if observer is not None else self.poll_interval
+
+                if not once and time.monotonic() - last_scan >= rescan_interval:
+                    self.scan()
+                    last_scan = time.monotonic()
+
+                self.changed.wait(min(self.poll_interval, max(self.settle_seconds / 2, 0.1)))
+                self.changed.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+            self.stop_event.set()
+            worker.join()
+
+        self.log(f"감시 종료 (완료 {self.processed}개, 실패 {self.failed}개)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="sheet2sql_watch", description="감시 폴더에 들어오는 시트 파일로 DB 행을 업데이트합니다.")
+    parser.add_argument("directory", nargs="?", help="감시할 폴더 (기본값: 설정의 [WATCH] directory)")
+    parser.add_argument("--config", default="db_config.ini", help="설정 파일 경로 (기본값: db_config.ini)")
+    parser.add_argument("--once", action="store_true", help="지금 폴더에 있는 파일만 처리하고 종료")
+    parser.add_argument("-q", "--quiet", action="store_true", help="엔진 진행 로그를 출력하지 않음 (파일별 결과만 출력)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        config = load_config(args.config, create=False)
+    except FileNotFoundError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def log(message):
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", file=sys.stderr, flush=True)
+
+    engine = UpdateEngine(config, log=None if args.quiet else log)
+
+    try:
+        watcher = FolderWatcher(engine, args.directory or watch_setting(config, 'directory'), log=log)
+    except (ValueError, re.error) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        engine.close()
+        return EXIT_USAGE
+
+    # Ctrl+C/SIGTERM: 처리 중인 파일은 현재 청크가 끝난 뒤 취소하고 종료
+    def stop(signum, frame):
+        watcher.stop_event.set()
+        watcher.cancel_event.set()
+        watcher.changed.set()
+
+    signal.signal(signal.SIGINT, stop)
+
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, stop)
+
+    try:
+        watcher.run(once=args.once)
+    finally:
+        engine.close()
+
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import sqlite3
+from configparser import ConfigParser
+
+import pytest
+
+from engine import DEFAULT_CONFIG
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """users(id, phone_number, status, memo) 테이블이 있는 임시 SQLite DB 경로"""
+    path = tmp_path / "users.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, phone_number TEXT, status TEXT, memo TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def make_config(tmp_path, db_path):
+    """임시 DB를 가리키는 기본 설정 생성 (키워드 인자는 [DATABASE] 값, excel/journal은 해당 섹션 값)"""
+    def make(excel=None, journal=None, **database):
+        config = ConfigParser()
+        config.read_dict(DEFAULT_CONFIG)
+        config.read_dict({
+            'DATABASE': {'database': str(db_path), **{key: str(value) for key, value in database.items()}},
+            'EXCEL': {'start_row': '0', **(excel or {})},
+            'PROFILE': {'report': 'False'},
+            'JOURNAL': {'path': str(tmp_path / "journal.db"), **(journal or {})}
+        })
+        return config
+
+    return make
+
@@ -0,0 +1,24 @@
+import sqlite3
+
+
+def insert_users(db_path, rows):
+    """(전화번호, 상태, 메모) 행을 users 테이블에 추가"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO users (phone_number, status, memo) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def fetch_users(db_path):
+    """users 테이블을 {전화번호: (상태, 메모)}로 반환"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT phone_number, status, memo FROM users").fetchall()
+    conn.close()
+    return {phone: (status, memo) for phone, status, memo in rows}
+
+
+def write_sheet(path, rows, header=("name", "phone", "status", "memo")):
+    """CSV 시트 파일 작성 (전화번호는 두 번째 열)"""
+    lines = [",".join(header)] + [",".join(row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
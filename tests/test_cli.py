@@ -0,0 +1,75 @@
+import signal
+
+import pytest
+
+import sheet2sql
+
+from .helpers import fetch_users, insert_users, write_sheet
+
+
+@pytest.fixture(autouse=True)
+def restore_sigint():
+    # main()이 Ctrl+C 처리기를 바꾸므로 테스트가 끝나면 되돌림
+    handler = signal.getsignal(signal.SIGINT)
+    yield
+    signal.signal(signal.SIGINT, handler)
+
+
+@pytest.fixture
+def config_file(tmp_path, make_config):
+    def write(**database):
+        path = tmp_path / "db_config.ini"
+
+        with open(path, 'w') as f:
+            make_config(**database).write(f)
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def sheet(tmp_path, db_path):
+    insert_users(db_path, [("010-1111-1111", None, None)])
+    return str(write_sheet(tmp_path / "sheet.csv", [("a", "01011111111", "", ""), ("b", "01099999999", "", "")]))
+
+
+def test_cli_ok(db_path, config_file, sheet):
+    assert sheet2sql.main([sheet, "done", "--config", config_file(), "-q"]) == sheet2sql.EXIT_OK
+    assert fetch_users(db_path)["010-1111-1111"] == ("done", None)
+
+
+def test_cli_dry_run_does_not_write(db_path, config_file, sheet, capsys):
+    assert sheet2sql.main([sheet, "done", "--config", config_file(), "-q", "--dry-run"]) == sheet2sql.EXIT_OK
+    assert fetch_users(db_path)["010-1111-1111"] == (None, None)
+    assert "매칭: 1" in capsys.readouterr().out
+
+
+def test_cli_usage_errors(tmp_path, config_file, sheet):
+    missing_config = str(tmp_path / "missing.ini")
+
+    assert sheet2sql.main([sheet, "done", "--config", missing_config, "-q"]) == sheet2sql.EXIT_USAGE
+    assert not (tmp_path / "missing.ini").exists()
+    assert sheet2sql.main([str(tmp_path / "missing.csv"), "done", "--config", config_file(), "-q"]) == sheet2sql.EXIT_USAGE
+    # 값도 value_columns도 없음
+    assert sheet2sql.main([sheet, "--config", config_file(), "-q"]) == sheet2sql.EXIT_USAGE
+
+
+def test_cli_bad_value_columns(tmp_path, make_config, sheet):
+    config = make_config()
+    config.set('EXCEL', 'value_columns', 'memo')
+    path = tmp_path / "bad.ini"
+
+    with open(path, 'w') as f:
+        config.write(f)
+
+    assert sheet2sql.main([sheet, "done", "--config", str(path), "-q"]) == sheet2sql.EXIT_USAGE
+
+
+def test_cli_no_valid_phones(tmp_path, config_file):
+    sheet = write_sheet(tmp_path / "empty.csv", [("a", "no phone", "", "")])
+
+    assert sheet2sql.main([str(sheet), "done", "--config", config_file(), "-q"]) == sheet2sql.EXIT_NO_PHONES
+
+
+def test_cli_database_error(config_file, sheet):
+    assert sheet2sql.main([sheet, "done", "--config", config_file(table="no_such_table"), "-q"]) == sheet2sql.EXIT_ERROR
@@ -0,0 +1,63 @@
+from engine import CheckpointJournal, UpdateEngine
+
+from .helpers import fetch_users, insert_users, write_sheet
+
+
+def open_journal(tmp_path, value, file_hash="sheet", target_keys=("status",)):
+    return CheckpointJournal(str(tmp_path / "journal.db"), file_hash, target_keys, (value,))
+
+
+def test_journal_value_change_and_revert(tmp_path):
+    journal = open_journal(tmp_path, "A")
+    assert journal.filter_new(["p1", "p2"]) == ["p1", "p2"]
+    journal.record(["p1", "p2"])
+    assert journal.filter_new(["p1", "p2", "p3"]) == ["p3"]
+    journal.finish('ok')
+    journal.close()
+
+    # 다른 값(B)은 모두 다시 반영하고, 일부만 커밋된 상태로 둠
+    journal = open_journal(tmp_path, "B")
+    assert journal.filter_new(["p1", "p2"]) == ["p1", "p2"]
+    journal.record(["p1"])
+    journal.finish('cancelled')
+    journal.close()
+
+    # A로 되돌리면 B가 커밋된 p1만 다시 반영
+    journal = open_journal(tmp_path, "A")
+    assert journal.previous[0] == 'ok'
+    assert journal.filter_new(["p1", "p2"]) == ["p1"]
+    journal.close()
+
+    journal = open_journal(tmp_path, "B")
+    assert journal.previous[0] == 'cancelled'
+    assert journal.filter_new(["p1", "p2"]) == ["p2"]
+    journal.close()
+
+
+def test_journal_value_columns_compare_every_column(tmp_path):
+    journal = open_journal(tmp_path, "done", target_keys=("status", "memo"))
+    journal.record([("p1", "x"), ("p2", "y")])
+
+    # 고정 값은 같아도 값 열이 바뀐 전화번호는 다시 반영
+    assert journal.filter_new([("p1", "x"), ("p2", "z"), ("p3", "x")]) == [("p2", "z"), ("p3", "x")]
+    journal.close()
+
+    # 고정 값이 바뀌면 값 열이 같아도 다시 반영
+    journal = open_journal(tmp_path, "other", target_keys=("status", "memo"))
+    assert journal.filter_new([("p1", "x")]) == [("p1", "x")]
+    journal.close()
+
+
+def test_run_update_reapplies_reverted_value(tmp_path, db_path, make_config):
+    insert_users(db_path, [("010-1111-1111", None, None), ("010-2222-2222", None, None)])
+    sheet = write_sheet(tmp_path / "sheet.csv", [("a", "01011111111", "", ""), ("b", "01022222222", "", "")])
+    engine = UpdateEngine(make_config(journal={'enabled': 'True'}))
+
+    try:
+        results = [engine.run_update(str(sheet), value) for value in ("A", "B", "A", "A")]
+    finally:
+        engine.close()
+
+    assert [result.affected for result in results] == [2, 2, 2, 0]
+    assert [result.skipped for result in results] == [0, 0, 0, 2]
+    assert set(fetch_users(db_path).values()) == {("A", None)}
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+from engine import PHONE_KEY_MAX_DIGITS, PhoneKeys, decode_phone_keys, encode_phone_keys, normalize_phone_number, normalize_phone_series
+
+
+PHONE_INPUTS = [
+    "010-1234-5678",
+    "+82 10-1234-5678",
+    "82-2-555-0000",
+    "8210",
+    "82",
+    "(02) 555 0000",
+    "  01012345678  ",
+    "010.0000.0000",
+    "00001",
+    "tel:",
+    "",
+    None,
+    float("nan"),
+    1012345678,
+    1012345678.0,
+    "０１０-１２３４-５６７８",  # 전각 숫자 (re의 \d는 유니코드 숫자로 봄)
+    "010-١٢٣",  # 아랍 숫자
+    "9" * 25,
+]
+
+
+def test_normalize_phone_series_matches_scalar():
+    series = pd.Series(PHONE_INPUTS, dtype=object)
+    expected = [normalize_phone_number(phone) for phone in PHONE_INPUTS]
+
+    result = normalize_phone_series(series).tolist()
+
+    assert [None if pd.isna(value) else value for value in result] == expected
+
+
+def test_normalize_phone_series_ascii_only_and_empty():
+    phones = ["010-1234-5678", "+82-10-9999-0000", None, "abc"]
+
+    result = normalize_phone_series(pd.Series(phones, dtype=object)).tolist()
+
+    assert [None if pd.isna(value) else value for value in result] == [normalize_phone_number(p) for p in phones]
+    assert normalize_phone_series(pd.Series([], dtype=object)).tolist() == []
+
+
+@pytest.mark.parametrize("phone", [
+    "0",
+    "0001",
+    "01012345678",
+    "1" * PHONE_KEY_MAX_DIGITS,
+    "0" * PHONE_KEY_MAX_DIGITS,
+])
+def test_encode_phone_keys_round_trip(phone):
+    keys, as_text = encode_phone_keys([phone])
+
+    assert not as_text[0]
+    assert decode_phone_keys(keys) == [phone]
+
+
+@pytest.mark.parametrize("phone", [
+    "1" * (PHONE_KEY_MAX_DIGITS + 1),
+    "9" * (PHONE_KEY_MAX_DIGITS + 2),
+    "０１０",
+])
+def test_encode_phone_keys_overflow(phone):
+    keys, as_text = encode_phone_keys(["010", phone, None])
+
+    assert as_text.tolist() == [False, True, False]
+    assert keys[1] == 0 and keys[2] == 0
+
+
+def test_phone_keys_keeps_leading_zeros_and_overflow():
+    long_phone = "1" * (PHONE_KEY_MAX_DIGITS + 1)
+    phones = ["010", "10", "0010", "010", long_phone, "０１０", None]
+
+    keys = PhoneKeys.from_phones(phones)
+
+    # 선행 0이 다른 번호는 서로 다른 키, 중복과 None은 빠짐
+    assert len(keys) == 5
+    assert sorted(decode_phone_keys(keys.keys)) == ["0010", "010", "10"]
+    assert keys.overflow == {long_phone, "０１０"}
+    assert keys.contains(["010", "0010", "00010", long_phone, "1" * (PHONE_KEY_MAX_DIGITS + 2), "０１０", None]).tolist() == [
+        True, True, False, True, False, True, False
+    ]
+
+
+def test_phone_keys_difference_and_update():
+    long_phone = "2" * (PHONE_KEY_MAX_DIGITS + 1)
+    keys = PhoneKeys.from_phones(["010", "011", long_phone])
+
+    remaining = keys.difference(["011", long_phone])
+    assert decode_phone_keys(remaining.keys) == ["010"] and not remaining.overflow
+
+    remaining.update(["012", "010", long_phone])
+    assert sorted(decode_phone_keys(remaining.keys)) == ["010", "012"]
+    assert remaining.overflow == {long_phone}
@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+from engine import UpdateEngine, parse_value_columns
+
+from .helpers import fetch_users, insert_users, write_sheet
+
+
+@pytest.fixture
+def users(db_path):
+    insert_users(db_path, [
+        ("010-1111-1111", "old", "m1"),
+        ("010-2222-2222", "new", "same"),
+        ("010-3333-3333", "New", "same"),
+        ("010-4444-4444", None, None),
+        ("010-5555-5555", "old", "untouched"),
+    ])
+    return db_path
+
+
+@pytest.mark.parametrize("match_mode", ["staging", "hash"])
+@pytest.mark.parametrize("skip_unchanged", [False, True])
+def test_value_columns_with_constant(tmp_path, users, make_config, match_mode, skip_unchanged):
+    # 고정 값(status)과 값 열(memo)을 함께 쓸 때 자리표시자 순서가 맞아야 각 행에 자기 값이 들어감
+    config = make_config(match_mode=match_mode, skip_unchanged=skip_unchanged, chunk_size=2,
+                         excel={'value_columns': '3:memo'})
+    sheet = write_sheet(tmp_path / "sheet.csv", [
+        ("a", "01011111111", "x", "m1-new"),
+        ("b", "01022222222", "x", "same"),
+        ("c", "01033333333", "x", "same"),
+        ("d", "01044444444", "x", "m4"),
+        ("e", "01099999999", "x", "nobody"),
+    ])
+    engine = UpdateEngine(config)
+
+    try:
+        result = engine.run_update(str(sheet), "new")
+    finally:
+        engine.close()
+
+    assert fetch_users(users) == {
+        "010-1111-1111": ("new", "m1-new"),
+        "010-2222-2222": ("new", "same"),
+        "010-3333-3333": ("new", "same"),
+        "010-4444-4444": ("new", "m4"),
+        "010-5555-5555": ("old", "untouched"),
+    }
+    assert result.unmatched == 1
+    # skip_unchanged면 이미 같은 행(010-2222-2222)만 빠지고, 대소문자만 다른 행은 바이트 단위 비교로 변경으로 봄
+    assert result.affected == (3 if skip_unchanged else 4)
+
+
+def test_pk_update_params_follow_sql_placeholders(users, make_config):
+    config = make_config(skip_unchanged=True, excel={'value_columns': '3:memo'})
+    engine = UpdateEngine(config)
+    value_columns = parse_value_columns('3:memo')
+    rows = [(1, "01011111111"), (2, "01022222222"), (4, "01044444444")]
+    phone_values = {"01011111111": ("m1-new",), "01022222222": ("same",), "01044444444": (None,)}
+
+    sql = engine.build_pk_update_sql(len(rows), value_columns)
+    params = engine.pk_update_params(rows, "new", phone_values, 1)
+
+    assert sql.count('?') == len(params)
+
+    conn = sqlite3.connect(users)
+    affected = conn.execute(sql, params).rowcount
+    conn.commit()
+    conn.close()
+
+    # 2번 행은 두 컬럼 모두 이미 같아서 제외, 4번 행은 값 열이 NULL이어도 고정 값이 바뀌므로 반영
+    assert affected == 2
+    assert fetch_users(users)["010-1111-1111"] == ("new", "m1-new")
+    assert fetch_users(users)["010-4444-4444"] == ("new", None)
+
+
+def test_staging_update_params_follow_sql_placeholders(make_config):
+    for skip_unchanged in (False, True):
+        engine = UpdateEngine(make_config(skip_unchanged=skip_unchanged))
+        sql = engine.build_staging_update_sql(parse_value_columns('3:memo'))
+
+        assert sql.count('?') == len(engine.staging_update_params("new"))
+        assert engine.staging_update_params(None) == ()
+
+
+def test_update_column_in_value_columns_is_rejected(make_config):
+    engine = UpdateEngine(make_config())
+
+    with pytest.raises(ValueError):
+        engine.build_staging_update_sql(parse_value_columns('2:status'))
+    with pytest.raises(ValueError):
+        engine.build_pk_update_sql(1, parse_value_columns('2:status'))